@@ -0,0 +1,226 @@
+"""
+Headless batch renderer for model card JSON files.
+
+    python batch_render.py CARDS_DIR [-o OUT_DIR] [-f md,html,pdf,readme] [-j WORKERS]
+
+Every *.json card under CARDS_DIR is loaded into a headless stand-in for
+st.session_state through ModelCard.apply_to_session_state, then rendered with
+the same Jinja templates (md_renderer) and README builder (readme_builder) the
+Streamlit app uses. Cards are spread over a process pool; each worker holds
+its own state, so no Streamlit server is needed. Per-card timings are printed
+as cards finish.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+FORMATS = ("md", "html", "pdf", "readme")
+OUTPUT_SUFFIX = {
+    "md": ".md",
+    "html": ".html",
+    "pdf": ".pdf",
+    "readme": ".README.md",
+}
+
+
+class HeadlessSessionState(dict):
+    """Stand-in for st.session_state when rendering outside `streamlit run`."""
+
+    __slots__ = ()
+
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+    def __delattr__(self, key):
+        try:
+            del self[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+
+def init_worker():
+    """Run once per worker: resolve schema/templates and detach from Streamlit."""
+    # model_card_schema.json and templates/ are resolved against the repo root
+    os.chdir(ROOT)
+    import streamlit as st
+
+    st.session_state = HeadlessSessionState()
+
+
+def render_card(card_path, out_dir, formats):
+    """
+    Render one card JSON into `out_dir`.
+
+    Returns {"card", "timings": {step: seconds}, "outputs", "error"}.
+    """
+    import streamlit as st
+    from card_model import ModelCard
+    from md_renderer import (
+        DEFAULT_PDF_CSS,
+        render_full_model_card_md,
+        render_markdown_to_html,
+        save_model_card_pdf,
+    )
+    from readme_builder import render_hf_readme
+
+    card_path = Path(card_path)
+    out_dir = Path(out_dir)
+    result = {"card": card_path.name, "timings": {}, "outputs": [], "error": None}
+    timings = result["timings"]
+
+    def out_path(fmt):
+        return out_dir / f"{card_path.stem}{OUTPUT_SUFFIX[fmt]}"
+
+    def write_text(fmt, text):
+        path = out_path(fmt)
+        path.write_text(text, encoding="utf-8")
+        result["outputs"].append(str(path))
+
+    start = time.perf_counter()
+    try:
+        st.session_state.clear()
+        with open(card_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        ModelCard.from_dict(data).apply_to_session_state()
+        timings["load"] = time.perf_counter() - start
+
+        md_text = None
+        if {"md", "html", "pdf"} & set(formats):
+            t = time.perf_counter()
+            md_text = render_full_model_card_md()
+            timings["md"] = time.perf_counter() - t
+            if "md" in formats:
+                write_text("md", md_text)
+
+        if "html" in formats:
+            t = time.perf_counter()
+            write_text("html", render_markdown_to_html(md_text, extra_css=DEFAULT_PDF_CSS))
+            timings["html"] = time.perf_counter() - t
+
+        if "pdf" in formats:
+            t = time.perf_counter()
+            save_model_card_pdf(str(out_path("pdf")), md_text=md_text)
+            result["outputs"].append(str(out_path("pdf")))
+            timings["pdf"] = time.perf_counter() - t
+
+        if "readme" in formats:
+            t = time.perf_counter()
+            write_text("readme", render_hf_readme())
+            timings["readme"] = time.perf_counter() - t
+    except Exception:
+        result["error"] = traceback.format_exc(limit=3)
+    timings["total"] = time.perf_counter() - start
+    return result
+
+
+def _format_result(result):
+    steps = " ".join(
+        f"{step}={secs * 1000:.0f}ms"
+        for step, secs in result["timings"].items()
+        if step != "total"
+    )
+    status = "FAILED" if result["error"] else "ok"
+    return (
+        f"{result['card']:<40} {status:<6} "
+        f"total={result['timings']['total'] * 1000:.0f}ms {steps}"
+    )
+
+
+def parse_formats(value):
+    formats = tuple(f.strip().lower() for f in value.split(",") if f.strip())
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown format(s): {', '.join(sorted(unknown))} "
+            f"(choose from {', '.join(FORMATS)})"
+        )
+    return formats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render model card JSON files to Markdown/HTML/PDF/README without Streamlit."
+    )
+    parser.add_argument("cards_dir", type=Path, help="directory containing card *.json files")
+    parser.add_argument(
+        "-o",
+        "--out-dir",
+        type=Path,
+        default=None,
+        help="output directory (default: <cards_dir>/rendered)",
+    )
+    parser.add_argument(
+        "-f",
+        "--formats",
+        type=parse_formats,
+        default=("md", "readme"),
+        help=f"comma-separated subset of {','.join(FORMATS)} (default: md,readme)",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of worker processes; 1 renders in-process (default: CPU count)",
+    )
+    parser.add_argument(
+        "--recursive", action="store_true", help="also pick up cards in subdirectories"
+    )
+    args = parser.parse_args(argv)
+
+    cards_dir = args.cards_dir.resolve()
+    out_dir = (args.out_dir or cards_dir / "rendered").resolve()
+    pattern = "**/*.json" if args.recursive else "*.json"
+    cards = sorted(p for p in cards_dir.glob(pattern) if out_dir not in p.parents)
+    if not cards:
+        print(f"No card JSON files found in {cards_dir}", file=sys.stderr)
+        return 1
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    workers = max(1, min(args.workers, len(cards)))
+    print(f"Rendering {len(cards)} card(s) as {','.join(args.formats)} with {workers} worker(s)")
+
+    start = time.perf_counter()
+    results = []
+    if workers == 1:
+        init_worker()
+        for card in cards:
+            results.append(render_card(card, out_dir, args.formats))
+            print(_format_result(results[-1]), flush=True)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+            futures = [
+                pool.submit(render_card, card, out_dir, args.formats) for card in cards
+            ]
+            for future in as_completed(futures):
+                results.append(future.result())
+                print(_format_result(results[-1]), flush=True)
+    elapsed = time.perf_counter() - start
+
+    failed = [r for r in results if r["error"]]
+    for r in failed:
+        print(f"\n{r['card']}:\n{r['error']}", file=sys.stderr)
+
+    card_time = sum(r["timings"]["total"] for r in results)
+    print(
+        f"\n{len(results) - len(failed)}/{len(results)} card(s) rendered in {elapsed:.2f}s "
+        f"wall clock ({card_time:.2f}s summed over cards) -> {out_dir}"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
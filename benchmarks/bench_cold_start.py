@@ -0,0 +1,106 @@
+"""
+Import cost of the app entry point, i.e. the time-to-first-render floor.
+
+    python benchmarks/bench_cold_start.py [-n 5] [--modules main side_bar] [--top 15] [--json]
+
+Each run starts a fresh interpreter with `-X importtime` and imports the
+modules the first page view needs (main and the sidebar every page renders).
+Reported are the median wall time of those imports, the heaviest modules by
+cumulative import time, and which of the export-only dependencies (WeasyPrint,
+huggingface_hub, markdown, pandas, ...) were pulled in although no export ran.
+`--json` prints the same figures as one JSON object for tracking over time.
+"""
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_MODULES = ("main", "side_bar")
+# Only needed once the user exports or uploads to the Hub
+EXPORT_ONLY = ("weasyprint", "huggingface_hub", "markdown", "pandas", "numpy", "jinja2", "lxml")
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _run_once(modules):
+    code = (
+        "import time; _t = time.perf_counter(); "
+        + "; ".join(f"import {m}" for m in modules)
+        + "; print(time.perf_counter() - _t)"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+
+    imports = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            # Nested imports are indented; keep the outermost (cumulative) figure
+            imports.setdefault(name, (int(cumulative_us), int(self_us), len(indent)))
+    return float(proc.stdout.strip().splitlines()[-1]), imports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--repeat", type=int, default=5)
+    parser.add_argument("--modules", nargs="+", default=list(DEFAULT_MODULES))
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="print a JSON summary")
+    args = parser.parse_args(argv)
+
+    walls, runs = [], []
+    for _ in range(args.repeat):
+        wall, imports = _run_once(args.modules)
+        walls.append(wall)
+        runs.append(imports)
+
+    names = set().union(*runs)
+    cumulative = {
+        name: statistics.median(run[name][0] for run in runs if name in run) for name in names
+    }
+    top_level = {name for run in runs for name, (_, _, depth) in run.items() if depth == 1}
+    heaviest = sorted(
+        (name for name in names if name in top_level or "." not in name),
+        key=cumulative.get,
+        reverse=True,
+    )[: args.top]
+    loaded_export_only = [
+        name for name in EXPORT_ONLY if any(n == name or n.startswith(name + ".") for n in names)
+    ]
+
+    summary = {
+        "modules": args.modules,
+        "median_wall_ms": round(statistics.median(walls) * 1000, 1),
+        "min_wall_ms": round(min(walls) * 1000, 1),
+        "heaviest_ms": {name: round(cumulative[name] / 1000, 1) for name in heaviest},
+        "export_only_loaded": loaded_export_only,
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"import {', '.join(args.modules)}  (n={args.repeat})")
+    print(f"  median {summary['median_wall_ms']:8.1f}ms   min {summary['min_wall_ms']:8.1f}ms\n")
+    print("heaviest imports (cumulative):")
+    for name, ms in summary["heaviest_ms"].items():
+        print(f"  {ms:8.1f}ms  {name}")
+    print(
+        "\nexport-only dependencies loaded at startup: "
+        + (", ".join(loaded_export_only) if loaded_export_only else "none")
+    )
+
+
+if __name__ == "__main__":
+    main()
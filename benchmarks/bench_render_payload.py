@@ -0,0 +1,164 @@
+"""
+Bytes of CSS and field chrome (label + ⓘ tooltip) sent to the browser per
+rerun, before and after the tooltip styles moved into the page stylesheet.
+
+    python benchmarks/bench_render_payload.py [--task "Segmentation"] [--json]
+
+Every schema section is treated as one page showing all of its fields for
+the task. "before" repeats the tooltip <style> block per field and the
+toolbar CSS per page, as the field renderer and page functions used to;
+"after" is utils.PAGE_CSS once per page plus the cached tooltip HTML.
+Markdown bodies are measured as Streamlit sends them (dedented, UTF-8).
+"""
+
+import argparse
+import json
+import sys
+import textwrap
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import render  # noqa: E402
+import schema_views  # noqa: E402
+import utils  # noqa: E402
+
+LEGACY_PAGE_CSS = """
+    <style>
+    /* hide Streamlit Cloud’s top-right toolbar (includes the GitHub icon) */
+    div[data-testid="stToolbar"] { visibility: hidden; height: 0; }
+
+    /* optional: also hide the 'Manage app' badge and footer */
+    a[data-testid="viewerBadge_link"] { display: none !important; }
+    div[data-testid="stStatusWidget"] { display: none !important; }
+    footer { visibility: hidden; }
+    </style>
+    """
+
+LEGACY_TOOLTIP_CSS = """
+        <style>
+        .tooltip-inline {
+            display: inline-block;
+            position: relative;
+            margin-left: 6px;
+            cursor: pointer;
+            font-size: 1em;
+            color: #999;
+        }
+
+        .tooltip-inline .tooltiptext {
+            visibility: hidden;
+            width: 320px;
+            background-color: #f9f9f9;
+            color: #333;
+            text-align: left;
+            border-radius: 6px;
+            border: 1px solid #ccc;
+            padding: 10px;
+            position: absolute;
+            top: 125%;
+            left: 0;
+            z-index: 10;
+            box-shadow: 0px 0px 10px rgba(0,0,0,0.1);
+            font-weight: normal;
+            font-size: 0.95em;
+            line-height: 1.4;
+            white-space: normal;
+            word-wrap: break-word;
+            display: inline-block;
+        }
+
+        .tooltip-inline:hover .tooltiptext {
+            visibility: visible;
+        }
+        </style>
+    """
+
+
+def _legacy_tooltip(label, description, field_format, example, required):
+    required_tag = (
+        "<span style='color: black; font-size: 1.2em;'>*</span>" if required else ""
+    )
+    return f"""
+    <div style='margin-bottom: 0px; font-weight: 500; font-size: 0.98em;'>
+        {label} {required_tag}
+        <span class="tooltip-inline">ⓘ
+            <span class="tooltiptext">
+                <strong>Description:</strong> {description}<br><br>
+                <strong>Format:</strong> {field_format}<br><br>
+                <strong>Example(s):</strong> {example}
+            </span>
+        </span>
+    </div>
+    """
+
+
+def _sent(body):
+    return len(textwrap.dedent(body).strip().encode("utf-8"))
+
+
+def _chrome_args(key, props):
+    return (
+        props.get("label") or key or "Field",
+        props.get("description", ""),
+        props.get("type", ""),
+        props.get("example", ""),
+        bool(props.get("required", False)),
+    )
+
+
+def measure(task):
+    schema = schema_views.get_compiled_schema(str(ROOT / schema_views.SCHEMA_PATH))
+    pages = {}
+    for name, section in schema.items():
+        if not isinstance(section, schema_views.SchemaSection):
+            continue
+        fields = section.visible_fields(task)
+        if not fields:
+            continue
+        before = _sent(LEGACY_PAGE_CSS)
+        after = _sent(utils.PAGE_CSS)
+        for key, props in fields:
+            args = _chrome_args(key, props)
+            before += _sent(LEGACY_TOOLTIP_CSS) + _sent(_legacy_tooltip(*args))
+            after += _sent(render.field_tooltip_html(*map(str, args[:4]), args[4]))
+        pages[name] = {"fields": len(fields), "before": before, "after": after}
+    return pages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--task", default=schema_views.TASKS[0])
+    parser.add_argument("--json", action="store_true", help="print a JSON summary")
+    args = parser.parse_args(argv)
+
+    pages = measure(args.task)
+    before = sum(p["before"] for p in pages.values())
+    after = sum(p["after"] for p in pages.values())
+    summary = {
+        "task": args.task,
+        "pages": pages,
+        "total_before_bytes": before,
+        "total_after_bytes": after,
+        "reduction": round(1 - after / before, 3) if before else 0.0,
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"field chrome + CSS per rerun, task {args.task!r}\n")
+    print(f"  {'page (schema section)':45} {'fields':>6} {'before':>9} {'after':>9}")
+    for name, page in pages.items():
+        print(
+            f"  {name[:45]:45} {page['fields']:6d} "
+            f"{page['before']:8d}B {page['after']:8d}B"
+        )
+    print(
+        f"\n  total {before}B -> {after}B "
+        f"({summary['reduction'] * 100:.0f}% less per full rerun)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Python-side cost of rendering the evaluation page's fields on a rerun.
+
+    python benchmarks/bench_render_plan.py [-n 200] [--task "Segmentation"] [--json]
+
+Renders every field of the evaluation section visible for the task through
+render.render_field, the way evaluation_data_mrc does, `n` times outside a
+Streamlit server (widgets are inert there, so the figure is the dispatch,
+option and key handling around them). Reports the median pass and the
+per-field cost.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import render  # noqa: E402
+import schema_views  # noqa: E402
+
+SECTION = "evaluation_data_methodology_results_commisioning"
+PREFIX = "evaluation_bench"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--repeat", type=int, default=200)
+    parser.add_argument("--task", default=schema_views.TASKS[0])
+    parser.add_argument("--json", action="store_true", help="print a JSON summary")
+    args = parser.parse_args(argv)
+
+    schema = schema_views.get_compiled_schema(str(ROOT / schema_views.SCHEMA_PATH))
+    section = schema[SECTION]
+    fields = section.visible_fields(args.task)
+
+    passes = []
+    for _ in range(args.repeat + 1):
+        start = time.perf_counter()
+        for key, props in fields:
+            render.render_field(key, props, PREFIX)
+        passes.append(time.perf_counter() - start)
+    passes = passes[1:]  # the first pass pays one-off compilation
+
+    median = statistics.median(passes)
+    summary = {
+        "task": args.task,
+        "fields": len(fields),
+        "median_pass_ms": round(median * 1000, 3),
+        "min_pass_ms": round(min(passes) * 1000, 3),
+        "per_field_us": round(median / max(1, len(fields)) * 1e6, 2),
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    print(
+        f"evaluation page, task {args.task!r}: {len(fields)} fields (n={args.repeat})"
+    )
+    print(
+        f"  median {summary['median_pass_ms']:.3f}ms/pass   "
+        f"min {summary['min_pass_ms']:.3f}ms   {summary['per_field_us']:.2f}us/field"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Per-export cost of the Jinja environment: fresh vs shared.
+
+    python benchmarks/bench_template_env.py CARD_JSON [-n 20]
+
+"fresh" rebuilds an Environment for every section and the master template
+(the previous md_renderer._env behaviour), so every export re-parses and
+re-compiles all templates. "shared" renders through the cached per-process
+environment. "cold bytecode" times a new environment reading the on-disk
+bytecode cache, i.e. the first export of a newly started process.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import batch_render  # noqa: E402
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _report(name, samples):
+    print(
+        f"{name:<16} median={statistics.median(samples) * 1000:8.1f}ms "
+        f"min={min(samples) * 1000:8.1f}ms  (n={len(samples)})"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("card", type=Path, help="model card JSON used as input")
+    parser.add_argument("-n", "--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+    card = args.card.resolve()
+
+    batch_render.init_worker()
+    import json
+
+    from jinja2 import FileSystemBytecodeCache
+
+    import md_renderer
+    from card_model import ModelCard
+
+    with open(card, "r", encoding="utf-8") as f:
+        ModelCard.from_dict(json.load(f)).apply_to_session_state()
+
+    shared_env = md_renderer._env
+    md_renderer.warm_templates()
+
+    def fresh():
+        md_renderer._env = md_renderer._build_env
+        try:
+            return md_renderer.render_full_model_card_md()
+        finally:
+            md_renderer._env = shared_env
+
+    def cold_bytecode():
+        env = md_renderer._build_env(FileSystemBytecodeCache())
+        md_renderer._env = lambda: env
+        try:
+            return md_renderer.render_full_model_card_md()
+        finally:
+            md_renderer._env = shared_env
+
+    assert fresh() == md_renderer.render_full_model_card_md()
+
+    fresh_samples = _time(fresh, args.repeat)
+    cold_samples = _time(cold_bytecode, args.repeat)
+    shared_samples = _time(md_renderer.render_full_model_card_md, args.repeat)
+
+    _report("fresh env", fresh_samples)
+    _report("cold bytecode", cold_samples)
+    _report("shared env", shared_samples)
+    saved = statistics.median(fresh_samples) - statistics.median(shared_samples)
+    print(f"\nsaved per export: {saved * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
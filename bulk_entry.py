@@ -0,0 +1,178 @@
+"""
+Batch entry for the list fields that are otherwise filled one ➕ click (and
+one full rerun) at a time: modality and content lists, RTSTRUCT structures,
+treatment modalities and metric lists.
+
+A batch is whatever the user picked or pasted in one go. parse() turns it
+into the values the single-entry widgets would have stored, checking every
+token in one pass (custom structure names are snapped to TG-263 with
+tg263.normalize_many), so the caller can commit the batch with a single state
+update (utils.extend_state).
+"""
+
+import re
+
+import tg263
+from utils import strip_brackets
+
+CONTENT_LIST_FIELDS = (
+    "input_content",
+    "output_content",
+    "model_inputs",
+    "model_outputs",
+)
+TREATMENT_MODALITY_FIELDS = ("treatment_modality_train", "treatment_modality_eval")
+METRIC_TYPE_FIELDS = ("type_ism", "type_gm_seg")
+DOSE_METRIC_FIELDS = ("type_dose_dm", "type_dose_dm_seg", "type_dose_dm_dp")
+DOSE_METRIC_OPTIONS = (
+    "GPR (Gamma Passing Rate)",
+    "MAE (Mean Absolute Error)",
+    "MSE (Mean Squared Error)",
+)
+
+RTSTRUCT_PREFIX = "RTSTRUCT_"
+# Options that need a second input in the single-entry row, not values
+_PLACEHOLDER_OPTIONS = {"RTSTRUCT", "OT (Other)", "Other", "D", "V"}
+
+_SEPARATORS = re.compile(r"[\n\r\t,;]+")
+_DOSE_PARAMETRIC = re.compile(r"^([DV])\s*(\d{1,3})\s*%?$", re.IGNORECASE)
+_RTSTRUCT_TOKEN = re.compile(r"^RTSTRUCT[\s_:\-]*", re.IGNORECASE)
+
+
+def split_text(text):
+    """Pasted text -> tokens; one per line, comma, semicolon or tab."""
+    return [token.strip() for token in _SEPARATORS.split(text or "") if token.strip()]
+
+
+def _option_lookup(options):
+    """{full label or bracket-less code, lower-cased: option}"""
+    lookup = {}
+    for option in options:
+        if option in _PLACEHOLDER_OPTIONS:
+            continue
+        lookup.setdefault(option.lower(), option)
+        lookup.setdefault(strip_brackets(option).lower(), option)
+    return lookup
+
+
+def pick_choices(key, options, group=None):
+    """
+    Multi-select choices offered for `key`: {label: [token]}. RTSTRUCT
+    structures are offered one TG-263 group at a time.
+    """
+    if key in CONTENT_LIST_FIELDS:
+        choices = {
+            "Modalities": [o for o in options if o not in _PLACEHOLDER_OPTIONS]
+        }
+        if group is not None:
+            choices["RTSTRUCT structures"] = [
+                RTSTRUCT_PREFIX + s for s in tg263.search(group=group, limit=None)
+            ]
+        return choices
+    if key in DOSE_METRIC_FIELDS:
+        return {"Metrics": list(DOSE_METRIC_OPTIONS)}
+    if key in TREATMENT_MODALITY_FIELDS or key in METRIC_TYPE_FIELDS:
+        return {"Options": [o for o in options if o not in _PLACEHOLDER_OPTIONS]}
+    return {}
+
+
+def _each(normalize_one):
+    return lambda tokens: [normalize_one(token) for token in tokens]
+
+
+def normalizer(key, options=()):
+    """
+    [token] -> [(value, error)] for list field `key`, producing exactly what
+    the single-entry widgets store for it. The whole batch is passed at once
+    so structure names can be matched to TG-263 in one pass.
+    """
+    lookup = _option_lookup(options)
+
+    if key in CONTENT_LIST_FIELDS:
+
+        def normalize_all(tokens):
+            tagged = [t for t in tokens if _RTSTRUCT_TOKEN.match(t)]
+            bare = [
+                t
+                for t in tokens
+                if not _RTSTRUCT_TOKEN.match(t) and t.lower() not in lookup
+            ]
+            names = [_RTSTRUCT_TOKEN.sub("", t) for t in tagged]
+            # Tagged names are snapped to the closest TG-263 name; bare tokens
+            # only when they spell one exactly (else they're custom entries)
+            structures = dict(zip(tagged, tg263.normalize_many(names)))
+            structures.update(zip(bare, tg263.normalize_many(bare, min_score=1.0)))
+
+            out = []
+            for token in tokens:
+                if token in structures and structures[token]:
+                    out.append((RTSTRUCT_PREFIX + structures[token], None))
+                elif _RTSTRUCT_TOKEN.match(token):
+                    name = _RTSTRUCT_TOKEN.sub("", token)
+                    if name:
+                        out.append((RTSTRUCT_PREFIX + name, None))
+                    else:
+                        out.append((None, "RTSTRUCT needs a structure name"))
+                elif token.lower() in lookup:
+                    out.append((strip_brackets(lookup[token.lower()]), None))
+                else:
+                    # Anything else is a custom entry, as with "OT (Other)"
+                    out.append((token, None))
+            return out
+
+        return normalize_all
+
+    if key in TREATMENT_MODALITY_FIELDS:
+
+        def normalize(token):
+            option = lookup.get(token.lower())
+            if option is None:
+                return None, "not a listed treatment modality"
+            return strip_brackets(option), None
+
+    elif key in METRIC_TYPE_FIELDS:
+
+        def normalize(token):
+            option = lookup.get(token.lower())
+            if option is None:
+                return None, "not a listed metric"
+            return option, None
+
+    elif key in DOSE_METRIC_FIELDS:
+        dose_lookup = _option_lookup(DOSE_METRIC_OPTIONS)
+
+        def normalize(token):
+            match = _DOSE_PARAMETRIC.match(token)
+            if match:
+                value = int(match.group(2))
+                if not 1 <= value <= 100:
+                    return None, "D/V value must be between 1 and 100"
+                return f"{match.group(1).upper()}{value}", None
+            # Unknown names are custom metrics, as with "Other"
+            return dose_lookup.get(token.lower(), token), None
+
+    else:
+
+        def normalize(token):
+            return token, None
+
+    return _each(normalize)
+
+
+def parse(tokens, normalize, existing=()):
+    """
+    Normalize a batch. Returns (values to add, [(token, reason)] rejected);
+    values already in `existing` or repeated within the batch are skipped.
+    """
+    seen = set(existing)
+    added, rejected = [], []
+    tokens = [token.strip() for token in tokens if token.strip()]
+    for token, (value, error) in zip(tokens, normalize(tokens)):
+        if error:
+            rejected.append((token, error))
+        elif value in seen:
+            rejected.append((token, "already in the list"))
+        else:
+            seen.add(value)
+            added.append(value)
+    return added, rejected
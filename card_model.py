@@ -0,0 +1,438 @@
+from collections import OrderedDict
+from copy import deepcopy
+from dataclasses import dataclass, field
+
+import streamlit as st
+
+import change_journal
+import entities
+import state_index
+import utils
+from json_template import (
+    SCHEMA,
+    LEARNING_ARCHITECTURE,
+    DATA_INPUT_OUTPUT_TS,
+    EVALUATION_METRIC_FIELDS,
+    TASK_METRIC_MAP,
+)
+
+# Sections that are stored flat as `{section}_{field}` in session state
+FLAT_SECTIONS = (
+    "card_metadata",
+    "model_basic_information",
+    "technical_specifications",
+    "hw_and_sw",
+    "training_data",
+    "other_considerations",
+)
+
+QUALITATIVE_SIMPLE_FIELDS = (
+    "evaluators_information",
+    "explainability",
+    "citation_details",
+)
+QUALITATIVE_BLOCKS = ("likert_scoring", "turing_test", "time_saving", "other")
+
+_CARD_STATE_KEY = "_card_model_cache"
+
+APPROVED_BY_KEYS = {
+    "evaluated_by_name": "model_basic_information_clearance_approved_by_name",
+    "evaluated_by_institution": "model_basic_information_clearance_approved_by_institution",
+    "evaluated_by_contact_email": "model_basic_information_clearance_approved_by_contact_email",
+}
+
+
+def _get(key, default=""):
+    return st.session_state.get(key, default)
+
+
+def _get_with_fallbacks(key):
+    """Widget-bound values may only exist under their `_` / `__` mirrors."""
+    return (
+        st.session_state.get(key)
+        or st.session_state.get(f"_{key}")
+        or st.session_state.get(f"__{key}")
+        or ""
+    )
+
+
+def _allowed(props, task):
+    allowed_tasks = props.get("model_types")
+    return allowed_tasks is None or task in allowed_tasks
+
+
+def modality_slug(modality):
+    return modality.strip().replace(" ", "_").lower()
+
+
+@dataclass(slots=True)
+class Section:
+    name: str
+    values: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_state(cls, name, task):
+        values = {
+            key: _get(f"{name}_{key}")
+            for key, props in SCHEMA.get(name, {}).items()
+            if _allowed(props, task)
+        }
+        return cls(name, values)
+
+    def apply_to_state(self):
+        for key, value in self.values.items():
+            full_key = f"{self.name}_{key}"
+            utils.set_state(full_key, value)
+            if key.endswith("creation_date"):
+                utils.set_safe_date_field(full_key, value)
+            if isinstance(value, list):
+                utils.set_state(full_key + "_list", value)
+
+
+@dataclass(slots=True)
+class ModalitySpec:
+    """Technical characteristics of one model input/output modality."""
+
+    entry: str
+    source: str
+    values: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_state(cls, entry, source, prefix):
+        key_prefix = f"{prefix}{modality_slug(entry)}_{source}_"
+        values = {f: _get_with_fallbacks(key_prefix + f) for f in DATA_INPUT_OUTPUT_TS}
+        return cls(entry, source, values)
+
+    @classmethod
+    def from_dict(cls, data):
+        values = {k: v for k, v in data.items() if k not in ("entry", "source")}
+        return cls(data["entry"], data["source"], values)
+
+    def to_dict(self):
+        return {"entry": self.entry, "source": self.source, **self.values}
+
+    def apply_to_state(self, prefix):
+        key_prefix = f"{prefix}{modality_slug(self.entry)}_{self.source}_"
+        for key, value in self.values.items():
+            utils.set_state(key_prefix + key, value)
+            st.session_state["_" + key_prefix + key] = value
+
+
+@dataclass(slots=True)
+class LearningArchitecture:
+    id: int
+    values: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_state(cls, arch_id):
+        prefix = f"{entities.architecture_prefix(arch_id)}_"
+        values = {
+            key: st.session_state.get(prefix + key, deepcopy(default))
+            for key, default in LEARNING_ARCHITECTURE.items()
+        }
+        return cls(arch_id, values)
+
+    def to_dict(self):
+        return {**self.values, "id": self.id}
+
+    def apply_to_state(self):
+        prefix = f"{entities.architecture_prefix(self.id)}_"
+        for key, value in self.values.items():
+            utils.set_state(prefix + key, value)
+
+
+@dataclass(slots=True)
+class Metric:
+    name: str
+    values: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_state(cls, name, metric_type, eval_prefix):
+        prefix = f"{eval_prefix}.{name}_"
+        values = {f: _get(prefix + f) for f in EVALUATION_METRIC_FIELDS[metric_type]}
+        return cls(name, values)
+
+    def to_dict(self):
+        return {"name": self.name, **self.values}
+
+    def apply_to_state(self, eval_prefix):
+        prefix = f"{eval_prefix}.{self.name}_"
+        for key, value in self.values.items():
+            utils.set_state(prefix + key, value)
+
+
+@dataclass(slots=True)
+class Evaluation:
+    name: str
+    values: dict = field(default_factory=dict)
+    modalities: list = field(default_factory=list)
+    metrics: dict = field(default_factory=dict)
+    qualitative: dict = field(default_factory=dict)
+    # Session-state namespace (see entities); not part of the exported card
+    id: str | None = None
+
+    @classmethod
+    def from_state(cls, eval_id, name, task, modality_entries):
+        prefix = entities.evaluation_prefix(eval_id)
+        values = {}
+        for key, props in SCHEMA.get("evaluation_data", {}).items():
+            if not _allowed(props, task):
+                continue
+            if key.startswith("evaluated_by_") and key in values:
+                continue
+            values[key] = _get(f"{prefix}_{key}")
+            if values.get("evaluated_same_as_approved", False):
+                for eval_key, approved_key in APPROVED_BY_KEYS.items():
+                    values[eval_key] = _get(approved_key)
+
+        q_prefix = f"{prefix}_qualitative_evaluation_"
+        qualitative = {
+            "evaluators_information": _get_with_fallbacks(
+                q_prefix + "evaluators_information"
+            )
+        }
+        for block in QUALITATIVE_BLOCKS:
+            qualitative[block] = {
+                "method": _get_with_fallbacks(f"{q_prefix}{block}_method"),
+                "results": _get_with_fallbacks(f"{q_prefix}{block}_results"),
+            }
+        for simple in ("explainability", "citation_details"):
+            qualitative[simple] = _get_with_fallbacks(q_prefix + simple)
+
+        modalities = [
+            ModalitySpec.from_state(m["modality"], m["source"], f"{prefix}_")
+            for m in modality_entries
+        ]
+
+        metrics = {}
+        for metric_type in TASK_METRIC_MAP.get(task, []):
+            names = st.session_state.get(f"{prefix}_{metric_type}_list", [])
+            metrics[metric_type] = [
+                Metric.from_state(n, metric_type, prefix) for n in names
+            ]
+
+        return cls(name, values, modalities, metrics, qualitative, eval_id)
+
+    @classmethod
+    def from_dict(cls, data):
+        evaluation = cls(data["name"])
+        for key, value in data.items():
+            if key == "name":
+                continue
+            if key == "inputs_outputs_technical_specifications":
+                evaluation.modalities = [ModalitySpec.from_dict(io) for io in value]
+            elif key == "qualitative_evaluation" and isinstance(value, dict):
+                evaluation.qualitative = value
+            elif isinstance(value, list) and key.startswith("type_"):
+                evaluation.metrics[key] = [
+                    Metric(m["name"], {k: v for k, v in m.items() if k != "name"})
+                    for m in value
+                ]
+            else:
+                evaluation.values[key] = value
+        return evaluation
+
+    def to_dict(self):
+        data = {"name": self.name, **self.values}
+        data["qualitative_evaluation"] = self.qualitative
+        data = utils.insert_after(
+            data,
+            "inputs_outputs_technical_specifications",
+            [m.to_dict() for m in self.modalities],
+            "url_info",
+        )
+        return utils.insert_dict_after(
+            data,
+            {t: [m.to_dict() for m in ms] for t, ms in self.metrics.items()},
+            "additional_patient_info_ev",
+        )
+
+    def apply_to_state(self):
+        prefix = entities.evaluation_prefix(self.id)
+
+        for key, value in self.values.items():
+            full_key = f"{prefix}_{key}"
+            date_obj = utils.to_date(value) if utils.is_yyyymmdd(value) else None
+            if date_obj:
+                widget_key = f"{full_key}_widget"
+                utils.set_state(widget_key, date_obj)
+                st.session_state[f"_{widget_key}"] = date_obj
+            utils.set_state(full_key, value)
+
+        for modality in self.modalities:
+            modality.apply_to_state(f"{prefix}_")
+
+        q_prefix = f"{prefix}_qualitative_evaluation_"
+        if self.qualitative:
+            for simple in QUALITATIVE_SIMPLE_FIELDS:
+                qval = self.qualitative.get(simple, "")
+                utils.set_state(q_prefix + simple, qval)
+                st.session_state["_" + q_prefix + simple] = qval
+            for block in QUALITATIVE_BLOCKS:
+                b = self.qualitative.get(block, {})
+                if isinstance(b, dict):
+                    for part in ("method", "results"):
+                        qkey = f"{q_prefix}{block}_{part}"
+                        utils.set_state(qkey, b.get(part, ""))
+                        st.session_state["_" + qkey] = b.get(part, "")
+
+        for metric_type, metrics in self.metrics.items():
+            names = [m.name for m in metrics]
+            utils.set_state(f"{prefix}_{metric_type}_list", names)
+            utils.set_state(f"{prefix}_{metric_type}", names)
+            for metric in metrics:
+                metric.apply_to_state(prefix)
+
+
+@dataclass(slots=True)
+class ModelCard:
+    """
+    In-memory model card tree.
+
+    Built either from session state (widgets stay bound to their flat keys,
+    which are looked up directly through the key index) or from a loaded
+    JSON document, and serialised back to the exported JSON layout.
+    """
+
+    task: str | None = None
+    sections: dict = field(default_factory=dict)
+    learning_architectures: list = field(default_factory=list)
+    training_modalities: list = field(default_factory=list)
+    evaluations: list = field(default_factory=list)
+
+    @classmethod
+    def from_session_state(cls):
+        task = st.session_state.get("task")
+        card = cls(task=task)
+        for name in FLAT_SECTIONS:
+            card.sections[name] = Section.from_state(name, task)
+
+        card.learning_architectures = [
+            LearningArchitecture.from_state(arch_id)
+            for arch_id in entities.architecture_ids()
+        ]
+
+        modality_entries = state_index.modality_entries()
+        card.training_modalities = training_modalities_from_state(modality_entries)
+        card.evaluations = evaluations_from_state(modality_entries)
+        return card
+
+    @classmethod
+    def from_dict(cls, data):
+        card = cls(task=data.get("task"))
+        for section, content in data.items():
+            if not isinstance(content, (dict, list)):
+                continue
+            if section == "evaluations":
+                card.evaluations = [Evaluation.from_dict(e) for e in content]
+            elif section == "technical_specifications":
+                values = {}
+                for k, v in content.items():
+                    if k == "learning_architectures" and isinstance(v, list):
+                        card.learning_architectures = [
+                            LearningArchitecture(
+                                i, {f: x for f, x in arch.items() if f != "id"}
+                            )
+                            for i, arch in enumerate(v)
+                        ]
+                    elif k == "hw_and_sw" and isinstance(v, dict):
+                        card.sections["hw_and_sw"] = Section("hw_and_sw", dict(v))
+                    else:
+                        values[k] = v
+                card.sections[section] = Section(section, values)
+            elif section == "training_data":
+                values = dict(content)
+                ios = values.pop("inputs_outputs_technical_specifications", [])
+                card.training_modalities = [ModalitySpec.from_dict(io) for io in ios]
+                card.sections[section] = Section(section, values)
+            elif isinstance(content, dict):
+                card.sections[section] = Section(section, dict(content))
+        return card
+
+    def section_values(self, name):
+        section = self.sections.get(name)
+        return dict(section.values) if section else {}
+
+    def to_dict(self):
+        data = OrderedDict()
+        if self.task:
+            data["task"] = self.task
+        data["card_metadata"] = self.section_values("card_metadata")
+        data["model_basic_information"] = self.section_values("model_basic_information")
+
+        tech = self.section_values("technical_specifications")
+        tech["learning_architectures"] = [
+            a.to_dict() for a in self.learning_architectures
+        ]
+        tech["hw_and_sw"] = self.section_values("hw_and_sw")
+        data["technical_specifications"] = tech
+
+        data["training_data"] = utils.insert_after(
+            self.section_values("training_data"),
+            "inputs_outputs_technical_specifications",
+            [m.to_dict() for m in self.training_modalities],
+            "url_info",
+        )
+        data["evaluations"] = [e.to_dict() for e in self.evaluations]
+        data["other_considerations"] = self.section_values("other_considerations")
+        return data
+
+    def apply_to_session_state(self):
+        if self.task:
+            utils.set_state("task", self.task)
+
+        for name, section in self.sections.items():
+            if name != "hw_and_sw":
+                section.apply_to_state()
+        if "hw_and_sw" in self.sections:
+            for key, value in self.sections["hw_and_sw"].values.items():
+                utils.set_state(f"hw_and_sw_{key}", value)
+
+        if self.learning_architectures:
+            ids = entities.set_architectures(len(self.learning_architectures))
+            for arch, arch_id in zip(self.learning_architectures, ids):
+                arch.id = arch_id
+                arch.apply_to_state()
+
+        for modality in self.training_modalities:
+            modality.apply_to_state("training_data_")
+
+        if self.evaluations:
+            ids = entities.set_evaluations([e.name for e in self.evaluations])
+            for evaluation, eval_id in zip(self.evaluations, ids):
+                evaluation.id = eval_id
+                evaluation.apply_to_state()
+
+
+def training_modalities_from_state(modality_entries=None):
+    if modality_entries is None:
+        modality_entries = state_index.modality_entries()
+    return [
+        ModalitySpec.from_state(m["modality"], m["source"], "training_data_")
+        for m in modality_entries
+    ]
+
+
+def evaluations_from_state(modality_entries=None):
+    task = st.session_state.get("task", "Other")
+    if modality_entries is None:
+        modality_entries = state_index.modality_entries()
+    return [
+        Evaluation.from_state(eval_id, name, task, modality_entries)
+        for eval_id, name in entities.evaluations()
+    ]
+
+
+def current_card():
+    """
+    ModelCard of this session, built once per card revision (see
+    change_journal) and shared by the JSON export and the markdown renderer.
+    Treat it as read-only.
+    """
+    revision = change_journal.revision()
+    cached = st.session_state.get(_CARD_STATE_KEY)
+    if cached is not None and cached[0] == revision:
+        return cached[1]
+    card = ModelCard.from_session_state()
+    st.session_state[_CARD_STATE_KEY] = (revision, card)
+    return card
@@ -0,0 +1,108 @@
+"""
+Session revision counter and field-level change journal.
+
+Every data write (utils.set_state / utils.delete_state, default seeding in
+utils.load_value, the appendix file registry) calls record(key): the
+session's revision is bumped and (revision, key) is appended to a ring buffer
+holding the last JOURNAL_SIZE changes. Caches of derived output (card JSON,
+markdown sections, README) key on revision(); a consumer holding an older
+revision can ask changed_since() for the keys, or dirty_sections() for the
+schema sections, written since. Both return None once the journal no longer
+reaches back that far, meaning "recompute everything".
+
+Revisions come from one process-wide counter, so a value is never reused,
+even after a session's state is cleared.
+"""
+
+import itertools
+import os
+from collections import deque
+
+import streamlit as st
+
+import schema_views
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+JOURNAL_SIZE = max(16, _env_int("MODEL_CARD_JOURNAL_SIZE", 512))
+
+_JOURNAL_STATE_KEY = "_change_journal"
+_revisions = itertools.count(1)
+
+EVAL_SECTION = "evaluation_data_methodology_results_commisioning"
+
+
+class ChangeJournal:
+    """Revision of one session's card plus its most recent changed keys."""
+
+    __slots__ = ("revision", "floor", "entries")
+
+    def __init__(self):
+        self.revision = next(_revisions)
+        # changes at or before `floor` are no longer in the journal
+        self.floor = self.revision
+        self.entries = deque(maxlen=JOURNAL_SIZE)
+
+    def record(self, key):
+        if len(self.entries) == self.entries.maxlen:
+            self.floor = self.entries[0][0]
+        self.revision = next(_revisions)
+        self.entries.append((self.revision, key))
+        return self.revision
+
+    def changed_since(self, revision):
+        """Keys written after `revision`, or None if that is beyond the journal."""
+        if revision is None or revision < self.floor or revision > self.revision:
+            return None
+        keys = set()
+        for rev, key in reversed(self.entries):
+            if rev <= revision:
+                break
+            keys.add(key)
+        return keys
+
+
+def get_journal():
+    journal = st.session_state.get(_JOURNAL_STATE_KEY)
+    if journal is None:
+        journal = ChangeJournal()
+        st.session_state[_JOURNAL_STATE_KEY] = journal
+    return journal
+
+
+def record(key):
+    return get_journal().record(key)
+
+
+def revision():
+    """Current revision of this session's card; changes on every data write."""
+    return get_journal().revision
+
+
+def changed_since(revision):
+    return get_journal().changed_since(revision)
+
+
+def section_of(key):
+    """Schema section a session key belongs to (the key itself if none)."""
+    schema = schema_views.get_compiled_schema()
+    for section in sorted(schema, key=len, reverse=True):
+        if key == section or key.startswith(f"{section}_"):
+            return section
+    if key.startswith("evaluation_"):
+        return EVAL_SECTION
+    return key
+
+
+def dirty_sections(revision):
+    """Schema sections written after `revision`, or None (see changed_since)."""
+    keys = changed_since(revision)
+    if keys is None:
+        return None
+    return {section_of(key) for key in keys}
@@ -1,32 +1,59 @@
 import streamlit as st
 import utils
+import change_journal
+import upload_store
+import session_memory
 import base64
 import uuid
 from pathlib import Path
 
-model_card_schema = utils.get_model_card_schema()
-
-UPLOAD_DIR = Path("uploads/appendix")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+def _format_mb(num_bytes):
+    return f"{num_bytes / (1024 * 1024):.1f} MB"
+
+
+def _render_storage_usage():
+    usage = upload_store.usage()
+    quota = usage["session_quota"]
+    if quota:
+        st.progress(
+            min(usage["session_bytes"] / quota, 1.0),
+            text=(
+                f"Storage used by your uploads: {_format_mb(usage['session_bytes'])} "
+                f"of {_format_mb(quota)} ({usage['session_files']} files)"
+            ),
+        )
+    else:
+        st.caption(
+            f"Storage used by your uploads: {_format_mb(usage['session_bytes'])} "
+            f"({usage['session_files']} files)"
+        )
+    if usage["global_quota"]:
+        st.caption(
+            f"Server upload storage: {_format_mb(usage['global_bytes'])} "
+            f"of {_format_mb(usage['global_quota'])} in use. Files are removed "
+            f"{upload_store.UPLOAD_SESSION_TTL_S // 3600} h after your session ends."
+        )
+
+
+def _render_session_memory():
+    with st.expander("Session memory by key family", expanded=False):
+        report = session_memory.session_memory_by_family()
+        st.table(
+            [
+                {
+                    "Family": family,
+                    "Keys": entry["keys"],
+                    "Memory": _format_mb(entry["bytes"]),
+                    "Largest key": entry["largest"][0] or "",
+                }
+                for family, entry in report.items()
+            ]
+        )
+        total = sum(entry["bytes"] for entry in report.values())
+        st.caption(f"Approximate total held in this session's state: {_format_mb(total)}")
 
-def _safe_remove(path_str: str):
-    try:
-        Path(path_str).unlink(missing_ok=True)
-    except Exception:
-        pass
 
 def appendix_render():
-    st.markdown("""
-    <style>
-    /* hide Streamlit Cloud’s top-right toolbar (includes the GitHub icon) */
-    div[data-testid="stToolbar"] { visibility: hidden; height: 0; }
-
-    /* optional: also hide the 'Manage app' badge and footer */
-    a[data-testid="viewerBadge_link"] { display: none !important; }
-    div[data-testid="stStatusWidget"] { display: none !important; }
-    footer { visibility: hidden; }
-    </style>
-    """, unsafe_allow_html=True)
     from side_bar import sidebar_render
     sidebar_render()
 
@@ -70,27 +97,30 @@ def appendix_render():
             if file.name not in st.session_state.appendix_uploads:
                 unique_id = uuid.uuid4().hex[:8]
                 stored_name = f"appendix_{unique_id}_{file.name}"
-                save_path = UPLOAD_DIR / stored_name
-                with open(save_path, "wb") as f:
-                    f.write(file.getbuffer())
+                # Registered in render_uploads for markdown renderer normalization
+                try:
+                    record = upload_store.store_upload(stored_name, file)
+                except upload_store.UploadQuotaExceeded as e:
+                    st.session_state.appendix_upload_error = f"{file.name}: {e}"
+                    break
 
                 st.session_state.appendix_uploads[file.name] = {
                     "custom_label": "",
-                    "path": str(save_path),
+                    "path": record["path"],
                     "stored_name": stored_name,
                 }
-
-                # Register for markdown renderer normalization
-                st.session_state.render_uploads[stored_name] = {
-                    "path": str(save_path),
-                    "name": file.name,
-                }
-                st.session_state.all_uploaded_paths.add(str(save_path))
+                change_journal.record("appendix_uploads")
 
         # Bump nonce and rerun so the uploader re-mounts with a fresh key (no selected files, no "×")
         st.session_state.appendix_uploader_nonce += 1
         st.rerun()
 
+    upload_error = st.session_state.pop("appendix_upload_error", None)
+    if upload_error:
+        st.error(upload_error)
+    _render_storage_usage()
+    _render_session_memory()
+
     # --- Display uploaded files (from our registry only) ---
     if st.session_state.appendix_uploads:
         utils.title("Files Uploaded")
@@ -99,12 +129,13 @@ def appendix_render():
         # Iterate over a snapshot to allow mutation during loop
         for original_name, file_data in list(st.session_state.appendix_uploads.items()):
             file_path = file_data["path"]
-            file_ext = Path(file_path).suffix.lower()
+            # Blobs are stored by content hash; the type comes from the original name
+            file_ext = Path(original_name).suffix.lower()
 
             col1, col2, col3 = st.columns([3, 5, 1])
             with col1:
                 st.markdown(f"**{original_name}**")
-                st.caption(Path(file_path).name)
+                st.caption(file_data["stored_name"])
             with col2:
                 label_key = f"label_{original_name}"
                 label_val = st.text_input(
@@ -114,14 +145,15 @@ def appendix_render():
                     placeholder="Indicate here the Figure/ File number e.g., Fig 1",
                     label_visibility="collapsed",
                 )
-                st.session_state.appendix_uploads[original_name]["custom_label"] = label_val
+                if label_val != file_data.get("custom_label", ""):
+                    file_data["custom_label"] = label_val
+                    change_journal.record("appendix_uploads")
             with col3:
                 # Explicit delete (doesn't rely on uploader)
                 if st.button("Delete", key=f"del_{file_data['stored_name']}"):
-                    _safe_remove(file_path)
-                    st.session_state.all_uploaded_paths.discard(file_path)
-                    st.session_state.render_uploads.pop(file_data["stored_name"], None)
+                    upload_store.detach(file_data["stored_name"])
                     st.session_state.appendix_uploads.pop(original_name, None)
+                    change_journal.record("appendix_uploads")
                     # No need to rerun manually; button click already triggers a rerun
 
             # Preview
@@ -135,7 +167,7 @@ def appendix_render():
                 if preview_supported:
                     with st.expander("Preview", expanded=False):
                         if file_ext in [".png", ".jpg", ".jpeg", ".gif"]:
-                            st.image(file_path, use_container_width=True)
+                            st.image(Path(file_path).read_bytes(), use_container_width=True)
                         elif file_ext == ".pdf":
                             with open(file_path, "rb") as f:
                                 base64_pdf = base64.b64encode(f.read()).decode("utf-8")
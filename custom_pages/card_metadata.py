@@ -6,17 +6,6 @@ from render import create_helpicon, render_field
 
 def card_metadata_render():
     utils.hide_streamlit_chrome()
-    st.markdown("""
-    <style>
-    /* hide Streamlit Cloud’s top-right toolbar (includes the GitHub icon) */
-    div[data-testid="stToolbar"] { visibility: hidden; height: 0; }
-
-    /* optional: also hide the 'Manage app' badge and footer */
-    a[data-testid="viewerBadge_link"] { display: none !important; }
-    div[data-testid="stStatusWidget"] { display: none !important; }
-    footer { visibility: hidden; }
-    </style>
-    """, unsafe_allow_html=True)
             
     from side_bar import sidebar_render
 
@@ -38,7 +27,7 @@ def card_metadata_render():
 
         # Only load if a real stored value exists, not default today
         if "card_metadata_card_creation_date" not in st.session_state:
-            st.session_state["card_metadata_card_creation_date"] = None
+            utils.set_state("card_metadata_card_creation_date", None)
 
         st.date_input(
             "Click and select a date",
@@ -50,14 +39,11 @@ def card_metadata_render():
 
         user_date = st.session_state.get("_card_metadata_card_creation_date")
 
-        if user_date:
-            formatted = user_date.strftime("%Y%m%d")
-            st.session_state["card_metadata_card_creation_date"] = formatted
-        elif required and user_date is not None:
-            st.session_state["card_metadata_card_creation_date"] = None
+        formatted = user_date.strftime("%Y%m%d") if user_date else None
+        if st.session_state.get("card_metadata_card_creation_date") != formatted:
+            utils.set_state("card_metadata_card_creation_date", formatted)
+        if required and user_date is not None and not user_date:
             st.error("Creation date is required. Please select a valid date.")
-        else:
-            st.session_state["card_metadata_card_creation_date"] = None
 
     utils.section_divider()
     utils.title_header("Versioning")
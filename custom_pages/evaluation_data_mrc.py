@@ -1,16 +1,86 @@
 import streamlit as st
 from datetime import datetime
 import utils
+import entities
+import schema_views
+import state_index
 from render import (
     create_helpicon,
     render_field,
     render_fields,
     has_renderable_fields,
+    item_navigator,
     render_image_field,
     should_render,
 )
 
 
+def _render_modality_fields(section, entry, tech_section_prefix):
+    modality = entry["modality"]
+    source = entry["source"]
+    clean_modality = modality.strip().replace(" ", "_").lower()
+    utils.title_header(
+        f"{utils.strip_brackets(modality)} — {source.replace('_', ' ').capitalize()}",
+        size="1rem",
+    )
+
+    field_keys = {
+        "image_resolution": section["image_resolution"],
+        "patient_positioning": section["patient_positioning"],
+        "scanner_model": section["scanner_model"],
+        "scan_acquisition_parameters": section["scan_acquisition_parameters"],
+        "scan_reconstruction_parameters": section["scan_reconstruction_parameters"],
+        "fov": section["fov"],
+    }
+
+    field_keys = {
+        name: schema_views.with_props(
+            f, placeholder=f.get("placeholder", "N/A or NA if Not Applicable")
+        )
+        for name, f in field_keys.items()
+    }
+
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        render_field(
+            f"{clean_modality}_{source}_image_resolution",
+            field_keys["image_resolution"],
+            tech_section_prefix,
+        )
+    with col2:
+        render_field(
+            f"{clean_modality}_{source}_patient_positioning",
+            field_keys["patient_positioning"],
+            tech_section_prefix,
+        )
+
+    render_field(
+        f"{clean_modality}_{source}_scanner_model",
+        field_keys["scanner_model"],
+        tech_section_prefix,
+    )
+
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        render_field(
+            f"{clean_modality}_{source}_scan_acquisition_parameters",
+            field_keys["scan_acquisition_parameters"],
+            tech_section_prefix,
+        )
+    with col2:
+        render_field(
+            f"{clean_modality}_{source}_scan_reconstruction_parameters",
+            field_keys["scan_reconstruction_parameters"],
+            tech_section_prefix,
+        )
+
+    render_field(
+        f"{clean_modality}_{source}_fov",
+        field_keys["fov"],
+        tech_section_prefix,
+    )
+
+
 def render_evaluation_section(schema_section, section_prefix, current_task):
     utils.require_task()
 
@@ -27,7 +97,7 @@ def render_evaluation_section(schema_section, section_prefix, current_task):
         widget_key = f"{section_prefix}_evaluation_date"
 
         if widget_key not in st.session_state:
-            st.session_state[widget_key] = None
+            utils.set_state(widget_key, None)
 
         st.date_input(
             "Click and select a date",
@@ -41,14 +111,11 @@ def render_evaluation_section(schema_section, section_prefix, current_task):
 
         user_date = st.session_state.get(f"_{widget_key}")
 
-        if user_date:
-            formatted = user_date.strftime("%Y%m%d")
-            st.session_state[widget_key] = formatted
-        elif required and user_date is not None:
-            st.session_state[widget_key] = None
+        formatted = user_date.strftime("%Y%m%d") if user_date else None
+        if st.session_state.get(widget_key) != formatted:
+            utils.set_state(widget_key, formatted)
+        if required and user_date is not None and not user_date:
             st.error("Date of evaluation is required. Please select a valid date.")
-        else:
-            st.session_state[widget_key] = None
 
     utils.section_divider()
 
@@ -143,89 +210,19 @@ def render_evaluation_section(schema_section, section_prefix, current_task):
     tech_section_prefix = section_prefix
     section = schema_section
 
-    modality_entries = []
-
-    for key, value in st.session_state.items():
-        if key.endswith("model_inputs") and isinstance(value, list):
-            for item in value:
-                modality_entries.append({"modality": item, "source": "model_inputs"})
-        elif key.endswith("model_outputs") and isinstance(value, list):
-            for item in value:
-                modality_entries.append({"modality": item, "source": "model_outputs"})
+    modality_entries = state_index.modality_entries()
 
     if not modality_entries:
         st.warning(
             "Start by adding model inputs and outputs in the Technical Specifications section to enable technical details."
         )
     else:
-        tabs = st.tabs([utils.strip_brackets(m["modality"]) for m in modality_entries])
-
-        for idx, entry in enumerate(modality_entries):
-            modality = entry["modality"]
-            source = entry["source"]
-
-            with tabs[idx]:
-                clean_modality = modality.strip().replace(" ", "_").lower()
-                utils.title_header(
-                    f"{utils.strip_brackets(modality)} — {source.replace('_', ' ').capitalize()}",
-                    size="1rem",
-                )
-
-                field_keys = {
-                    "image_resolution": section["image_resolution"],
-                    "patient_positioning": section["patient_positioning"],
-                    "scanner_model": section["scanner_model"],
-                    "scan_acquisition_parameters": section[
-                        "scan_acquisition_parameters"
-                    ],
-                    "scan_reconstruction_parameters": section[
-                        "scan_reconstruction_parameters"
-                    ],
-                    "fov": section["fov"],
-                }
-
-                for f in field_keys.values():
-                    f["placeholder"] = f.get("placeholder", "N/A or NA if Not Applicable")
-
-                col1, col2 = st.columns([1, 1])
-                with col1:
-                    render_field(
-                        f"{clean_modality}_{source}_image_resolution",
-                        field_keys["image_resolution"],
-                        tech_section_prefix,
-                    )
-                with col2:
-                    render_field(
-                        f"{clean_modality}_{source}_patient_positioning",
-                        field_keys["patient_positioning"],
-                        tech_section_prefix,
-                    )
-
-                render_field(
-                    f"{clean_modality}_{source}_scanner_model",
-                    field_keys["scanner_model"],
-                    tech_section_prefix,
-                )
-
-                col1, col2 = st.columns([1, 1])
-                with col1:
-                    render_field(
-                        f"{clean_modality}_{source}_scan_acquisition_parameters",
-                        field_keys["scan_acquisition_parameters"],
-                        tech_section_prefix,
-                    )
-                with col2:
-                    render_field(
-                        f"{clean_modality}_{source}_scan_reconstruction_parameters",
-                        field_keys["scan_reconstruction_parameters"],
-                        tech_section_prefix,
-                    )
-
-                render_field(
-                    f"{clean_modality}_{source}_fov",
-                    field_keys["fov"],
-                    tech_section_prefix,
-                )
+        idx = item_navigator(
+            "Modality",
+            [utils.strip_brackets(m["modality"]) for m in modality_entries],
+            f"{section_prefix}__active_modality",
+        )
+        _render_modality_fields(section, modality_entries[idx], tech_section_prefix)
 
     ####################################
     # EXCLUSIVE TO DOSE PREDICTION TASK
@@ -888,18 +885,15 @@ def render_evaluation_section(schema_section, section_prefix, current_task):
             render_field("citation_details", qeval["citation_details"], q_prefix)
 
 
+@st.fragment
+def _evaluation_editor(schema_section, section_prefix, task):
+    # Fragment: edits rerun the open evaluation form only, not the whole page
+    render_evaluation_section(
+        schema_section, section_prefix=section_prefix, current_task=task
+    )
+
+
 def evaluation_data_mrc_render():
-    st.markdown("""
-    <style>
-    /* hide Streamlit Cloud’s top-right toolbar (includes the GitHub icon) */
-    div[data-testid="stToolbar"] { visibility: hidden; height: 0; }
-
-    /* optional: also hide the 'Manage app' badge and footer */
-    a[data-testid="viewerBadge_link"] { display: none !important; }
-    div[data-testid="stStatusWidget"] { display: none !important; }
-    footer { visibility: hidden; }
-    </style>
-    """, unsafe_allow_html=True)
     from side_bar import sidebar_render
 
     sidebar_render()
@@ -912,15 +906,18 @@ def evaluation_data_mrc_render():
 
     task = st.session_state.get("task", "Image-to-Image translation")
 
-    if "evaluation_forms" not in st.session_state:
-        st.session_state.evaluation_forms = []
+    if entities.EVALUATIONS_KEY not in st.session_state:
+        utils.set_state(entities.EVALUATIONS_KEY, {})
 
     with st.expander("Add New Evaluation Form"):
         new_form_name = st.text_input("Evaluation name", key="new_eval_name")
         if st.button("Add Evaluation Form"):
             if new_form_name:
-                if new_form_name not in st.session_state.evaluation_forms:
-                    st.session_state.evaluation_forms.append(new_form_name)
+                if new_form_name not in entities.evaluation_names():
+                    entities.add_evaluation(new_form_name)
+                    st.session_state.evaluation_forms__active = (
+                        len(entities.evaluation_ids()) - 1
+                    )
                     st.success(f"Added evaluation form: {new_form_name}")
                     st.rerun()
                 else:
@@ -928,30 +925,60 @@ def evaluation_data_mrc_render():
             else:
                 st.warning("Please enter a name for the evaluation form.")
 
-    form_to_delete = None
+    forms = entities.evaluations()
+    if forms:
+        names = [name for _, name in forms]
+        active = item_navigator("Evaluation form", names, "evaluation_forms__active")
+        eval_id, form_name = forms[active]
+        col1, col2, col3, col4, col5 = st.columns([0.2, 0.1, 0.1, 0.25, 0.35])
+        with col1:
+            delete = st.button("Delete", key=f"delete_eval_{eval_id}")
+        with col2:
+            move_up = st.button(
+                "▲", key=f"move_up_eval_{eval_id}", disabled=active == 0
+            )
+        with col3:
+            move_down = st.button(
+                "▼", key=f"move_down_eval_{eval_id}", disabled=active == len(forms) - 1
+            )
+        with col4:
+            duplicate = st.button("Duplicate", key=f"duplicate_eval_{eval_id}")
+        with col5:
+            with st.popover("Rename"):
+                new_name = st.text_input(
+                    "New name", value=form_name, key=f"rename_eval_{eval_id}"
+                )
+                if st.button("Rename", key=f"rename_eval_{eval_id}_apply"):
+                    if not new_name:
+                        st.warning("Please enter a name for the evaluation form.")
+                    elif new_name != form_name and new_name in names:
+                        st.warning("An evaluation form with this name already exists.")
+                    else:
+                        # Keys hang off the id, so only the registry changes
+                        entities.rename_evaluation(eval_id, new_name)
+                        st.rerun()
+
+        if delete:
+            entities.delete_evaluation(eval_id)
+            st.session_state.evaluation_forms__active = max(0, active - 1)
+            st.rerun()
+        if duplicate:
+            entities.duplicate_evaluation(eval_id)
+            st.session_state.evaluation_forms__active = active + 1
+            st.rerun()
+        if move_up or move_down:
+            offset = -1 if move_up else 1
+            entities.move_evaluation(eval_id, offset)
+            st.session_state.evaluation_forms__active = active + offset
+            st.rerun()
 
-    for form_name in list(st.session_state.evaluation_forms):
-        with st.expander(f"{form_name}", expanded=False):
-            section_prefix = f"evaluation_{form_name.replace(' ', '_')}"
-            render_evaluation_section(
+        with st.container(border=True):
+            _evaluation_editor(
                 model_card_schema["evaluation_data_methodology_results_commisioning"],
-                section_prefix=section_prefix,
-                current_task=task,
+                entities.evaluation_prefix(eval_id),
+                task,
             )
 
-            col1, col2 = st.columns([0.2, 0.8])
-            with col1:
-                if st.button("Delete", key=f"delete_eval_{form_name}"):
-                    form_to_delete = form_name
-
-    if form_to_delete:
-        st.session_state.evaluation_forms.remove(form_to_delete)
-        prefix = f"evaluation_{form_to_delete.replace(' ', '_')}_"
-        for key in list(st.session_state.keys()):
-            if key.startswith(prefix):
-                del st.session_state[key]
-        st.rerun()
-
     st.markdown("<br>", unsafe_allow_html=True)
     col1, col2, col3, col4, col5 = st.columns([1.5, 2, 4.3, 2, 1.1])
 
@@ -1,22 +1,12 @@
 from datetime import datetime
 import streamlit as st
 import utils
+import schema_views
 from render import create_helpicon, render_field
 
 
 def model_basic_information_render():
     utils.hide_streamlit_chrome()
-    st.markdown("""
-    <style>
-    /* hide Streamlit Cloud’s top-right toolbar (includes the GitHub icon) */
-    div[data-testid="stToolbar"] { visibility: hidden; height: 0; }
-
-    /* optional: also hide the 'Manage app' badge and footer */
-    a[data-testid="viewerBadge_link"] { display: none !important; }
-    div[data-testid="stStatusWidget"] { display: none !important; }
-    footer { visibility: hidden; }
-    </style>
-    """, unsafe_allow_html=True)
     from side_bar import sidebar_render
 
     sidebar_render()
@@ -41,7 +31,7 @@ def model_basic_information_render():
                 create_helpicon(label, description, field_type, example, required)
 
                 if "model_basic_information_creation_date" not in st.session_state:
-                    st.session_state["model_basic_information_creation_date"] = None
+                    utils.set_state("model_basic_information_creation_date", None)
 
                 st.date_input(
                     "Click and select a date",
@@ -57,16 +47,14 @@ def model_basic_information_render():
                     "_model_basic_information_creation_date"
                 )
 
-                if user_date:
-                    formatted = user_date.strftime("%Y%m%d")
-                    st.session_state["model_basic_information_creation_date"] = (
-                        formatted
-                    )
-                elif required and user_date is not None:
-                    st.session_state["model_basic_information_creation_date"] = None
+                formatted = user_date.strftime("%Y%m%d") if user_date else None
+                if (
+                    st.session_state.get("model_basic_information_creation_date")
+                    != formatted
+                ):
+                    utils.set_state("model_basic_information_creation_date", formatted)
+                if required and user_date is not None and not user_date:
                     st.error("Creation date is required. Please select a valid date.")
-                else:
-                    st.session_state["model_basic_information_creation_date"] = None
 
     utils.section_divider()
     utils.title_header("Versioning")
@@ -76,10 +64,9 @@ def model_basic_information_render():
     if "version_number" in section and "version_changes" in section:
         col1, col2 = st.columns([1, 3])
         with col1:
-            section["version_number"]["placeholder"] = "MM.mm.bbbb"
             render_field(
                 "version_number",
-                section["version_number"],
+                schema_views.with_props(section["version_number"], placeholder="MM.mm.bbbb"),
                 "model_basic_information",
             )
         with col2:
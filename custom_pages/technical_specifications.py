@@ -1,20 +1,74 @@
 import streamlit as st
+import entities
 import utils
-from render import render_field, render_image_field
+from render import item_navigator, render_field, render_image_field
+
+
+@st.fragment
+def _learning_architecture_editor(section, prefix):
+    # Fragment: edits rerun this editor only, not the whole page
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        render_field(
+            "total_number_trainable_parameters",
+            section["total_number_trainable_parameters"],
+            prefix,
+        )
+    with col2:
+        render_field("number_of_inputs", section["number_of_inputs"], prefix)
+
+    render_field("input_content", section["input_content"], prefix)
+
+    render_field(
+        "additional_information_input_content",
+        section["additional_information_input_content"],
+        prefix,
+    )
+
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        render_field("input_format", section["input_format"], prefix)
+    with col2:
+        render_field("input_size", section["input_size"], prefix)
+
+    render_field("number_of_outputs", section["number_of_outputs"], prefix)
+    render_field("output_content", section["output_content"], prefix)
+    render_field(
+        "additional_information_output_content",
+        section["additional_information_output_content"],
+        prefix,
+    )
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        render_field("output_format", section["output_format"], prefix)
+    with col2:
+        render_field("output_size", section["output_size"], prefix)
+
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        render_field("loss_function", section["loss_function"], prefix)
+    with col2:
+        render_field("batch_size", section["batch_size"], prefix)
+    with col3:
+        render_field("regularisation", section["regularisation"], prefix)
+
+    render_image_field(
+        "architecture_figure",
+        section["architecture_figure"],
+        prefix,
+    )
+
+    for field in [
+        "uncertainty_quantification_techniques",
+        "explainability_techniques",
+        "additional_information_ts",
+        "citation_details_ts",
+    ]:
+        if field in section:
+            render_field(field, section[field], prefix)
 
 
 def technical_specifications_render():
-    st.markdown("""
-    <style>
-    /* hide Streamlit Cloud’s top-right toolbar (includes the GitHub icon) */
-    div[data-testid="stToolbar"] { visibility: hidden; height: 0; }
-
-    /* optional: also hide the 'Manage app' badge and footer */
-    a[data-testid="viewerBadge_link"] { display: none !important; }
-    div[data-testid="stStatusWidget"] { display: none !important; }
-    footer { visibility: hidden; }
-    </style>
-    """, unsafe_allow_html=True)
     from side_bar import sidebar_render
 
     sidebar_render()
@@ -24,8 +78,8 @@ def technical_specifications_render():
         "(i.e. model pipeline, learning architecture, software and hardware)"
     )
 
-    if "learning_architecture_forms" not in st.session_state:
-        st.session_state.learning_architecture_forms = {"Learning Architecture 1": {}}
+    if entities.ARCHITECTURES_KEY not in st.session_state:
+        entities.add_architecture()
 
     utils.title_header("1. Model overview", size="1.35rem")
     utils.title_header("Model pipeline")
@@ -62,11 +116,10 @@ def technical_specifications_render():
     utils.light_header_italics(
         "If several models are used (e.g. cascade, cycle, tree,...), repeat this section for each of them."
     )
-    if "selected_learning_arch_to_delete" not in st.session_state:
-        st.session_state.selected_learning_arch_to_delete = None
-
     with st.container():
         col1, col2, col3 = st.columns([1.8, 2, 1.2])
+        arch_ids = entities.architecture_ids()
+        labels = [entities.architecture_label(i) for i in range(len(arch_ids))]
 
         with col1:
             st.markdown("<div style='margin-top: 6px;'>", unsafe_allow_html=True)
@@ -74,14 +127,14 @@ def technical_specifications_render():
             st.markdown("</div>", unsafe_allow_html=True)
 
         with col2:
-            forms = list(st.session_state.learning_architecture_forms.keys())
             st.markdown(
                 "<div style='height: 1px; margin-top: -28px;'></div>",
                 unsafe_allow_html=True,
             )
-            delete_index = st.selectbox(
+            delete_position = st.selectbox(
                 label=".",
-                options=forms,
+                options=range(len(arch_ids)),
+                format_func=labels.__getitem__,
                 index=0,
                 key="learning_architecture_delete_select_clean",
                 label_visibility="collapsed",
@@ -90,112 +143,30 @@ def technical_specifications_render():
         with col3:
             st.markdown("<div style='margin-top: 6px;'>", unsafe_allow_html=True)
             if st.button("Delete", key="delete_learning_arch_clean"):
-                if not delete_index:
+                if delete_position is None:
                     st.warning("Please select a model to delete.")
                 else:
-                    selected_key = delete_index
-                    selected_index = int(selected_key.split()[-1])
-
-                    st.session_state.learning_architecture_forms.pop(selected_key)
-
-                    keys_to_remove = [
-                        k
-                        for k in list(st.session_state.keys())
-                        if k.startswith(f"learning_architecture_{selected_index}_")
-                    ]
-                    for k in keys_to_remove:
-                        del st.session_state[k]
-
-                    for i in range(selected_index + 1, len(forms) + 1):
-                        old_prefix = f"learning_architecture_{i}_"
-                        new_prefix = f"learning_architecture_{i - 1}_"
-                        for k in list(st.session_state.keys()):
-                            if k.startswith(old_prefix):
-                                new_key = k.replace(old_prefix, new_prefix)
-                                st.session_state[new_key] = st.session_state.pop(k)
-
+                    # Only the deleted architecture's keys go; the others
+                    # keep their ids, so nothing is renamed
+                    entities.delete_architecture(arch_ids[delete_position])
                     st.rerun()
             st.markdown("</div>", unsafe_allow_html=True)
 
         if st.session_state.get("add_learning_arch", False):
-            n = len(st.session_state.learning_architecture_forms)
-            st.session_state.learning_architecture_forms[
-                f"Learning Architecture {n + 1}"
-            ] = {}
+            entities.add_architecture()
+            st.session_state.learning_architecture__active = len(arch_ids)
             st.rerun()
 
-    tab_labels = list(st.session_state.learning_architecture_forms.keys())
-    if not tab_labels:
+    if not arch_ids:
         st.warning("At least one learning architecture is required. Please add one.")
     else:
-        tabs = st.tabs(tab_labels)
-
-        for i, tab in enumerate(tabs):
-            with tab:
-                section = model_card_schema["learning_architecture"]
-                prefix = f"learning_architecture_{i}"
-
-                col1, col2 = st.columns([2, 1])
-                with col1:
-                    render_field(
-                        "total_number_trainable_parameters",
-                        section["total_number_trainable_parameters"],
-                        prefix,
-                    )
-                with col2:
-                    render_field(
-                        "number_of_inputs", section["number_of_inputs"], prefix
-                    )
-
-                render_field("input_content", section["input_content"], prefix)
-
-                render_field(
-                    "additional_information_input_content",
-                    section["additional_information_input_content"],
-                    prefix,
-                )
-
-                col1, col2 = st.columns([1, 1])
-                with col1:
-                    render_field("input_format", section["input_format"], prefix)
-                with col2:
-                    render_field("input_size", section["input_size"], prefix)
-
-                render_field("number_of_outputs", section["number_of_outputs"], prefix)
-                render_field("output_content", section["output_content"], prefix)
-                render_field(
-                    "additional_information_output_content",
-                    section["additional_information_output_content"],
-                    prefix,
-                )
-                col1, col2 = st.columns([1, 1])
-                with col1:
-                    render_field("output_format", section["output_format"], prefix)
-                with col2:
-                    render_field("output_size", section["output_size"], prefix)
-
-                col1, col2, col3 = st.columns([1, 1, 1])
-                with col1:
-                    render_field("loss_function", section["loss_function"], prefix)
-                with col2:
-                    render_field("batch_size", section["batch_size"], prefix)
-                with col3:
-                    render_field("regularisation", section["regularisation"], prefix)
-
-                render_image_field(
-                    "architecture_figure",
-                    section["architecture_figure"],
-                    prefix,
-                )
-
-                for field in [
-                    "uncertainty_quantification_techniques",
-                    "explainability_techniques",
-                    "additional_information_ts",
-                    "citation_details_ts",
-                ]:
-                    if field in section:
-                        render_field(field, section[field], prefix)
+        i = item_navigator(
+            "Learning architecture", labels, "learning_architecture__active"
+        )
+        _learning_architecture_editor(
+            model_card_schema["learning_architecture"],
+            entities.architecture_prefix(arch_ids[i]),
+        )
     utils.section_divider()
     utils.title_header("3. Hardware & Software", size="1.35rem")
 
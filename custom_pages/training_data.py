@@ -1,20 +1,80 @@
 import streamlit as st
 import utils
-from render import render_field, render_image_field, should_render
+import schema_views
+import state_index
+from render import item_navigator, render_field, render_image_field, should_render
+
+
+@st.fragment
+def _modality_editor(section, entry, tech_section_prefix):
+    # Fragment: edits rerun this editor only, not the whole page
+    modality = entry["modality"]
+    source = entry["source"]
+    clean_modality = modality.strip().replace(" ", "_").lower()
+    utils.title_header(
+        f"{utils.strip_brackets(modality)} — {source.replace('_', ' ').capitalize()}",
+        size="1rem",
+    )
 
+    field_keys = {
+        "image_resolution": section["image_resolution"],
+        "patient_positioning": section["patient_positioning"],
+        "scanner_model": section["scanner_model"],
+        "scan_acquisition_parameters": section["scan_acquisition_parameters"],
+        "scan_reconstruction_parameters": section["scan_reconstruction_parameters"],
+        "fov": section["fov"],
+    }
+
+    field_keys = {
+        name: schema_views.with_props(
+            f, placeholder=f.get("placeholder", "N/A or NA if Not Applicable")
+        )
+        for name, f in field_keys.items()
+    }
 
-def training_data_render():
-    st.markdown("""
-    <style>
-    /* hide Streamlit Cloud’s top-right toolbar (includes the GitHub icon) */
-    div[data-testid="stToolbar"] { visibility: hidden; height: 0; }
+    # Render form fields
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        render_field(
+            f"{clean_modality}_{source}_image_resolution",
+            field_keys["image_resolution"],
+            tech_section_prefix,
+        )
+    with col2:
+        render_field(
+            f"{clean_modality}_{source}_patient_positioning",
+            field_keys["patient_positioning"],
+            tech_section_prefix,
+        )
 
-    /* optional: also hide the 'Manage app' badge and footer */
-    a[data-testid="viewerBadge_link"] { display: none !important; }
-    div[data-testid="stStatusWidget"] { display: none !important; }
-    footer { visibility: hidden; }
-    </style>
-    """, unsafe_allow_html=True)
+    render_field(
+        f"{clean_modality}_{source}_scanner_model",
+        field_keys["scanner_model"],
+        tech_section_prefix,
+    )
+
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        render_field(
+            f"{clean_modality}_{source}_scan_acquisition_parameters",
+            field_keys["scan_acquisition_parameters"],
+            tech_section_prefix,
+        )
+    with col2:
+        render_field(
+            f"{clean_modality}_{source}_scan_reconstruction_parameters",
+            field_keys["scan_reconstruction_parameters"],
+            tech_section_prefix,
+        )
+
+    render_field(
+        f"{clean_modality}_{source}_fov",
+        field_keys["fov"],
+        tech_section_prefix,
+    )
+
+
+def training_data_render():
     utils.require_task()
 
     from side_bar import sidebar_render
@@ -109,91 +169,19 @@ def training_data_render():
     tech_section_prefix = "training_data"
     section = model_card_schema["training_data"]
 
-    modality_entries = []
-
-    for key, value in st.session_state.items():
-        if key.endswith("model_inputs") and isinstance(value, list):
-            for item in value:
-                modality_entries.append({"modality": item, "source": "model_inputs"})
-
-        elif key.endswith("model_outputs") and isinstance(value, list):
-            for item in value:
-                modality_entries.append({"modality": item, "source": "model_outputs"})
+    modality_entries = state_index.modality_entries()
 
     if not modality_entries:
         st.warning(
             "Start by adding model inputs and outputs in the previous section to enable technical details."
         )
     else:
-        tabs = st.tabs([utils.strip_brackets(m["modality"]) for m in modality_entries])
-
-        for idx, entry in enumerate(modality_entries):
-            modality = entry["modality"]
-            source = entry["source"]
-
-            with tabs[idx]:
-                clean_modality = modality.strip().replace(" ", "_").lower()
-                utils.title_header(
-                    f"{utils.strip_brackets(modality)} — {source.replace('_', ' ').capitalize()}",
-                    size="1rem",
-                )
-
-                field_keys = {
-                    "image_resolution": section["image_resolution"],
-                    "patient_positioning": section["patient_positioning"],
-                    "scanner_model": section["scanner_model"],
-                    "scan_acquisition_parameters": section[
-                        "scan_acquisition_parameters"
-                    ],
-                    "scan_reconstruction_parameters": section[
-                        "scan_reconstruction_parameters"
-                    ],
-                    "fov": section["fov"],
-                }
-
-                for f in field_keys.values():
-                    f["placeholder"] = f.get("placeholder", "N/A or NA if Not Applicable")
-
-                # Render form fields
-                col1, col2 = st.columns([1, 1])
-                with col1:
-                    render_field(
-                        f"{clean_modality}_{source}_image_resolution",
-                        field_keys["image_resolution"],
-                        tech_section_prefix,
-                    )
-                with col2:
-                    render_field(
-                        f"{clean_modality}_{source}_patient_positioning",
-                        field_keys["patient_positioning"],
-                        tech_section_prefix,
-                    )
-
-                render_field(
-                    f"{clean_modality}_{source}_scanner_model",
-                    field_keys["scanner_model"],
-                    tech_section_prefix,
-                )
-
-                col1, col2 = st.columns([1, 1])
-                with col1:
-                    render_field(
-                        f"{clean_modality}_{source}_scan_acquisition_parameters",
-                        field_keys["scan_acquisition_parameters"],
-                        tech_section_prefix,
-                    )
-                with col2:
-                    render_field(
-                        f"{clean_modality}_{source}_scan_reconstruction_parameters",
-                        field_keys["scan_reconstruction_parameters"],
-                        tech_section_prefix,
-                    )
-
-                render_field(
-                    f"{clean_modality}_{source}_fov",
-                    field_keys["fov"],
-                    tech_section_prefix,
-                )
+        idx = item_navigator(
+            "Modality",
+            [utils.strip_brackets(m["modality"]) for m in modality_entries],
+            "training_data__active_modality",
+        )
+        _modality_editor(section, modality_entries[idx], tech_section_prefix)
 
     model_card_schema = utils.get_model_card_schema()
     section = model_card_schema["training_data"]
@@ -1,8 +1,5 @@
 import streamlit as st
-import utils
-import validation_utils
-
-model_card_schema = utils.get_model_card_schema()
+import validation_engine
 
 SECTION_NAMES = {
     "Card Metadata": ["card_metadata"],
@@ -19,26 +16,11 @@ SECTION_NAMES = {
 
 
 def warnings_render():
-    st.markdown("""
-    <style>
-    /* hide Streamlit Cloud’s top-right toolbar (includes the GitHub icon) */
-    div[data-testid="stToolbar"] { visibility: hidden; height: 0; }
-
-    /* optional: also hide the 'Manage app' badge and footer */
-    a[data-testid="viewerBadge_link"] { display: none !important; }
-    div[data-testid="stStatusWidget"] { display: none !important; }
-    footer { visibility: hidden; }
-    </style>
-    """, unsafe_allow_html=True)
     from side_bar import sidebar_render
 
     sidebar_render()
 
-    task = st.session_state.get("task", "Image-to-Image translation")
-
-    missing_required = validation_utils.validate_required_fields(
-        model_card_schema, current_task=task
-    )
+    missing_required = validation_engine.missing_fields()
 
     grouped_missing = {}
     for section, label in missing_required:
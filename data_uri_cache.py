@@ -0,0 +1,94 @@
+"""
+Process-wide cache of base64 data URIs for uploaded files.
+
+Files are identified by (path, size, mtime); the first lookup reads the file
+once, hashes it and encodes it, and later lookups for an unchanged file only
+cost a stat(). Encoded URIs are stored by content hash, so the same image
+uploaded under two paths is encoded and held once. Entries are evicted
+least-recently-used first when the total size exceeds the byte budget.
+"""
+
+import base64
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+DATA_URI_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+class DataURICache:
+    __slots__ = ("max_bytes", "_by_stat", "_by_content", "_size", "_lock")
+
+    def __init__(self, max_bytes=DATA_URI_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        # (path, size, mtime_ns) -> content key
+        self._by_stat = {}
+        # (sha256, mime) -> data URI, least recently used first
+        self._by_content = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._by_content)
+
+    @property
+    def total_bytes(self):
+        return self._size
+
+    def data_uri(self, path, mime):
+        """Return the data: URI of `path` encoded with `mime`."""
+        info = os.stat(path)
+        stat_key = (os.path.abspath(path), info.st_size, info.st_mtime_ns, mime)
+        with self._lock:
+            content_key = self._by_stat.get(stat_key)
+            if content_key is not None and content_key in self._by_content:
+                self._by_content.move_to_end(content_key)
+                return self._by_content[content_key]
+
+        with open(path, "rb") as f:
+            data = f.read()
+        content_key = (hashlib.sha256(data).hexdigest(), mime)
+
+        with self._lock:
+            uri = self._by_content.get(content_key)
+            if uri is None:
+                b64 = base64.b64encode(data).decode("ascii")
+                uri = f"data:{mime or 'application/octet-stream'};base64,{b64}"
+                if len(uri) > self.max_bytes:
+                    return uri
+                self._by_content[content_key] = uri
+                self._size += len(uri)
+                self._evict()
+            else:
+                self._by_content.move_to_end(content_key)
+            self._by_stat[stat_key] = content_key
+        return uri
+
+    def _evict(self):
+        evicted = set()
+        while self._size > self.max_bytes and self._by_content:
+            key, uri = self._by_content.popitem(last=False)
+            self._size -= len(uri)
+            evicted.add(key)
+        if evicted:
+            self._by_stat = {
+                k: v for k, v in self._by_stat.items() if v not in evicted
+            }
+
+    def clear(self):
+        with self._lock:
+            self._by_stat.clear()
+            self._by_content.clear()
+            self._size = 0
+
+
+_cache = DataURICache()
+
+
+def get_cache():
+    return _cache
+
+
+def file_data_uri(path, mime):
+    return _cache.data_uri(path, mime)
@@ -0,0 +1,267 @@
+"""
+Stable identities for the repeated parts of a card: learning architectures
+and evaluation forms.
+
+An entity gets an id when it is created and keeps it for life. Ids come
+from a per-session counter that never goes back, so a deleted entity's id
+(and any key it left behind) is never reused. Its fields live in a key
+namespace derived from the id alone:
+
+    learning_architecture_{id}_{field}                      id: int
+    evaluation_{id}_{field}, evaluation_{id}.{metric}_{...} id: str
+
+so renaming or reordering only rewrites the small registry, and deleting or
+duplicating an entity only touches its own keys, found through the sorted key
+index (state_index) rather than by scanning the session.
+
+Registries, in display order (structural keys, written with utils.set_state):
+    learning_architecture_forms   {id: {}}
+    evaluation_forms              {id: name}
+
+Sessions and cards from before ids existed stored positional architectures
+({"Learning Architecture N": {}}) and a list of evaluation names whose
+space-to-underscore slug was the key prefix; both read back as ids.
+"""
+
+import streamlit as st
+
+import state_index
+import upload_store
+import utils
+
+ARCHITECTURES_KEY = "learning_architecture_forms"
+EVALUATIONS_KEY = "evaluation_forms"
+# Per-session id counter shared by both kinds; it only ever goes up
+NEXT_ID_KEY = "_next_entity_id"
+
+
+def _legacy_slug(name):
+    return name.replace(" ", "_")
+
+
+def _next_id(taken=()):
+    """
+    A number never handed out before in this session (nor in use in
+    `taken`), so a new entity cannot inherit keys a deleted one left behind.
+    """
+    n = max(st.session_state.get(NEXT_ID_KEY, 0), max(taken, default=-1) + 1)
+    st.session_state[NEXT_ID_KEY] = n + 1
+    return n
+
+
+# ---------------------------------------------------------------------------
+# Learning architectures
+# ---------------------------------------------------------------------------
+
+
+def _architecture_registry():
+    forms = st.session_state.get(ARCHITECTURES_KEY) or {}
+    if any(not isinstance(k, int) for k in forms):
+        # Positional layout: the i-th entry owns learning_architecture_{i}_*
+        return {i: {} for i in range(len(forms))}
+    return dict(forms)
+
+
+def architecture_ids():
+    """Architecture ids in display order."""
+    return list(_architecture_registry())
+
+
+def architecture_prefix(arch_id):
+    return f"learning_architecture_{arch_id}"
+
+
+def architecture_label(position):
+    return f"Learning Architecture {position + 1}"
+
+
+def add_architecture():
+    registry = _architecture_registry()
+    arch_id = _next_id(registry)
+    registry[arch_id] = {}
+    utils.set_state(ARCHITECTURES_KEY, registry)
+    return arch_id
+
+
+def delete_architecture(arch_id):
+    registry = _architecture_registry()
+    if registry.pop(arch_id, None) is None:
+        return
+    utils.set_state(ARCHITECTURES_KEY, registry)
+    _delete_namespace(f"{architecture_prefix(arch_id)}_")
+
+
+def move_architecture(arch_id, offset):
+    utils.set_state(
+        ARCHITECTURES_KEY, _moved(_architecture_registry(), arch_id, offset)
+    )
+
+
+def set_architectures(count):
+    """Registry for `count` freshly loaded architectures; returns their ids."""
+    taken, registry = _architecture_registry(), {}
+    for _ in range(count):
+        registry[_next_id(taken)] = {}
+    utils.set_state(ARCHITECTURES_KEY, registry)
+    for old_id in taken:
+        _delete_namespace(f"{architecture_prefix(old_id)}_")
+    return list(registry)
+
+
+# ---------------------------------------------------------------------------
+# Evaluation forms
+# ---------------------------------------------------------------------------
+
+
+def _evaluation_registry():
+    forms = st.session_state.get(EVALUATIONS_KEY) or {}
+    if isinstance(forms, dict):
+        return dict(forms)
+    # Name list: each name's slug was its key prefix
+    return {_legacy_slug(name): name for name in forms}
+
+
+def evaluations():
+    """[(id, name)] in display order."""
+    return list(_evaluation_registry().items())
+
+
+def evaluation_ids():
+    return list(_evaluation_registry())
+
+
+def evaluation_names():
+    return list(_evaluation_registry().values())
+
+
+def evaluation_name(eval_id):
+    return _evaluation_registry().get(eval_id)
+
+
+def evaluation_prefix(eval_id):
+    return f"evaluation_{eval_id}"
+
+
+def _evaluation_number(eval_id):
+    if isinstance(eval_id, str) and eval_id[:1] == "e" and eval_id[1:].isdigit():
+        return int(eval_id[1:])
+    return -1
+
+
+def new_evaluation_id(registry=None):
+    registry = _evaluation_registry() if registry is None else registry
+    taken = [_evaluation_number(k) for k in (*_evaluation_registry(), *registry)]
+    return f"e{_next_id(taken)}"
+
+
+def add_evaluation(name):
+    """Register a new evaluation form called `name`; returns its id."""
+    registry = _evaluation_registry()
+    eval_id = new_evaluation_id(registry)
+    registry[eval_id] = name
+    utils.set_state(EVALUATIONS_KEY, registry)
+    return eval_id
+
+
+def rename_evaluation(eval_id, name):
+    registry = _evaluation_registry()
+    if eval_id in registry:
+        registry[eval_id] = name
+        utils.set_state(EVALUATIONS_KEY, registry)
+
+
+def delete_evaluation(eval_id):
+    registry = _evaluation_registry()
+    if eval_id not in registry:
+        return
+    del registry[eval_id]
+    utils.set_state(EVALUATIONS_KEY, registry)
+    prefix = evaluation_prefix(eval_id)
+    _delete_namespace(f"{prefix}_", f"{prefix}.")
+
+
+def duplicate_evaluation(eval_id, name=None):
+    """
+    Insert a copy of evaluation `eval_id` right after it; returns the new id.
+
+    Values are shared with the original rather than copied. Strings and
+    numbers are immutable and lists are replaced on write
+    (utils.append_state), so editing either form leaves the other alone.
+    Uploads become extra links to the same stored blob.
+    """
+    registry = _evaluation_registry()
+    if eval_id not in registry:
+        return None
+    new_id = new_evaluation_id(registry)
+    name = name or _copy_name(registry[eval_id], registry.values())
+    order = list(registry)
+    order.insert(order.index(eval_id) + 1, new_id)
+    registry[new_id] = name
+    utils.set_state(EVALUATIONS_KEY, {k: registry[k] for k in order})
+    _copy_namespace(evaluation_prefix(eval_id), evaluation_prefix(new_id))
+    return new_id
+
+
+def move_evaluation(eval_id, offset):
+    utils.set_state(EVALUATIONS_KEY, _moved(_evaluation_registry(), eval_id, offset))
+
+
+def set_evaluations(names):
+    """Registry for freshly loaded evaluations; returns their ids in order."""
+    registry = {}
+    for name in names:
+        registry[new_evaluation_id(registry)] = name
+    utils.set_state(EVALUATIONS_KEY, registry)
+    return list(registry)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _moved(registry, entity_id, offset):
+    order = list(registry)
+    if entity_id not in registry:
+        return registry
+    i = order.index(entity_id)
+    j = max(0, min(len(order) - 1, i + offset))
+    order.insert(j, order.pop(i))
+    return {k: registry[k] for k in order}
+
+
+def _copy_name(name, taken):
+    taken = set(taken)
+    candidate = f"{name} (copy)"
+    n = 2
+    while candidate in taken:
+        candidate = f"{name} (copy {n})"
+        n += 1
+    return candidate
+
+
+def _copy_namespace(src, dst):
+    """Mirror every data key and upload under `src` to the `dst` namespace."""
+    prefixes = (f"{src}_", f"{src}.")
+    for prefix in prefixes:
+        for key in state_index.keys_with_prefix(prefix):
+            if key in st.session_state:
+                utils.set_state(dst + key[len(src):], st.session_state[key])
+    uploads = st.session_state.get("render_uploads") or {}
+    for key in [k for k in uploads if k.startswith(prefixes)]:
+        new_key = dst + key[len(src):]
+        record = upload_store.copy_upload(key, new_key)
+        if record is None:
+            utils.delete_state(f"{new_key}_image")
+        else:
+            utils.set_state(f"{new_key}_image", upload_store.file_ref(record))
+
+
+def _delete_namespace(*prefixes):
+    """Delete every data key and upload registered under `prefixes`."""
+    for prefix in prefixes:
+        for key in state_index.keys_with_prefix(prefix):
+            utils.delete_state(key)
+    uploads = st.session_state.get("render_uploads") or {}
+    for key in [k for k in uploads if k.startswith(prefixes)]:
+        upload_store.detach(key)
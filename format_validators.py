@@ -0,0 +1,207 @@
+"""
+Typed checkers for the `format` of schema fields.
+
+compile_validator turns a field's props into a FormatValidator once, when the
+schema is compiled (see schema_views.FieldProps.validator):
+
+- a human date format such as "YYYYMMDD" becomes a strptime check;
+- any other `format` is a regex, as before;
+- fields without a `format` get a typed check from their key or type: DOIs,
+  URLs, email addresses and Integer / Float fields (with the optional
+  `minimum` / `maximum` of the schema).
+
+Results are cached per (validator, value), so re-checking an unchanged value
+is a dict lookup. Empty values are never a format error; required-ness is the
+validation engine's business.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+_DATE_TOKENS = {"YYYY": "%Y", "MM": "%m", "DD": "%d"}
+_DATE_FORMAT = re.compile(r"(YYYY|MM|DD)(?:[-./ ]?(YYYY|MM|DD))*")
+_DATE_PART = re.compile(r"YYYY|MM|DD")
+_FORMATTED_AS = re.compile(r"(?i)formatted text as")
+
+_DOI = re.compile(r"(?i)(?:doi:\s*|https?://(?:dx\.)?doi\.org/)?10\.\d{4,9}/\S+")
+_EMAIL = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+_SEPARATORS = re.compile(r"[\s,;]+")
+_NOT_AVAILABLE = {"n/a", "na", "none", "-"}
+
+MESSAGES = {
+    "date": "Must be a date in the format {spec}.",
+    "doi": "Must be a DOI such as 10.1000/xyz123 (or N/A).",
+    "url": "Must be one or more links starting with http:// or https:// (or N/A).",
+    "url_or_doi": "Must be a link (http:// or https://) or a DOI such as 10.1000/xyz123.",
+    "email": "Must be one or more valid email addresses separated by commas.",
+    "integer": "Must be a whole number{range}.",
+    "float": "Must be a number{range}.",
+}
+
+
+@dataclass(slots=True, frozen=True)
+class FormatValidator:
+    """One compiled format check; `spec` is the regex or strptime format."""
+
+    kind: str
+    spec: object
+    message: str
+    minimum: float | None = None
+    maximum: float | None = None
+
+    def error(self, value):
+        """Return the message if `value` is set but malformed, else None."""
+        if value is None or value == "" or value == []:
+            return None
+        if isinstance(value, (date, datetime)):
+            return None if self.kind == "date" else self.message
+        try:
+            ok = _check(self, value)
+        except TypeError:  # unhashable (list) values skip the result cache
+            ok = _check.__wrapped__(self, value)
+        return None if ok else self.message
+
+
+def date_format(fmt):
+    """strptime format for a human date format such as "YYYYMMDD", or None."""
+    if not isinstance(fmt, str) or not _DATE_FORMAT.fullmatch(fmt.strip()):
+        return None
+    return _DATE_PART.sub(lambda m: _DATE_TOKENS[m.group()], fmt.strip())
+
+
+def _range_text(minimum, maximum):
+    if minimum is not None and maximum is not None:
+        return f" between {minimum:g} and {maximum:g}"
+    if minimum is not None:
+        return f" of at least {minimum:g}"
+    if maximum is not None:
+        return f" of at most {maximum:g}"
+    return ""
+
+
+def _bound(props, name):
+    value = props.get(name)
+    try:
+        return None if value is None else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _kind(key, field_type, props):
+    if "formatted text as" in field_type:
+        return "date"
+    if "doi" in key:
+        return "url_or_doi" if "url" in key else "doi"
+    if key.startswith("url") or key.endswith("_url"):
+        return "url"
+    if key.endswith("email"):
+        return "email"
+    if field_type in ("integer", "float"):
+        return field_type
+    if "minimum" in props or "maximum" in props:
+        return "float"
+    return None
+
+
+def compile_validator(key, props):
+    """Return the FormatValidator of a schema field, or None if it has no format."""
+    fmt = props.get("format")
+    field_type = (props.get("type") or "").strip().lower()
+    message = props.get("format_description")
+
+    if fmt:
+        spec = date_format(fmt)
+        if spec:
+            return FormatValidator(
+                "date", spec, message or MESSAGES["date"].format(spec=fmt)
+            )
+        try:
+            pattern = re.compile(fmt)
+        except re.error:
+            return None
+        return FormatValidator(
+            "regex", pattern, message or f"Must match the format {fmt}."
+        )
+
+    kind = _kind(key, field_type, props)
+    if kind is None:
+        return None
+    if kind == "date":
+        human = _FORMATTED_AS.split(props["type"])[-1].strip()
+        spec = date_format(human)
+        if not spec:
+            return None
+        return FormatValidator(
+            "date", spec, message or MESSAGES["date"].format(spec=human)
+        )
+    minimum, maximum = _bound(props, "minimum"), _bound(props, "maximum")
+    default = MESSAGES[kind].format(range=_range_text(minimum, maximum))
+    return FormatValidator(kind, None, message or default, minimum, maximum)
+
+
+def _in_range(validator, number):
+    if math.isnan(number):
+        return False
+    if validator.minimum is not None and number < validator.minimum:
+        return False
+    return validator.maximum is None or number <= validator.maximum
+
+
+def _is_url(token):
+    parts = urlsplit(token)
+    return parts.scheme in ("http", "https") and "." in parts.netloc
+
+
+def _tokens(text):
+    return [t for t in _SEPARATORS.split(text) if t]
+
+
+@lru_cache(maxsize=4096)
+def _check(validator, value):
+    kind = validator.kind
+    if kind in ("integer", "float") and not isinstance(value, str):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        if kind == "integer" and not float(value).is_integer():
+            return False
+        return _in_range(validator, float(value))
+
+    text = str(value)
+    if kind == "regex":
+        return validator.spec.match(text) is not None
+
+    text = text.strip()
+    if kind == "date":
+        # strptime alone accepts unpadded parts ("2024101")
+        if len(text) != len(date(2000, 12, 31).strftime(validator.spec)):
+            return False
+        try:
+            datetime.strptime(text, validator.spec)
+        except ValueError:
+            return False
+        return True
+    if kind == "integer":
+        try:
+            return _in_range(validator, float(int(text)))
+        except ValueError:
+            return False
+    if kind == "float":
+        try:
+            return _in_range(validator, float(text))
+        except ValueError:
+            return False
+
+    if text.lower() in _NOT_AVAILABLE:
+        return kind != "email"
+    if kind == "email":
+        return all(_EMAIL.fullmatch(t) for t in _tokens(text))
+    if kind == "doi":
+        return _DOI.fullmatch(text) is not None
+    if kind == "url":
+        return all(_is_url(t) for t in _tokens(text))
+    # url_or_doi
+    return all(_is_url(t) or _DOI.fullmatch(t) for t in _tokens(text))
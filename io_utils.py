@@ -1,4 +1,3 @@
-from huggingface_hub import upload_file
 import tempfile
 from pathlib import Path
 import json
@@ -10,8 +9,8 @@ UPLOAD_DIR = "uploaded_files"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
-def save_uploadedfile(uploaded_file):
-    file_path = os.path.join(UPLOAD_DIR, uploaded_file.name)
+def save_uploadedfile(uploaded_file, directory=UPLOAD_DIR):
+    file_path = os.path.join(directory, os.path.basename(uploaded_file.name))
     with open(file_path, "wb") as f:
         f.write(uploaded_file.getbuffer())
     return file_path
@@ -40,6 +39,8 @@ def upload_json_card(model_card: dict, repo_id: str, token: str):
 
 
 def upload_readme_card(readme_text: str, repo_id: str, token: str):
+    from huggingface_hub import upload_file
+
     with tempfile.TemporaryDirectory() as tmpdir:
         tmp_path = Path(tmpdir) / "README.md"
         tmp_path.write_text(readme_text)
@@ -0,0 +1,191 @@
+"""
+Hugging Face Hub license table (full name -> identifier used in repo cards).
+
+The table is served from licenses.json, a versioned snapshot bundled with the
+app, so lookups never touch the network. An optional background refresher
+re-reads the Hub documentation page and, when it parses, writes a newer
+snapshot next to the other runtime caches (atomically, via rename) and swaps
+it in. On startup the refreshed snapshot is used unless the bundled one is
+newer than the bundled version it was refreshed on top of.
+
+Refreshing is configured from the environment:
+    MODEL_CARD_LICENSE_REFRESH_S   seconds between refreshes (default 0 = off)
+    MODEL_CARD_LICENSE_CACHE       refreshed snapshot path
+                                   (default <tmp>/model_card_licenses.json)
+"""
+
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+LICENSES_URL = "https://huggingface.co/docs/hub/repositories-licenses"
+BUNDLED_PATH = Path(__file__).with_name("licenses.json")
+REFRESHED_PATH = Path(
+    os.environ.get(
+        "MODEL_CARD_LICENSE_CACHE",
+        os.path.join(tempfile.gettempdir(), "model_card_licenses.json"),
+    )
+)
+LICENSE_REFRESH_S = _env_int("MODEL_CARD_LICENSE_REFRESH_S", 0)
+FETCH_TIMEOUT_S = 10
+
+NAME_COLUMN = "Fullname"
+ID_COLUMN = "License identifier (to use in repo card)"
+
+_snapshot = None  # replaced wholesale, never mutated
+_load_lock = threading.Lock()
+_refresher_started = False
+_refresher_lock = threading.Lock()
+
+
+def _read_snapshot(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("licenses"), dict):
+        return None
+    if not data["licenses"]:
+        return None
+    return data
+
+
+def _version(data):
+    try:
+        return int(data.get("version") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _base_version(data):
+    """Bundled version a refreshed snapshot was taken on top of."""
+    try:
+        return int(data.get("base_version") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _load():
+    global _snapshot
+    with _load_lock:
+        if _snapshot is None:
+            bundled = _read_snapshot(BUNDLED_PATH) or {"version": 0, "licenses": {}}
+            refreshed = _read_snapshot(REFRESHED_PATH)
+            # A newer bundled release wins over a copy refreshed from an older one
+            if refreshed and _base_version(refreshed) >= _version(bundled):
+                _snapshot = refreshed
+            else:
+                _snapshot = bundled
+        return _snapshot
+
+
+def snapshot():
+    """The current snapshot: {"version", "source", "retrieved", "licenses"}."""
+    return _snapshot if _snapshot is not None else _load()
+
+
+def get_licenses():
+    """{full name: identifier}. Reads a local file at most once per process."""
+    return snapshot()["licenses"]
+
+
+def license_id(name):
+    """Identifier for a license full name, or None."""
+    return get_licenses().get(name)
+
+
+def fetch_licenses(timeout=FETCH_TIMEOUT_S):
+    """Download and parse the license table from the Hub docs."""
+    import urllib.request
+
+    import pandas as pd
+
+    with urllib.request.urlopen(LICENSES_URL, timeout=timeout) as response:
+        html = response.read().decode("utf-8", errors="replace")
+    for table in pd.read_html(io.StringIO(html)):
+        if NAME_COLUMN in table.columns and ID_COLUMN in table.columns:
+            return {
+                str(name): str(ident)
+                for name, ident in zip(table[NAME_COLUMN], table[ID_COLUMN])
+                if isinstance(name, str) and isinstance(ident, str)
+            }
+    raise ValueError("license table not found on the page")
+
+
+def refresh(timeout=FETCH_TIMEOUT_S):
+    """
+    Fetch the table and, if it parses, publish it as the new snapshot.
+    Returns True on success; failures leave the current snapshot in place.
+    """
+    global _snapshot
+    try:
+        licenses = fetch_licenses(timeout)
+    except Exception:
+        return False
+    if not licenses:
+        return False
+
+    current = snapshot()
+    bundled = _read_snapshot(BUNDLED_PATH) or {}
+    data = {
+        "version": _version(current) + 1,
+        # Compared against the bundled version on the next start, so a later
+        # release of licenses.json replaces any number of local refreshes
+        "base_version": _version(bundled),
+        "source": LICENSES_URL,
+        "retrieved": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "licenses": licenses,
+    }
+    tmp_path = None
+    try:
+        REFRESHED_PATH.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=REFRESHED_PATH.parent, prefix=".licenses-", suffix=".json"
+        )
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, REFRESHED_PATH)
+    except OSError:
+        # Still serve the new table from memory for this process
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    _snapshot = data
+    return True
+
+
+def _refresh_loop(interval_s):
+    while True:
+        refresh()
+        time.sleep(interval_s)
+
+
+def start_background_refresh(interval_s=None):
+    """Refresh the table periodically in a daemon thread, once per process."""
+    global _refresher_started
+    interval_s = LICENSE_REFRESH_S if interval_s is None else interval_s
+    if interval_s <= 0:
+        return
+    with _refresher_lock:
+        if _refresher_started:
+            return
+        _refresher_started = True
+    threading.Thread(
+        target=_refresh_loop, args=(interval_s,), name="license-refresh", daemon=True
+    ).start()
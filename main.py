@@ -1,42 +1,23 @@
-import pandas as pd
 import streamlit as st
-from json_template import (
-    SCHEMA,
-    DATA_INPUT_OUTPUT_TS,
-    TASK_METRIC_MAP,
-    EVALUATION_METRIC_FIELDS,
-)
+from json_template import TASK_METRIC_MAP
 import utils
 import json
+import state_index
+import card_model
+import entities
+import licenses
 
 
 def get_state(key, default=None):
     return st.session_state.get(key, default)
 
 
-@st.cache_data(ttl=3600)
 def get_cached_data():
-    license_df = pd.read_html("https://huggingface.co/docs/hub/repositories-licenses")[
-        0
-    ]
-    return pd.Series(
-        license_df["License identifier (to use in repo card)"].values,
-        index=license_df.Fullname,
-    ).to_dict()
+    # Bundled snapshot, refreshed in the background when enabled (see licenses)
+    return licenses.get_licenses()
 
 
 def task_selector_page():
-    st.markdown("""
-    <style>
-    /* hide Streamlit Cloud’s top-right toolbar (includes the GitHub icon) */
-    div[data-testid="stToolbar"] { visibility: hidden; height: 0; }
-
-    /* optional: also hide the 'Manage app' badge and footer */
-    a[data-testid="viewerBadge_link"] { display: none !important; }
-    div[data-testid="stStatusWidget"] { display: none !important; }
-    footer { visibility: hidden; }
-    </style>
-    """, unsafe_allow_html=True)
     if "task" not in st.session_state:
         st.markdown("""
             <style>
@@ -99,7 +80,7 @@ def task_selector_page():
 
 
         if st.button("Continue", use_container_width=True):
-            st.session_state["task"] = selected_task
+            utils.set_state("task", selected_task)
             from custom_pages.model_card_info import model_card_info_render
 
             st.session_state.runpage = model_card_info_render
@@ -112,17 +93,6 @@ def task_selector_page():
 
 
 def load_model_card_page():
-    st.markdown("""
-    <style>
-    /* hide Streamlit Cloud’s top-right toolbar (includes the GitHub icon) */
-    div[data-testid="stToolbar"] { visibility: hidden; height: 0; }
-
-    /* optional: also hide the 'Manage app' badge and footer */
-    a[data-testid="viewerBadge_link"] { display: none !important; }
-    div[data-testid="stStatusWidget"] { display: none !important; }
-    footer { visibility: hidden; }
-    </style>
-    """, unsafe_allow_html=True)
     st.header("Load a Model Card")
 
     st.markdown(
@@ -157,152 +127,24 @@ def load_model_card_page():
         st.rerun()
 
 
-def extract_learning_architectures_from_state(max_archs=100):
+def extract_learning_architectures_from_state():
     learning_architectures = []
 
-    for i in range(max_archs):
-        prefix = f"learning_architecture_{i}_"
+    for arch_id in entities.architecture_ids():
+        prefix = f"{entities.architecture_prefix(arch_id)}_"
         entry = {}
-        for key, value in st.session_state.items():
-            if key.startswith(prefix):
-                field = key[len(prefix) :]
-                entry[field] = value
+        for key, value in state_index.items_with_prefix(prefix):
+            field = key[len(prefix) :]
+            entry[field] = value
         if entry:
-            entry["id"] = i
+            entry["id"] = arch_id
             learning_architectures.append(entry)
 
     return learning_architectures
 
 
 def extract_evaluations_from_state():
-    evaluations = []
-    eval_forms = st.session_state.get("evaluation_forms", [])
-    task = st.session_state.get("task", "Other")
-
-    for name in eval_forms:
-        slug = name.replace(" ", "_")
-        prefix = f"evaluation_{slug}_"
-        nested_prefix = f"evaluation_{slug}."
-        evaluation = {"name": name}
-
-        eval_section = SCHEMA.get("evaluation_data", {})
-
-        if isinstance(eval_section, dict):
-            iter_fields = []
-            for field, props in eval_section.items():
-                allowed_tasks = props.get("model_types")
-                if allowed_tasks is None or task in allowed_tasks:
-                    iter_fields.append(field)
-        else:
-            # fallback por si viniera como lista
-            iter_fields = list(eval_section or [])
-
-        for field in iter_fields:
-            key = prefix + field
-            if field.startswith("evaluated_by_") and field in evaluation:
-                continue
-            evaluation[field] = st.session_state.get(key, "")
-            if evaluation.get("evaluated_same_as_approved", False):
-                evaluation["evaluated_by_name"] = st.session_state.get(
-                    "model_basic_information_clearance_approved_by_name", ""
-                )
-                evaluation["evaluated_by_institution"] = st.session_state.get(
-                    "model_basic_information_clearance_approved_by_institution", ""
-                )
-                evaluation["evaluated_by_contact_email"] = st.session_state.get(
-                    "model_basic_information_clearance_approved_by_contact_email", ""
-                )
-        q_prefix = f"{prefix}qualitative_evaluation_"
-
-        def qget(suffix, default=""):
-            return (
-                st.session_state.get(q_prefix + suffix, None)
-                or st.session_state.get("_" + q_prefix + suffix, None)
-                or st.session_state.get("__" + q_prefix + suffix, None)
-                or default
-            )
-
-        qualitative = {
-            "evaluators_information": qget("evaluators_information", ""),
-            "likert_scoring": {
-                "method": qget("likert_scoring_method", ""),
-                "results": qget("likert_scoring_results", ""),
-            },
-            "turing_test": {
-                "method": qget("turing_test_method", ""),
-                "results": qget("turing_test_results", ""),
-            },
-            "time_saving": {
-                "method": qget("time_saving_method", ""),
-                "results": qget("time_saving_results", ""),
-            },
-            "other": {
-                "method": qget("other_method", ""),
-                "results": qget("other_results", ""),
-            },
-            "explainability": qget("explainability", ""),
-            "citation_details": qget("citation_details", ""),
-        }
-
-        evaluation["qualitative_evaluation"] = qualitative
-        modality_entries = []
-        for key, value in st.session_state.items():
-            if key.endswith("model_inputs") and isinstance(value, list):
-                for item in value:
-                    modality_entries.append(
-                        {"modality": item, "source": "model_inputs"}
-                    )
-            elif key.endswith("model_outputs") and isinstance(value, list):
-                for item in value:
-                    modality_entries.append(
-                        {"modality": item, "source": "model_outputs"}
-                    )
-
-        io_details = []
-        for entry in modality_entries:
-            clean = entry["modality"].strip().replace(" ", "_").lower()
-            source = entry["source"]
-            detail = {"entry": entry["modality"], "source": source}
-            for field in DATA_INPUT_OUTPUT_TS:
-                key = f"{prefix}{clean}_{source}_{field}"
-                val = (
-                    st.session_state.get(key)
-                    or st.session_state.get(f"_{key}")
-                    or st.session_state.get(f"__{key}")
-                    or ""
-                )
-                detail[field] = val
-            io_details.append(detail)
-
-        evaluation = utils.insert_after(
-            evaluation,
-            "inputs_outputs_technical_specifications",
-            io_details,
-            "url_info",
-        )
-
-        metric_dic = {}
-        for metric_key in TASK_METRIC_MAP.get(task, []):
-            type_list_key = f"{prefix}{metric_key}_list"
-            metric_entries = st.session_state.get(type_list_key, [])
-            metric_dic[metric_key] = []
-
-            for metric_name in metric_entries:
-                entry = {"name": metric_name}
-                for field in EVALUATION_METRIC_FIELDS[metric_key]:
-                    full_key = f"{nested_prefix}{metric_name}_{field}"
-                    entry[field] = st.session_state.get(full_key, "")
-                metric_dic[metric_key].append(entry)
-        
-        evaluation = utils.insert_dict_after(
-            evaluation,
-            metric_dic,
-            "additional_patient_info_ev",
-        )
-
-        evaluations.append(evaluation)
-
-    return evaluations
+    return [e.to_dict() for e in card_model.current_card().evaluations]
 
 
 def main_page():
@@ -318,17 +160,6 @@ def page_switcher(page):
 
 
 def main():
-    st.markdown("""
-    <style>
-    /* hide Streamlit Cloud’s top-right toolbar (includes the GitHub icon) */
-    div[data-testid="stToolbar"] { visibility: hidden; height: 0; }
-
-    /* optional: also hide the 'Manage app' badge and footer */
-    a[data-testid="viewerBadge_link"] { display: none !important; }
-    div[data-testid="stStatusWidget"] { display: none !important; }
-    footer { visibility: hidden; }
-    </style>
-    """, unsafe_allow_html=True)
 
 
     st.markdown("""
@@ -356,7 +187,25 @@ def main():
         st.rerun()
 
 
+def _warm_export_stack():
+    # Imports Jinja and the templates off the script thread, so the first page
+    # renders without waiting for the export code
+    from md_renderer import start_template_warmup
+
+    start_template_warmup()
+
+
 if __name__ == "__main__":
+    import sys
+    import threading
+    import upload_store
+
+    if "md_renderer" not in sys.modules:
+        threading.Thread(target=_warm_export_stack, name="export-warmup", daemon=True).start()
+    upload_store.start_collector()
+    licenses.start_background_refresh()
+    upload_store.touch_session()
     if "runpage" not in st.session_state:
         st.session_state.runpage = main
+    utils.inject_page_css()
     st.session_state.runpage()
\ No newline at end of file
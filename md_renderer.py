@@ -1,22 +1,30 @@
 import os
 from pathlib import Path
 import re
-import base64
+import data_uri_cache
 import mimetypes
 import streamlit as st
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader, select_autoescape, TemplateNotFound
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    select_autoescape,
+    TemplateNotFound,
+)
 from json_template import DATA_INPUT_OUTPUT_TS
 from templates.sections import SECTION_REGISTRY, TEMPLATES_DIR
-from main import extract_evaluations_from_state
-import markdown
-try:
-    from weasyprint import HTML, CSS
-    _HAS_WEASYPRINT = True
-    _WEASYPRINT_ERR = None
-except Exception as e:
-    _HAS_WEASYPRINT = False
-    _WEASYPRINT_ERR = e
+import state_index
+import card_model
+import change_journal
+import entities
+# markdown and WeasyPrint are imported by the export functions that need them,
+# so importing this module (e.g. for the sidebar) stays cheap.
 
 def build_appendix_files_context():
     items = []
@@ -50,25 +58,14 @@ def _format_date(raw, in_fmt="%Y%m%d", out_fmt="%Y/%m/%d"):
         return raw
 
 
-def _to_data_uri(mime, data):
-    """Return data: URI for small images."""
-    try:
-        b64 = base64.b64encode(data).decode("ascii")
-        return f"data:{mime or 'application/octet-stream'};base64,{b64}"
-    except Exception:
-        return None
-
-
 def _file_to_data_uri(path, fallback_mime=None):
-    """Open a local file and return a data: URI if it's an image."""
+    """Return a data: URI for a local image file (cached, see data_uri_cache)."""
     try:
         mime, _ = mimetypes.guess_type(path)
         mime = mime or fallback_mime
         if not mime or not mime.lower().startswith("image/"):
             return None
-        with open(path, "rb") as f:
-            data = f.read()
-        return _to_data_uri(mime, data)
+        return data_uri_cache.file_data_uri(path, mime)
     except Exception:
         return None
 
@@ -102,9 +99,8 @@ def _collect_hw_sw_from_state():
     """Collect hw_and_sw_* keys into a nested dict."""
     hw = {}
     prefix = "hw_and_sw_"
-    for key, val in st.session_state.items():
-        if key.startswith(prefix):
-            hw[key[len(prefix) :]] = val
+    for key, val in state_index.items_with_prefix(prefix):
+        hw[key[len(prefix) :]] = val
     return hw
 
 
@@ -114,31 +110,31 @@ def _collect_learning_architectures_from_state():
     Supports both key styles:
       - learning_architecture_{i}_{field}
       - technical_specifications_learning_architecture_{i}_{field}
-    Respects 'learning_architecture_forms' to pre-register empty indices.
+    where i is the architecture id (see entities), listed in display order.
     Normalizes 'architecture_figure' via _normalize_file_from_key(...).
     """
     grouped = {}
     patterns = [
-        re.compile(r"^learning_architecture_(\d+)_(.+)$"),
-        re.compile(r"^technical_specifications_learning_architecture_(\d+)_(.+)$"),
+        ("learning_architecture_", re.compile(r"^learning_architecture_(\d+)_(.+)$")),
+        (
+            "technical_specifications_learning_architecture_",
+            re.compile(r"^technical_specifications_learning_architecture_(\d+)_(.+)$"),
+        ),
     ]
 
-    for key, val in st.session_state.items():
-        for pat in patterns:
+    for prefix, pat in patterns:
+        for key, val in state_index.items_with_prefix(prefix):
             m = pat.match(key)
             if m:
                 idx = int(m.group(1))
                 field = m.group(2)
                 grouped.setdefault(idx, {})[field] = val
-                break
-
-    forms = st.session_state.get("learning_architecture_forms") or {}
-    for i in range(len(forms)):
-        grouped.setdefault(i, {})
 
+    # Only registered architectures, in display order; keys of any other id
+    # are leftovers and must not resurface in the card
     result = []
-    for i in sorted(grouped):
-        la = grouped[i]
+    for i in entities.architecture_ids():
+        la = grouped.get(i, {})
         la["id"] = i
 
         for k in (
@@ -157,19 +153,7 @@ def _collect_learning_architectures_from_state():
 
 def _normalize_render_key_to_fileobj(full_key: str):
     """Return normalized file object from st.session_state.render_uploads[full_key], if present."""
-    uploads = st.session_state.get("render_uploads", {})
-    info = uploads.get(full_key)
-    if not info:
-        return None
-    path = info.get("path")
-    name = info.get("name") or (os.path.basename(path) if path else None)
-    mime, _ = mimetypes.guess_type(name or "")
-    url = (
-        _file_to_data_uri(path, fallback_mime=mime)
-        if path and os.path.exists(path)
-        else None
-    )
-    return {"name": name, "type": mime, "url": url}
+    return _normalize_file_from_key(full_key)
 
 
 def _prime_normalized_uploads():
@@ -189,9 +173,8 @@ def build_context_for_prefix(prefix: str) -> dict:
     ctx = {}
     try:
         if isinstance(prefix, str):
-            for k, v in st.session_state.items():
-                if k.startswith(prefix):
-                    ctx[k] = v
+            for k, v in state_index.items_with_prefix(prefix):
+                ctx[k] = v
 
         if prefix == "card_metadata_":
             if "card_metadata_card_creation_date" in ctx:
@@ -233,15 +216,6 @@ def build_context_for_prefix(prefix: str) -> dict:
                 if norm:
                     ctx[k] = norm
 
-            for i, la in enumerate(ctx.get("learning_architectures", [])):
-                la_key1 = f"learning_architecture_{i}_architecture_figure"
-                la_key2 = f"technical_specifications_learning_architecture_{i}_architecture_figure"
-                norm = _normalize_file_from_key(la_key1) or _normalize_file_from_key(
-                    la_key2
-                )
-                if norm:
-                    la["architecture_figure"] = norm
-
         if prefix == "training_data_":
             ctx["DATA_INPUT_OUTPUT_TS"] = DATA_INPUT_OUTPUT_TS
 
@@ -250,36 +224,13 @@ def build_context_for_prefix(prefix: str) -> dict:
             )
             if norm:
                 ctx["training_data_train_and_validation_loss_curves"] = norm
-            modality_entries = []
-            for key, value in st.session_state.items():
-                if key.endswith("model_inputs") and isinstance(value, list):
-                    for item in value:
-                        modality_entries.append(
-                            {"modality": item, "source": "model_inputs"}
-                        )
-                elif key.endswith("model_outputs") and isinstance(value, list):
-                    for item in value:
-                        modality_entries.append(
-                            {"modality": item, "source": "model_outputs"}
-                        )
             io_details = []
-            for entry in modality_entries:
-                clean = entry["modality"].strip().replace(" ", "_").lower()
-                source = entry["source"]
-                detail = {"entry": entry["modality"], "source": source}
+            for spec in card_model.current_card().training_modalities:
+                detail = spec.to_dict()
                 for field_key in DATA_INPUT_OUTPUT_TS:
-                    per_mod_key = f"training_data_{clean}_{source}_{field_key}"
-                    val = (
-                        st.session_state.get(per_mod_key)
-                        or st.session_state.get(f"_{per_mod_key}")
-                        or st.session_state.get(f"__{per_mod_key}")
-                        or ""
-                    )
-                    if not val:
+                    if not detail.get(field_key):
                         global_key = f"training_data_{field_key}"
-                        val = st.session_state.get(global_key, "")
-
-                    detail[field_key] = val
+                        detail[field_key] = st.session_state.get(global_key, "")
                 io_details.append(detail)
 
             ctx["training_data_inputs_outputs_technical_specifications"] = io_details
@@ -287,7 +238,7 @@ def build_context_for_prefix(prefix: str) -> dict:
         if prefix == "evaluations_":
             _prime_normalized_uploads()
 
-            ev = extract_evaluations_from_state()
+            ev = [e.to_dict() for e in card_model.current_card().evaluations]
             ctx["evaluations"] = ev if isinstance(ev, list) else []
             for e in ctx["evaluations"]:
                 if "evaluation_date" in e:
@@ -297,7 +248,7 @@ def build_context_for_prefix(prefix: str) -> dict:
             ctx["task"] = task_val
 
             try:
-                from main import TASK_METRIC_MAP
+                from json_template import TASK_METRIC_MAP
 
                 task_key = (task_val or "").strip()
                 ctx["metric_groups"] = TASK_METRIC_MAP.get(task_key, [])
@@ -312,12 +263,18 @@ def build_context_for_prefix(prefix: str) -> dict:
     return ctx
 
 
-def _env():
+MASTER_TEMPLATE = "model_card_master.md.j2"
+
+
+def _build_env(bytecode_cache=None):
     env = Environment(
         loader=FileSystemLoader(str(TEMPLATES_DIR)),
         autoescape=select_autoescape(enabled_extensions=(), default_for_string=False),
         trim_blocks=True,
         lstrip_blocks=True,
+        # Templates are re-checked by mtime and recompiled only when edited
+        auto_reload=True,
+        bytecode_cache=bytecode_cache,
     )
     env.globals["DATA_INPUT_OUTPUT_TS"] = DATA_INPUT_OUTPUT_TS
 
@@ -332,16 +289,109 @@ def _env():
     return env
 
 
+@lru_cache(maxsize=1)
+def _env():
+    """
+    Shared per-process environment. Compiled templates stay in its in-memory
+    cache, and the bytecode cache on disk lets new processes skip compilation.
+    """
+    return _build_env(FileSystemBytecodeCache())
+
+
+def warm_templates(master_template: str = MASTER_TEMPLATE):
+    """Load (compile or read bytecode for) the master and every section template."""
+    env = _env()
+    for name in [master_template] + [cfg["template"] for cfg in SECTION_REGISTRY.values()]:
+        try:
+            env.get_template(name)
+        except TemplateNotFound:
+            pass
+
+
+_warmup_started = False
+_warmup_lock = threading.Lock()
+
+
+def start_template_warmup():
+    """Warm the templates once per process in a background thread."""
+    global _warmup_started
+    with _warmup_lock:
+        if _warmup_started:
+            return
+        _warmup_started = True
+    threading.Thread(target=warm_templates, name="jinja-warmup", daemon=True).start()
+
+
+_SECTION_CACHE_KEY = "_section_render_cache"
+_REVISION_CACHE_KEY = "_section_revision_cache"
+_CARD_MD_CACHE_KEY = "_card_md_cache"
+SECTION_CACHE_SIZE = 32
+
+
+def _context_fingerprint(ctx):
+    """sha256 of the canonical JSON form of a render context."""
+    try:
+        canonical = json.dumps(ctx, sort_keys=True, default=str, separators=(",", ":"))
+    except TypeError:
+        # mixed-type dict keys cannot be sorted; fall back to insertion order
+        canonical = json.dumps(ctx, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _section_cache():
+    cache = st.session_state.get(_SECTION_CACHE_KEY)
+    if cache is None:
+        cache = OrderedDict()
+        st.session_state[_SECTION_CACHE_KEY] = cache
+    return cache
+
+
+def _revision_cache():
+    """{section_id: (revision, template, markdown)} of the last render."""
+    cache = st.session_state.get(_REVISION_CACHE_KEY)
+    if cache is None:
+        cache = {}
+        st.session_state[_REVISION_CACHE_KEY] = cache
+    return cache
+
+
 def render_section_md(section_id: str) -> str:
+    """
+    Render one section, reusing the session's previous output when neither
+    its context fingerprint nor its (auto-reloaded) template changed. While
+    the card's revision is unchanged the context is not even rebuilt.
+    """
     cfg = SECTION_REGISTRY[section_id]
-    ctx = build_context_for_prefix(cfg["prefix"])
-    if not isinstance(ctx, dict):
-        ctx = {}
     try:
-        return _env().get_template(cfg["template"]).render(**ctx)
+        template = _env().get_template(cfg["template"])
     except TemplateNotFound:
         raise FileNotFoundError(f"Template not found: {cfg['template']}")
 
+    # Nothing was written since the last render: skip building the context
+    revision = change_journal.revision()
+    latest = _revision_cache().get(section_id)
+    if latest is not None and latest[0] == revision and latest[1] is template:
+        return latest[2]
+
+    ctx = build_context_for_prefix(cfg["prefix"])
+    if not isinstance(ctx, dict):
+        ctx = {}
+
+    cache = _section_cache()
+    key = (section_id, _context_fingerprint(ctx))
+    hit = cache.get(key)
+    if hit is not None and hit[0] is template:
+        cache.move_to_end(key)
+        md = hit[1]
+    else:
+        md = template.render(**ctx)
+        cache[key] = (template, md)
+        cache.move_to_end(key)
+        while len(cache) > SECTION_CACHE_SIZE:
+            cache.popitem(last=False)
+    _revision_cache()[section_id] = (revision, template, md)
+    return md
+
 
 """ def render_full_model_card_md(master_template: str = "model_card_master.md.j2") -> str:
     sections_md = {sid: render_section_md(sid) for sid in SECTION_REGISTRY}
@@ -357,18 +407,25 @@ def render_section_md(section_id: str) -> str:
         )
     ) """
 
-def render_full_model_card_md(master_template: str = "model_card_master.md.j2") -> str:
+def render_full_model_card_md(master_template: str = MASTER_TEMPLATE) -> str:
     sections_md = {sid: render_section_md(sid) for sid in SECTION_REGISTRY}
-    appendix_files = build_appendix_files_context()
+    template = _env().get_template(master_template)
+    revision = change_journal.revision()
+    # Cached sections come back as the same objects, so comparing them is an
+    # identity check per section unless one was re-rendered
+    latest = st.session_state.get(_CARD_MD_CACHE_KEY)
+    if (
+        latest is not None
+        and latest[0] == revision
+        and latest[1] is template
+        and latest[2] == sections_md
+    ):
+        return latest[3]
 
-    return (
-        _env()
-        .get_template(master_template)
-        .render(
-            sections=sections_md,
-            appendix_files=appendix_files,
-        )
-    )
+    appendix_files = build_appendix_files_context()
+    md = template.render(sections=sections_md, appendix_files=appendix_files)
+    st.session_state[_CARD_MD_CACHE_KEY] = (revision, template, sections_md, md)
+    return md
 
 DEFAULT_PDF_CSS = """
 /* --- Page setup --- */
@@ -521,6 +578,8 @@ figcaption { font-size: 9pt; color: var(--muted); margin-top: 0.3em; }
 """
 
 def render_markdown_to_html(md_text: str, extra_css: str = None) -> str:
+    import markdown
+
     html_body = markdown.markdown(
         md_text,
         extensions=["tables", "fenced_code", "toc", "attr_list", "sane_lists"],
@@ -542,25 +601,34 @@ def render_markdown_to_html(md_text: str, extra_css: str = None) -> str:
 </body>
 </html>"""
 
+def build_model_card_html(css_text: str = DEFAULT_PDF_CSS, md_text: str = None) -> str:
+    """Return the standalone HTML document the PDF export is printed from."""
+    md = md_text if md_text is not None else render_full_model_card_md()
+    return render_markdown_to_html(md, extra_css=css_text)
+
+
 def save_model_card_pdf(
     path: str = "model_card.pdf",
     *,
     css_text: str = DEFAULT_PDF_CSS,
     css_file: str = None,
     base_url: str = None,
+    md_text: str = None,
 ) -> str:
     """
     Render the current model card to a styled PDF.
+    Pass `md_text` to reuse Markdown that was already rendered.
     Returns the output PDF path.
     """
-    if not _HAS_WEASYPRINT:
+    try:
+        from weasyprint import HTML, CSS
+    except Exception as e:
         raise RuntimeError(
             "PDF export unavailable: WeasyPrint not installed or missing system libraries.\n"
-            f"Underlying error: {_WEASYPRINT_ERR}"
+            f"Underlying error: {e}"
         )
 
-    md = render_full_model_card_md()
-    html = render_markdown_to_html(md, extra_css=css_text)
+    html = build_model_card_html(css_text=css_text, md_text=md_text)
 
     css_list = []
     if css_file:
@@ -0,0 +1,193 @@
+"""
+Background PDF export.
+
+The Streamlit script thread only renders the card to HTML (cheap, cached);
+WeasyPrint runs in a small process pool shared by all sessions. Admission is
+bounded: at most PDF_WORKERS jobs run and PDF_QUEUE_SIZE more may wait, any
+further submission is refused with PdfQueueFull. Each worker process runs
+under an address-space limit, and each job under a wall-clock alarm.
+
+Limits are read from the environment:
+    MODEL_CARD_PDF_WORKERS     worker processes          (default 2)
+    MODEL_CARD_PDF_QUEUE       extra jobs allowed to wait (default 4)
+    MODEL_CARD_PDF_MEMORY_MB   address space per worker  (default 2048, 0 = off)
+    MODEL_CARD_PDF_TIMEOUT_S   seconds per job           (default 120, 0 = off)
+"""
+
+import os
+import signal
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+PDF_WORKERS = max(1, _env_int("MODEL_CARD_PDF_WORKERS", 2))
+PDF_QUEUE_SIZE = max(0, _env_int("MODEL_CARD_PDF_QUEUE", 4))
+PDF_MEMORY_MB = _env_int("MODEL_CARD_PDF_MEMORY_MB", 2048)
+PDF_TIMEOUT_S = _env_int("MODEL_CARD_PDF_TIMEOUT_S", 120)
+PDF_OUTPUT_DIR = os.path.join(tempfile.gettempdir(), "model_card_pdfs")
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(PDF_WORKERS + PDF_QUEUE_SIZE)
+
+
+class PdfQueueFull(RuntimeError):
+    pass
+
+
+class PdfTimeout(RuntimeError):
+    pass
+
+
+@dataclass(slots=True)
+class PdfJob:
+    id: str
+    path: str
+    future: object
+    submitted: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.submitted
+
+    @property
+    def status(self):
+        """One of "queued", "running", "done", "failed"."""
+        if self.future.done():
+            return "failed" if self.error is not None else "done"
+        return "running" if self.future.running() else "queued"
+
+    @property
+    def error(self):
+        if self.future.cancelled():
+            return RuntimeError("PDF export was cancelled")
+        if self.future.done():
+            return self.future.exception()
+        return None
+
+
+def _init_worker(memory_mb):
+    if memory_mb > 0:
+        try:
+            import resource
+
+            limit = memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            pass
+    # Pay the WeasyPrint import once per worker, not once per job
+    try:
+        import weasyprint  # noqa: F401
+    except Exception:
+        pass
+
+
+def _on_alarm(signum, frame):
+    raise PdfTimeout(f"PDF generation exceeded {PDF_TIMEOUT_S}s")
+
+
+def _write_pdf(html, path, css_text, base_url, timeout_s):
+    """Worker side: print `html` to `path` with WeasyPrint."""
+    try:
+        from weasyprint import CSS, HTML
+    except Exception as e:
+        raise RuntimeError(
+            "PDF export unavailable: WeasyPrint not installed or missing system libraries.\n"
+            f"Underlying error: {e}"
+        )
+
+    use_alarm = timeout_s > 0 and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.alarm(timeout_s)
+    try:
+        stylesheets = [CSS(string=css_text)] if css_text else []
+        HTML(string=html, base_url=base_url).write_pdf(path, stylesheets=stylesheets)
+    except MemoryError:
+        raise RuntimeError(f"PDF generation exceeded the {PDF_MEMORY_MB} MB memory cap")
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+    return path
+
+
+def _get_pool():
+    # multiprocessing is imported on the first export, not at app start
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS,
+                # spawn: never fork the threaded Streamlit server
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(PDF_MEMORY_MB,),
+            )
+        return _pool
+
+
+def _reset_pool(broken):
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def submit(html, css_text=None, base_url=None):
+    """
+    Queue a PDF export of `html` and return its PdfJob.
+
+    Raises PdfQueueFull when the pool and its waiting queue are full.
+    """
+    from concurrent.futures.process import BrokenProcessPool
+
+    if not _slots.acquire(blocking=False):
+        raise PdfQueueFull(
+            "The PDF export queue is full. Please try again in a moment."
+        )
+
+    os.makedirs(PDF_OUTPUT_DIR, exist_ok=True)
+    job_id = uuid.uuid4().hex
+    path = os.path.join(PDF_OUTPUT_DIR, f"model_card_{job_id}.pdf")
+    args = (html, path, css_text, base_url, PDF_TIMEOUT_S)
+    pool = _get_pool()
+    try:
+        future = pool.submit(_write_pdf, *args)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed by the OOM killer): start a fresh pool
+        _reset_pool(pool)
+        try:
+            future = _get_pool().submit(_write_pdf, *args)
+        except Exception:
+            _slots.release()
+            raise
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return PdfJob(id=job_id, path=path, future=future)
+
+
+def discard(job):
+    """Cancel a job if it has not started and remove its output file."""
+    if job is None:
+        return
+    job.future.cancel()
+    try:
+        os.remove(job.path)
+    except OSError:
+        pass
@@ -9,7 +9,6 @@
 from typing import Any, Dict, List, Union
 import html
 
-from md_renderer import render_full_model_card_md
 
 # --- Minimal YAML front matter builder (no external deps) ---------------------
 Scalar = Union[str, int, float, bool]
@@ -288,6 +287,8 @@ def render_hf_readme(
         merged_meta["base_model"] = merged_meta.pop("base_models")
 
     # 2) Render markdown body with your existing pipeline
+    from md_renderer import render_full_model_card_md
+
     body_md = render_full_model_card_md(master_template=master_template)
 
     # 3) Build YAML front matter and concatenate
@@ -363,12 +364,12 @@ def build_model_index_from_evaluations(model_name: str) -> Dict[str, Any] | None
     your actual schema.
     """
     try:
-        from main import extract_evaluations_from_state
+        from card_model import current_card
         import streamlit as st
     except Exception:
         return None
 
-    evals = extract_evaluations_from_state() or []
+    evals = [e.to_dict() for e in current_card().evaluations]
     results = []
     for e in evals:
         try:
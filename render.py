@@ -1,16 +1,21 @@
-import os
 import streamlit as st
-from tg263 import RTSTRUCT_SUBTYPES
+from dataclasses import dataclass
+from functools import lru_cache
+import tg263
 import html
+import bulk_entry
 import utils
-import re
-import numpy as np
+import schema_views
+import upload_store
+import validation_engine
 
 DEFAULT_SELECT = "< PICK A VALUE >"
+DOSE_STATIC_OPTIONS = (*bulk_entry.DOSE_METRIC_OPTIONS, "Other")
+DOSE_PARAMETRIC_OPTIONS = ("D", "V")
 
 
 def selectbox_with_default(label, values, key=None, help=None):
-    all_options = np.insert(np.array(values, object), 0, DEFAULT_SELECT)
+    all_options = [DEFAULT_SELECT, *values]
     selected = st.selectbox(
         label,
         options=all_options,
@@ -22,9 +27,8 @@ def selectbox_with_default(label, values, key=None, help=None):
 
 
 def render_schema_section(schema_section, section_prefix="", current_task=None):
-    for key, props in schema_section.items():
-        if should_render(props, current_task):
-            render_field(key, props, section_prefix)
+    for plan in section_plan(schema_section, current_task):
+        plan.render(section_prefix)
 
 
 def has_renderable_fields(field_keys, schema_section, current_task):
@@ -40,13 +44,47 @@ def render_fields(field_keys, schema_section, section_prefix, current_task):
             render_field(key, schema_section[key], section_prefix)
 
 
+NAVIGATOR_RADIO_MAX = 6
+
+
+def item_navigator(label, labels, state_key):
+    """
+    Picker over repeated sub-forms; returns the index of the one to render.
+
+    Only the selected editor is rendered, so a rerun costs one sub-form no
+    matter how many exist. The selection lives in st.session_state[state_key]
+    and survives page switches; it falls back to the first item when the
+    selected one was removed.
+    """
+    if not labels:
+        return None
+    selected = st.session_state.get(state_key, 0)
+    if not isinstance(selected, int) or not 0 <= selected < len(labels):
+        selected = 0
+    st.session_state[state_key] = selected
+
+    widget_key = f"{state_key}__picker"
+    if st.session_state.get(widget_key) != selected:
+        st.session_state[widget_key] = selected
+
+    def _on_change():
+        st.session_state[state_key] = st.session_state[widget_key]
+
+    picker = st.radio if len(labels) <= NAVIGATOR_RADIO_MAX else st.selectbox
+    kwargs = {"horizontal": True} if picker is st.radio else {}
+    picker(
+        label,
+        options=range(len(labels)),
+        format_func=lambda i: labels[i],
+        key=widget_key,
+        on_change=_on_change,
+        **kwargs,
+    )
+    return selected
+
+
 def should_render(props, current_task):
-    model_types = props.get("model_types")
-    if not model_types:
-        return True
-    if current_task:
-        return current_task.strip().lower() in map(str.lower, model_types)
-    return False
+    return schema_views.field_applies(props, current_task)
 
 
 def render_image_field(key, props, section_prefix):
@@ -74,14 +112,19 @@ def render_image_field(key, props, section_prefix):
 
     col1, col2 = st.columns([1, 2])
     with col1:
+        note_key = f"{full_key}_appendix_note"
+        utils.load_value(note_key, "")
         st.text_input(
             label=".",
             placeholder="e.g., Fig. 1",
-            key=f"{full_key}_appendix_note",
+            key="_" + note_key,
+            on_change=utils.store_value,
+            args=[note_key],
             label_visibility="collapsed",
         )
 
     with col2:
+        nonce_key = f"{full_key}__uploader_nonce"
         uploaded_image = st.file_uploader(
             label=".",
             type=[
@@ -89,40 +132,30 @@ def render_image_field(key, props, section_prefix):
                 "dcm","dicom","nii","nifti","pdf","docx","doc",
                 "pptx","ppt","txt","xlsx","xls","DICOM",
             ],
-            key=f"{full_key}__uploader",  # keep a stable, unique key per field
+            # Nonce remounts an empty uploader once the file is on disk
+            key=f"{full_key}__uploader_{st.session_state.get(nonce_key, 0)}",
             label_visibility="collapsed",
         )
 
         def _delete_previous_for_field():
-            prev = st.session_state.render_uploads.get(full_key)
-            if prev:
-                try:
-                    if os.path.exists(prev["path"]):
-                        os.remove(prev["path"])
-                except Exception:
-                    pass
-                st.session_state.all_uploaded_paths.discard(prev["path"])
-                st.session_state.render_uploads.pop(full_key, None)
-                st.session_state.pop(f"{full_key}_image", None)
+            if upload_store.detach(full_key) is not None:
+                utils.delete_state(f"{full_key}_image")
 
         # 1) If user uploaded a new file this run, save & overwrite previous.
+        #    Only the lightweight record is kept in session state; the
+        #    uploader is then remounted so Streamlit drops the file's bytes.
         if uploaded_image is not None:
-            os.makedirs("uploads", exist_ok=True)
-            safe_name = uploaded_image.name
-            save_path = os.path.join("uploads", f"{full_key}_{safe_name}")
-
-            # replace previous if existed
-            _delete_previous_for_field()
-
-            with open(save_path, "wb") as f:
-                f.write(uploaded_image.getbuffer())
+            try:
+                record = upload_store.store_upload(full_key, uploaded_image)
+                utils.set_state(f"{full_key}_image", upload_store.file_ref(record))
+            except upload_store.UploadQuotaExceeded as e:
+                st.session_state[f"{full_key}__upload_error"] = str(e)
+            st.session_state[nonce_key] = st.session_state.get(nonce_key, 0) + 1
+            st.rerun()
 
-            st.session_state.all_uploaded_paths.add(save_path)
-            st.session_state.render_uploads[full_key] = {
-                "path": save_path,
-                "name": safe_name,
-            }
-            st.session_state[f"{full_key}_image"] = uploaded_image
+        upload_error = st.session_state.pop(f"{full_key}__upload_error", None)
+        if upload_error:
+            st.error(upload_error)
 
         # 2) If no new upload this run, DO NOT delete anything.
         #    Instead, show what's persisted (if anything).
@@ -143,446 +176,656 @@ def render_image_field(key, props, section_prefix):
 
 
 
-def render_field(key, props, section_prefix):
-    full_key = f"{section_prefix}_{key}"
-    label = props.get("label") or key or "Field"
-    description = props.get("description", "")
-    example = props.get("example", "")
-    field_type = props.get("type", "")
-    required = props.get("required", False)
-    options = props.get("options", [])
-    placeholder = props.get("placeholder", "")
+def _render_content_list(plan, full_key):
+    """Modality/content list with RTSTRUCT structures."""
+    key, options = plan.key, plan.options
 
-    pattern = props.get("format")
-    if pattern:
-        value = st.session_state.get(full_key)
-        if value is not None and not re.match(pattern, str(value)):
-            friendly_msg = props.get("format_description")
-            st.error(friendly_msg)
+    content_list_key = f"{full_key}_list"
+    type_key = f"{full_key}_new_type"
+    subtype_key = f"{full_key}_new_subtype"
 
-    create_helpicon(label, description, field_type, example, required)
+    utils.load_value(content_list_key, default=[])
+    utils.load_value(type_key)
+    utils.load_value(subtype_key)
 
-    try:
-        safe_label = label.strip() or "Field"
-        if key == "type_metrics_other":
-            render_type_metrics_other(full_key, label)
-            return
-        if field_type == "select":
-            if not options:
-                st.warning(f"Field '{label}' is missing options for select dropdown.")
-            else:
-                if key in [
-                    "input_content",
-                    "output_content",
-                    "model_inputs",
-                    "model_outputs",
-                ]:
-                    content_list_key = f"{full_key}_list"
-                    type_key = f"{full_key}_new_type"
-                    subtype_key = f"{full_key}_new_subtype"
-
-                    utils.load_value(content_list_key, default=[])
-                    utils.load_value(type_key)
-                    utils.load_value(subtype_key)
-
-                    if st.session_state["_" + type_key] == "RTSTRUCT":
-                        col1, col2, col3 = st.columns([2, 1, 0.4])
-                        with col1:
-                            st.selectbox(
-                                label=".",
-                                options=options,
-                                key="_" + type_key,
-                                on_change=utils.store_value,
-                                args=[type_key],
-                                label_visibility="hidden",
-                                placeholder="-Select an option-",
-                            )
-                        with col2:
-                            subtype_value = st.selectbox(
-                                label=".",
-                                options=RTSTRUCT_SUBTYPES + ["Other"],
-                                key="_" + subtype_key,
-                                on_change=utils.store_value,
-                                args=[subtype_key],
-                                label_visibility="hidden",
-                                placeholder="-Select an option-",
-                            )
-                            st.info(
-                                "If the structure name isn't in the dropdown menu, select **Other** and introduce the name manually."
-                            )
-                            if subtype_value == "Other":
-                                custom_key = f"{subtype_key}_custom"
-                                utils.load_value(custom_key, default="")
-                                st.text_input(
-                                    "Enter custom RTSTRUCT subtype",
-                                    value=st.session_state.get(custom_key, ""),
-                                    key=custom_key,
-                                    placeholder="Introduce custom value",
-                                )
-
-                        with col3:
-                            st.markdown(
-                                "<div style='margin-top: 26px;'>",
-                                unsafe_allow_html=True,
-                            )
-                            if st.button("➕", key=f"{full_key}_add_button"):
-                                subtype = st.session_state.get(subtype_key, "")
-                                if subtype == "Other":
-                                    subtype = st.session_state.get(
-                                        f"{subtype_key}_custom", ""
-                                    )
-                                entry = f"RTSTRUCT_{subtype}"
-                                st.session_state[content_list_key].append(entry)
-                                st.session_state[full_key] = st.session_state[
-                                    content_list_key
-                                ]
-                            st.markdown("</div>", unsafe_allow_html=True)
-
-                    else:
-                        col1, col2, col3 = st.columns([2, 1, 0.5])
-
-                        with col1:
-                            st.selectbox(
-                                label=".",
-                                options=options,
-                                key="_" + type_key,
-                                on_change=utils.store_value,
-                                args=[type_key],
-                                label_visibility="hidden",
-                                placeholder="-Select an option-",
-                            )
-
-                        selected_type = st.session_state.get(type_key)
-                        custom_key = f"{full_key}_custom_text"
-                        utils.load_value(custom_key, default="")
-
-                        with col2:
-                            st.markdown(
-                                "<div style='margin-top: 26px;'>",
-                                unsafe_allow_html=True,
-                            )
-                            if selected_type == "OT (Other)":
-                                st.text_input(
-                                    "Enter custom input",
-                                    value=st.session_state.get(custom_key, ""),
-                                    key=custom_key,
-                                    label_visibility="collapsed",
-                                    placeholder="Introduce custom value",
-                                )
-                                st.markdown("</div>", unsafe_allow_html=True)
-                            else:
-                                st.markdown("&nbsp;", unsafe_allow_html=True)
-
-                        with col3:
-                            st.markdown(
-                                "<div style='margin-top: 26px;'>",
-                                unsafe_allow_html=True,
-                            )
-                            add_clicked = st.button("➕", key=f"{full_key}_add_button")
-                            st.markdown("</div>", unsafe_allow_html=True)
-
-                        if add_clicked:
-                            if selected_type in [None, "", DEFAULT_SELECT]:
-                                st.error("Please select an option before adding.")
-                            elif selected_type == "OT (Other)":
-                                custom_text = st.session_state.get(
-                                    custom_key, ""
-                                ).strip()
-                                if not custom_text:
-                                    st.error(
-                                        "Please enter a custom name before adding."
-                                    )
-                                else:
-                                    st.session_state[content_list_key].append(
-                                        custom_text
-                                    )
-                                    st.session_state[full_key] = st.session_state[
-                                        content_list_key
-                                    ]
-                            else:
-                                entry = utils.strip_brackets(selected_type)
-                                st.session_state[content_list_key].append(entry)
-                                st.session_state[full_key] = st.session_state[
-                                    content_list_key
-                                ]
-
-                    entries = st.session_state[content_list_key]
-                    if entries:
-                        col1, col2 = st.columns([5, 1])
-                        with col1:
-                            tooltip_items = [
-                                f"<span title='{html.escape(item)}' style='margin-right: 6px; font-weight: 500; color: #333;'>{html.escape(utils.strip_brackets(item))}</span>"
-                                for item in entries
-                            ]
-                            line = ", ".join(tooltip_items)
-                            st.markdown(f"<span>{line}</span>", unsafe_allow_html=True)
-                        with col2:
-                            if st.button("Clear", key=f"{full_key}_clear_all"):
-                                st.session_state[content_list_key] = []
-                                st.session_state[full_key] = []
-                                st.rerun()
-                    return
-                if key in ["treatment_modality_train", "treatment_modality_eval"]:
-                    content_list_key2 = f"{full_key}_modality_list"
-                    type_key2 = f"{full_key}_modality_type"
-
-                    utils.load_value(content_list_key2, default=[])
-                    utils.load_value(type_key2)
-
-                    col1, col2 = st.columns([4, 0.5])
-
-                    with col1:
-                        st.selectbox(
-                            label=".",
-                            options=options,
-                            key="_" + type_key2,
-                            on_change=utils.store_value,
-                            args=[type_key2],
-                            label_visibility="hidden",
-                            placeholder="-Select an option-",
-                        )
-
-                    add_clicked = False
-                    with col2:
-                        st.markdown(
-                            "<div style='margin-top: 26px;'>", unsafe_allow_html=True
-                        )
-                        add_clicked = st.button(
-                            "➕", key=f"{full_key}_modality_add_button"
-                        )
-                        st.markdown("</div>", unsafe_allow_html=True)
-
-                    raw_value2 = st.session_state.get(type_key2)
-                    if add_clicked:
-                        if raw_value2 in [None, "", DEFAULT_SELECT]:
-                            st.error("Please select an option before adding.")
-                        else:
-                            entry = utils.strip_brackets(raw_value2)
-                            st.session_state[content_list_key2].append(entry)
-                            st.session_state[full_key] = st.session_state[
-                                content_list_key2
-                            ]
-
-                    entries = st.session_state[content_list_key2]
-                    if entries:
-                        col1, col2 = st.columns([5, 1])
-                        with col1:
-                            tooltip_items = [
-                                f"<span title='{html.escape(item)}' style='margin-right: 6px; font-weight: 500; color: #333;'>{html.escape(utils.strip_brackets(item))}</span>"
-                                for item in entries
-                            ]
-                            line = ", ".join(tooltip_items)
-                            st.markdown(f"<span>{line}</span>", unsafe_allow_html=True)
-                        with col2:
-                            if st.button("Clear", key=f"{full_key}_modality_clear_all"):
-                                st.session_state[content_list_key2] = []
-                                st.session_state[full_key] = []
-                                st.rerun()
-                    return
-
-                if key in ["type_ism", "type_gm_seg"]:
-                    type_key = full_key + "_selected"
-                    type_list_key = full_key + "_list"
-                    utils.load_value(type_key)
-                    utils.load_value(type_list_key, default=[])
-                    options = props.get("options", [])
-
-                    col1, col2, col3 = st.columns([3.5, 0.5, 1])
-                    with col1:
-                        st.selectbox(
-                            label=safe_label,
-                            options=options,
-                            key="_" + type_key,
-                            on_change=utils.store_value,
-                            args=[type_key],
-                            label_visibility="hidden",
-                            placeholder="-Select an option-",
-                        )
-                    add_clicked = False
-                    error_msg = None
-
-                    with col2:
-                        st.markdown(
-                            "<div style='margin-top: 26px;'>", unsafe_allow_html=True
-                        )
-                        add_clicked = st.button("➕", key=f"{full_key}_add_button")
-                        st.markdown("</div>", unsafe_allow_html=True)
-
-                    if add_clicked:
-                        value = st.session_state.get(type_key)
-                        if not value:
-                            error_msg = "Please choose an image similarity metrics before adding."
-                        elif value not in st.session_state[type_list_key]:
-                            st.session_state[type_list_key].append(value)
-                            st.session_state[full_key] = st.session_state[type_list_key]
-
-                    if error_msg:
-                        st.markdown(" ")
-                        st.error(error_msg)
-
-                    with col3:
-                        if st.session_state[type_list_key]:
-                            st.markdown(
-                                "<div style='margin-top: 26px;'>",
-                                unsafe_allow_html=True,
-                            )
-                            if st.button("Clear", key=f"{full_key}_clear_button"):
-                                st.session_state[type_list_key] = []
-                                st.session_state[full_key] = []
-                                st.rerun()
-                            st.markdown("</div>", unsafe_allow_html=True)
-
-                    return
-
-                if key in ["type_dose_dm", "type_dose_dm_seg", "type_dose_dm_dp"]:
-                    static_options = [
-                        "GPR (Gamma Passing Rate)",
-                        "MAE (Mean Absolute Error)",
-                        "MSE (Mean Squared Error)",
-                        "Other",
-                    ]
-                    parametric_options = ["D", "V"]
-
-                    dm_key = full_key
-                    dm_list_key = f"{dm_key}_list"
-                    dm_select_key = f"{dm_key}_selected"
-                    dm_dynamic_key = f"{dm_key}_dyn"
-
-                    utils.load_value(dm_list_key, default=[])
-                    utils.load_value(dm_select_key)
-                    utils.load_value(
-                        dm_dynamic_key, default={"prefix": "D", "value": 95}
+    if st.session_state["_" + type_key] == "RTSTRUCT":
+        col1, col2, col3 = st.columns([2, 1, 0.4])
+        with col1:
+            st.selectbox(
+                label=".",
+                options=options,
+                key="_" + type_key,
+                on_change=utils.store_value,
+                args=[type_key],
+                label_visibility="hidden",
+                placeholder="-Select an option-",
+            )
+        with col2:
+            subtype_value = render_structure_picker(subtype_key)
+            st.info(
+                "If the structure name isn't in the dropdown menu, select **Other** and introduce the name manually."
+            )
+            if subtype_value == "Other":
+                custom_key = f"{subtype_key}_custom"
+                utils.load_value(custom_key, default="")
+                st.text_input(
+                    "Enter custom RTSTRUCT subtype",
+                    value=st.session_state.get(custom_key, ""),
+                    key=custom_key,
+                    placeholder="Introduce custom value",
+                )
+                render_structure_suggestion(subtype_key, custom_key)
+
+        with col3:
+            st.markdown(
+                "<div style='margin-top: 26px;'>",
+                unsafe_allow_html=True,
+            )
+            if st.button("➕", key=f"{full_key}_add_button"):
+                subtype = st.session_state.get(subtype_key, "")
+                if subtype == "Other":
+                    subtype = st.session_state.get(
+                        f"{subtype_key}_custom", ""
                     )
+                entry = f"RTSTRUCT_{subtype}"
+                utils.append_state(content_list_key, entry, full_key)
+            st.markdown("</div>", unsafe_allow_html=True)
+
+    else:
+        col1, col2, col3 = st.columns([2, 1, 0.5])
+
+        with col1:
+            st.selectbox(
+                label=".",
+                options=options,
+                key="_" + type_key,
+                on_change=utils.store_value,
+                args=[type_key],
+                label_visibility="hidden",
+                placeholder="-Select an option-",
+            )
+
+        selected_type = st.session_state.get(type_key)
+        custom_key = f"{full_key}_custom_text"
+        utils.load_value(custom_key, default="")
 
-                    col1, col2, col3, col4 = st.columns([2, 2, 0.5, 1])
-                    with col1:
-                        st.selectbox(
-                            "Select dose metric",
-                            options=static_options + parametric_options,
-                            key="_" + dm_select_key,
-                            on_change=utils.store_value,
-                            args=[dm_select_key],
-                            label_visibility="hidden",
-                            placeholder="-Select an option-",
-                        )
-                        dm_type = st.session_state[dm_select_key]
-
-                    with col2:
-                        val = None
-                        if dm_type in parametric_options:
-                            val_key = f"{dm_dynamic_key}_{dm_type}_value"
-                            if val_key not in st.session_state:
-                                st.session_state[val_key] = st.session_state[
-                                    dm_dynamic_key
-                                ]["value"]
-                            st.markdown(
-                                "<div style='margin-top: 26px;'>",
-                                unsafe_allow_html=True,
-                            )
-                            val = st.number_input(
-                                f"{dm_type} value",
-                                min_value=1,
-                                max_value=100,
-                                value=st.session_state[val_key],
-                                key=val_key,
-                                label_visibility="collapsed",
-                                placeholder=f"Enter {dm_type} value",
-                            )
-                            st.markdown("</div>", unsafe_allow_html=True)
-                            st.session_state[dm_dynamic_key] = {
-                                "prefix": dm_type,
-                                "value": val,
-                            }
-
-                        elif dm_type == "Other":
-                            st.markdown(
-                                "<div style='margin-top: 26px;'>",
-                                unsafe_allow_html=True,
-                            )
-                            val = st.text_input(
-                                label="Other dose metric",
-                                label_visibility="collapsed",
-                                placeholder="Enter custom name",
-                                key=f"{dm_key}_other_text",
-                            )
-                            st.markdown("</div>", unsafe_allow_html=True)
-
-                    add_clicked = False
-                    error_msg = None
-
-                    with col3:
-                        st.markdown(
-                            "<div style='margin-top: 26px;'>", unsafe_allow_html=True
-                        )
-                        add_clicked = st.button("➕", key=f"{dm_key}_add_button")
-                        st.markdown("</div>", unsafe_allow_html=True)
-
-                    if add_clicked:
-                        metric = None
-                        if not dm_type:
-                            error_msg = (
-                                "Please choose a dose metric type before adding."
-                            )
-                        elif dm_type in static_options and dm_type != "Other":
-                            metric = dm_type
-                        elif dm_type == "Other":
-                            metric = val.strip() if val else ""
-                            if not metric:
-                                error_msg = (
-                                    "Please enter a custom name for the dose metric."
-                                )
-                        elif dm_type in parametric_options:
-                            val_struct = st.session_state.get(dm_dynamic_key, {})
-                            if not val_struct:
-                                error_msg = "Please enter a value for the dose metric."
-                            else:
-                                metric = f"{dm_type}{val_struct.get('value', '')}"
-
-                        if error_msg:
-                            st.markdown(" ")
-                            st.error(error_msg)
-                        elif metric and metric not in st.session_state[dm_list_key]:
-                            st.session_state[dm_list_key].append(metric)
-                            st.session_state[dm_key] = st.session_state[dm_list_key]
-
-                    with col4:
-                        if st.session_state[dm_list_key]:
-                            st.markdown(
-                                "<div style='margin-top: 26px;'>",
-                                unsafe_allow_html=True,
-                            )
-                            if st.button("Clear", key=f"{dm_key}_clear_button"):
-                                st.session_state[dm_list_key] = []
-                                st.session_state[dm_key] = []
-                                st.rerun()
-                            st.markdown("</div>", unsafe_allow_html=True)
-
-                    return
-                utils.load_value(full_key)
-                st.selectbox(
-                    safe_label,
-                    options=options,
-                    key="_" + full_key,
-                    on_change=utils.store_value,
-                    args=[full_key],
-                    help=description,
-                    label_visibility="hidden",
-                    placeholder="-Select an option-",
+        with col2:
+            st.markdown(
+                "<div style='margin-top: 26px;'>",
+                unsafe_allow_html=True,
+            )
+            if selected_type == "OT (Other)":
+                st.text_input(
+                    "Enter custom input",
+                    value=st.session_state.get(custom_key, ""),
+                    key=custom_key,
+                    label_visibility="collapsed",
+                    placeholder="Introduce custom value",
                 )
+                st.markdown("</div>", unsafe_allow_html=True)
+            else:
+                st.markdown("&nbsp;", unsafe_allow_html=True)
 
+        with col3:
+            st.markdown(
+                "<div style='margin-top: 26px;'>",
+                unsafe_allow_html=True,
+            )
+            add_clicked = st.button("➕", key=f"{full_key}_add_button")
+            st.markdown("</div>", unsafe_allow_html=True)
+
+        if add_clicked:
+            if selected_type in [None, "", DEFAULT_SELECT]:
+                st.error("Please select an option before adding.")
+            elif selected_type == "OT (Other)":
+                custom_text = st.session_state.get(
+                    custom_key, ""
+                ).strip()
+                if not custom_text:
+                    st.error(
+                        "Please enter a custom name before adding."
+                    )
+                else:
+                    utils.append_state(
+                        content_list_key, custom_text, full_key
+                    )
+            else:
+                entry = utils.strip_brackets(selected_type)
+                utils.append_state(content_list_key, entry, full_key)
+
+    render_bulk_entry(
+        key, full_key, content_list_key, full_key, options
+    )
+
+    entries = st.session_state[content_list_key]
+    if entries:
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            tooltip_items = [
+                f"<span title='{html.escape(item)}' style='margin-right: 6px; font-weight: 500; color: #333;'>{html.escape(utils.strip_brackets(item))}</span>"
+                for item in entries
+            ]
+            line = ", ".join(tooltip_items)
+            st.markdown(f"<span>{line}</span>", unsafe_allow_html=True)
+        with col2:
+            if st.button("Clear", key=f"{full_key}_clear_all"):
+                utils.set_state(content_list_key, [])
+                utils.set_state(full_key, [])
+                st.rerun()
+
+
+def _render_treatment_modality_list(plan, full_key):
+    """Treatment modality list."""
+    key, options = plan.key, plan.options
+
+    content_list_key2 = f"{full_key}_modality_list"
+    type_key2 = f"{full_key}_modality_type"
+
+    utils.load_value(content_list_key2, default=[])
+    utils.load_value(type_key2)
+
+    col1, col2 = st.columns([4, 0.5])
+
+    with col1:
+        st.selectbox(
+            label=".",
+            options=options,
+            key="_" + type_key2,
+            on_change=utils.store_value,
+            args=[type_key2],
+            label_visibility="hidden",
+            placeholder="-Select an option-",
+        )
+
+    add_clicked = False
+    with col2:
+        st.markdown(
+            "<div style='margin-top: 26px;'>", unsafe_allow_html=True
+        )
+        add_clicked = st.button(
+            "➕", key=f"{full_key}_modality_add_button"
+        )
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    raw_value2 = st.session_state.get(type_key2)
+    if add_clicked:
+        if raw_value2 in [None, "", DEFAULT_SELECT]:
+            st.error("Please select an option before adding.")
         else:
-            utils.load_value(full_key)
-            st.text_input(
-                safe_label,
-                key="_" + full_key,
+            entry = utils.strip_brackets(raw_value2)
+            utils.append_state(content_list_key2, entry, full_key)
+
+    render_bulk_entry(
+        key, full_key, content_list_key2, full_key, options
+    )
+
+    entries = st.session_state[content_list_key2]
+    if entries:
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            tooltip_items = [
+                f"<span title='{html.escape(item)}' style='margin-right: 6px; font-weight: 500; color: #333;'>{html.escape(utils.strip_brackets(item))}</span>"
+                for item in entries
+            ]
+            line = ", ".join(tooltip_items)
+            st.markdown(f"<span>{line}</span>", unsafe_allow_html=True)
+        with col2:
+            if st.button("Clear", key=f"{full_key}_modality_clear_all"):
+                utils.set_state(content_list_key2, [])
+                utils.set_state(full_key, [])
+                st.rerun()
+
+
+def _render_metric_type_list(plan, full_key):
+    """Image similarity / segmentation metric list."""
+    key, options, safe_label = plan.key, plan.options, plan.safe_label
+
+    type_key = full_key + "_selected"
+    type_list_key = full_key + "_list"
+    utils.load_value(type_key)
+    utils.load_value(type_list_key, default=[])
+
+    col1, col2, col3 = st.columns([3.5, 0.5, 1])
+    with col1:
+        st.selectbox(
+            label=safe_label,
+            options=options,
+            key="_" + type_key,
+            on_change=utils.store_value,
+            args=[type_key],
+            label_visibility="hidden",
+            placeholder="-Select an option-",
+        )
+    add_clicked = False
+    error_msg = None
+
+    with col2:
+        st.markdown(
+            "<div style='margin-top: 26px;'>", unsafe_allow_html=True
+        )
+        add_clicked = st.button("➕", key=f"{full_key}_add_button")
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    if add_clicked:
+        value = st.session_state.get(type_key)
+        if not value:
+            error_msg = "Please choose an image similarity metrics before adding."
+        elif value not in st.session_state[type_list_key]:
+            utils.append_state(type_list_key, value, full_key)
+
+    if error_msg:
+        st.markdown(" ")
+        st.error(error_msg)
+
+    render_bulk_entry(key, full_key, type_list_key, full_key, options)
+
+    with col3:
+        if st.session_state[type_list_key]:
+            st.markdown(
+                "<div style='margin-top: 26px;'>",
+                unsafe_allow_html=True,
+            )
+            if st.button("Clear", key=f"{full_key}_clear_button"):
+                utils.set_state(type_list_key, [])
+                utils.set_state(full_key, [])
+                st.rerun()
+            st.markdown("</div>", unsafe_allow_html=True)
+
+
+def _render_dose_metric_list(plan, full_key):
+    """Dose metric list with D/V parameters and custom names."""
+    key = plan.key
+
+    static_options = DOSE_STATIC_OPTIONS
+    parametric_options = DOSE_PARAMETRIC_OPTIONS
+
+    dm_key = full_key
+    dm_list_key = f"{dm_key}_list"
+    dm_select_key = f"{dm_key}_selected"
+    dm_dynamic_key = f"{dm_key}_dyn"
+
+    utils.load_value(dm_list_key, default=[])
+    utils.load_value(dm_select_key)
+    utils.load_value(
+        dm_dynamic_key, default={"prefix": "D", "value": 95}
+    )
+
+    col1, col2, col3, col4 = st.columns([2, 2, 0.5, 1])
+    with col1:
+        st.selectbox(
+            "Select dose metric",
+            options=static_options + parametric_options,
+            key="_" + dm_select_key,
+            on_change=utils.store_value,
+            args=[dm_select_key],
+            label_visibility="hidden",
+            placeholder="-Select an option-",
+        )
+        dm_type = st.session_state[dm_select_key]
+
+    with col2:
+        val = None
+        if dm_type in parametric_options:
+            val_key = f"{dm_dynamic_key}_{dm_type}_value"
+            if val_key not in st.session_state:
+                utils.set_state(
+                    val_key, st.session_state[dm_dynamic_key]["value"]
+                )
+            st.markdown(
+                "<div style='margin-top: 26px;'>",
+                unsafe_allow_html=True,
+            )
+            val = st.number_input(
+                f"{dm_type} value",
+                min_value=1,
+                max_value=100,
+                value=st.session_state[val_key],
+                key=val_key,
+                label_visibility="collapsed",
+                placeholder=f"Enter {dm_type} value",
+            )
+            st.markdown("</div>", unsafe_allow_html=True)
+            dynamic = {"prefix": dm_type, "value": val}
+            # Only a real change is a write (journal revision, validation)
+            if st.session_state.get(dm_dynamic_key) != dynamic:
+                utils.set_state(dm_dynamic_key, dynamic)
+
+        elif dm_type == "Other":
+            st.markdown(
+                "<div style='margin-top: 26px;'>",
+                unsafe_allow_html=True,
+            )
+            other_key = f"{dm_key}_other_text"
+            utils.load_value(other_key, "")
+            val = st.text_input(
+                label="Other dose metric",
+                label_visibility="collapsed",
+                placeholder="Enter custom name",
+                key="_" + other_key,
                 on_change=utils.store_value,
-                args=[full_key],
-                label_visibility="hidden",
-                placeholder=placeholder,
+                args=[other_key],
+            )
+            st.markdown("</div>", unsafe_allow_html=True)
+
+    add_clicked = False
+    error_msg = None
+
+    with col3:
+        st.markdown(
+            "<div style='margin-top: 26px;'>", unsafe_allow_html=True
+        )
+        add_clicked = st.button("➕", key=f"{dm_key}_add_button")
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    if add_clicked:
+        metric = None
+        if not dm_type:
+            error_msg = (
+                "Please choose a dose metric type before adding."
+            )
+        elif dm_type in static_options and dm_type != "Other":
+            metric = dm_type
+        elif dm_type == "Other":
+            metric = val.strip() if val else ""
+            if not metric:
+                error_msg = (
+                    "Please enter a custom name for the dose metric."
+                )
+        elif dm_type in parametric_options:
+            val_struct = st.session_state.get(dm_dynamic_key, {})
+            if not val_struct:
+                error_msg = "Please enter a value for the dose metric."
+            else:
+                metric = f"{dm_type}{val_struct.get('value', '')}"
+
+        if error_msg:
+            st.markdown(" ")
+            st.error(error_msg)
+        elif metric and metric not in st.session_state[dm_list_key]:
+            utils.append_state(dm_list_key, metric, dm_key)
+
+    render_bulk_entry(key, dm_key, dm_list_key, dm_key)
+
+    with col4:
+        if st.session_state[dm_list_key]:
+            st.markdown(
+                "<div style='margin-top: 26px;'>",
+                unsafe_allow_html=True,
+            )
+            if st.button("Clear", key=f"{dm_key}_clear_button"):
+                utils.set_state(dm_list_key, [])
+                utils.set_state(dm_key, [])
+                st.rerun()
+            st.markdown("</div>", unsafe_allow_html=True)
+
+
+def _render_select(plan, full_key):
+    """Single-choice selectbox."""
+    options, description = plan.options, plan.description
+    safe_label = plan.safe_label
+
+    utils.load_value(full_key)
+    st.selectbox(
+        safe_label,
+        options=options,
+        key="_" + full_key,
+        on_change=utils.store_value,
+        args=[full_key],
+        help=description,
+        label_visibility="hidden",
+        placeholder="-Select an option-",
+    )
+
+
+def _render_text(plan, full_key):
+    """Free-text input."""
+    safe_label, placeholder = plan.safe_label, plan.placeholder
+
+    utils.load_value(full_key)
+    st.text_input(
+        safe_label,
+        key="_" + full_key,
+        on_change=utils.store_value,
+        args=[full_key],
+        label_visibility="hidden",
+        placeholder=placeholder,
+    )
+
+
+def _render_metrics_other(plan, full_key):
+    render_type_metrics_other(full_key, plan.label)
+
+
+def _render_missing_options(plan, full_key):
+    st.warning(f"Field '{plan.label}' is missing options for select dropdown.")
+
+
+_LIST_RENDERERS = {
+    **dict.fromkeys(bulk_entry.CONTENT_LIST_FIELDS, _render_content_list),
+    **dict.fromkeys(
+        bulk_entry.TREATMENT_MODALITY_FIELDS, _render_treatment_modality_list
+    ),
+    **dict.fromkeys(bulk_entry.METRIC_TYPE_FIELDS, _render_metric_type_list),
+    **dict.fromkeys(bulk_entry.DOSE_METRIC_FIELDS, _render_dose_metric_list),
+}
+
+
+@dataclass(slots=True, frozen=True)
+class FieldPlan:
+    """Everything render_field needs for one field, worked out once."""
+
+    key: str
+    label: str
+    safe_label: str
+    description: str
+    placeholder: str
+    options: tuple
+    validator: object
+    tooltip: str
+    renderer: object
+
+    def render(self, section_prefix):
+        full_key = f"{section_prefix}_{self.key}"
+        if self.validator:
+            error = validation_engine.format_error(full_key)
+            if error:
+                st.error(error)
+
+        st.markdown(self.tooltip, unsafe_allow_html=True)
+
+        try:
+            self.renderer(self, full_key)
+        except Exception as e:
+            st.error(f"Error rendering field '{self.label}': {str(e)}")
+
+
+def _choose_renderer(key, field_type, options):
+    if key == "type_metrics_other":
+        return _render_metrics_other
+    if field_type == "select":
+        if not options:
+            return _render_missing_options
+        return _LIST_RENDERERS.get(key, _render_select)
+    return _render_text
+
+
+def compile_field_plan(key, props):
+    label = props.get("label") or key or "Field"
+    field_type = props.get("type", "")
+    options = tuple(props.get("options", ()))
+    return FieldPlan(
+        key=key,
+        label=label,
+        safe_label=label.strip() or "Field",
+        description=props.get("description", ""),
+        placeholder=props.get("placeholder", ""),
+        options=options,
+        validator=schema_views.field_validator(key, props),
+        tooltip=field_tooltip_html(
+            str(label),
+            str(props.get("description", "")),
+            str(field_type),
+            str(props.get("example", "")),
+            bool(props.get("required", False)),
+        ),
+        renderer=_choose_renderer(key, field_type, options),
+    )
+
+
+def field_plan(key, props):
+    """The field's FieldPlan, kept on compiled schema props after first use."""
+    if isinstance(props, schema_views.FieldProps):
+        plan = props.render_plan
+        if plan is None or plan.key != key:
+            plan = props.render_plan = compile_field_plan(key, props)
+        return plan
+    return compile_field_plan(key, props)
+
+
+def section_plan(schema_section, task):
+    """(FieldPlan, ...) of the fields visible for `task`, in schema order."""
+    if isinstance(schema_section, schema_views.SchemaSection):
+        plans = schema_section.render_plans.get(task)
+        if plans is None:
+            plans = tuple(
+                field_plan(key, props)
+                for key, props in schema_section.visible_fields(task)
             )
+            schema_section.render_plans[task] = plans
+        return plans
+    return tuple(
+        field_plan(key, props)
+        for key, props in schema_views.visible_fields(schema_section, task)
+    )
+
+
+def render_field(key, props, section_prefix):
+    field_plan(key, props).render(section_prefix)
+
+
+
+def render_structure_picker(subtype_key):
+    """
+    TG-263 structure selectbox narrowed by a search term and a group. Only
+    the matches (plus the current choice and "Other") are sent as options,
+    never the whole vocabulary.
+    """
+    query_key = f"{subtype_key}__query"
+    group_key = f"{subtype_key}__group"
+    query = st.session_state.get(query_key, "")
+    group = st.session_state.get(group_key)
+
+    matches = list(tg263.search(query, group))
+    current = st.session_state.get(subtype_key)
+    if current and current != "Other" and current not in matches:
+        matches.insert(0, current)
+
+    subtype_value = st.selectbox(
+        label=".",
+        options=matches + ["Other"],
+        key="_" + subtype_key,
+        on_change=utils.store_value,
+        args=[subtype_key],
+        label_visibility="hidden",
+        placeholder="-Select an option-",
+    )
+    st.text_input(
+        "Search structures",
+        key=query_key,
+        placeholder="Search, e.g. parotid left",
+        label_visibility="collapsed",
+    )
+    group_sizes = dict(tg263.groups())
+    st.selectbox(
+        "Structure group",
+        options=[None, *group_sizes],
+        format_func=lambda g: "All groups" if g is None else f"{g} ({group_sizes[g]})",
+        key=group_key,
+        label_visibility="collapsed",
+    )
+    if len(matches) == tg263.SEARCH_LIMIT:
+        st.caption(
+            f"Showing the first {tg263.SEARCH_LIMIT} matches; refine the search."
+        )
+    elif not matches:
+        st.caption("No TG-263 structure matches; pick **Other** to enter it.")
+    return subtype_value
+
+
+def _use_structure(subtype_key, name):
+    utils.set_state(subtype_key, name)
+
+
+def render_structure_suggestion(subtype_key, custom_key):
+    """Offer the TG-263 name closest to the custom structure name typed."""
+    custom = (st.session_state.get(custom_key) or "").strip()
+    if not custom:
+        return
+    matches = [
+        (name, score)
+        for name, score in tg263.suggest(custom)
+        if score >= tg263.MATCH_THRESHOLD
+    ]
+    if not matches:
+        return
+    if matches[0][0] == custom:
+        return
+    st.caption("Standard TG-263 name:")
+    for name, _ in matches[:2]:
+        st.button(
+            f"Use {name}",
+            key=f"{subtype_key}__use_{name}",
+            on_click=_use_structure,
+            args=(subtype_key, name),
+        )
+
 
-    except Exception as e:
-        st.error(f"Error rendering field '{label}': {str(e)}")
+def render_bulk_entry(key, full_key, list_key, mirror_key, options=()):
+    """
+    "Add several" box under a list field. Picks and pasted values are held
+    in a form, so nothing reruns until submit; the whole batch is then
+    validated at once and written with one state update.
+    """
+    with st.expander("Add several at once"):
+        group = None
+        if key in bulk_entry.CONTENT_LIST_FIELDS:
+            # Outside the form so the structure list follows the chosen group
+            group = st.selectbox(
+                "RTSTRUCT structure group",
+                options=[None, *dict(tg263.groups())],
+                format_func=lambda g: "-" if g is None else g,
+                key=f"{full_key}__bulk_group",
+            )
+        with st.form(f"{full_key}__bulk_form", clear_on_submit=True, border=False):
+            picked = []
+            choices_by_label = bulk_entry.pick_choices(key, options, group)
+            for label, choices in choices_by_label.items():
+                picked += st.multiselect(
+                    label,
+                    options=choices,
+                    format_func=lambda c: c.removeprefix(bulk_entry.RTSTRUCT_PREFIX),
+                    key=f"{full_key}__bulk_{label}",
+                )
+            pasted = st.text_area(
+                "Paste values",
+                key=f"{full_key}__bulk_text",
+                placeholder="One per line, or separated by commas",
+            )
+            submitted = st.form_submit_button("Add all")
+
+    if not submitted:
+        return
+    added, rejected = bulk_entry.parse(
+        [*picked, *bulk_entry.split_text(pasted)],
+        bulk_entry.normalizer(key, options),
+        existing=st.session_state.get(list_key) or [],
+    )
+    if added:
+        utils.extend_state(list_key, added, mirror_key)
+        st.success(f"Added {len(added)} value{'s' if len(added) != 1 else ''}.")
+    if rejected:
+        skipped = "; ".join(f"{token} ({reason})" for token, reason in rejected)
+        st.warning(f"Skipped: {skipped}")
 
 
 def render_type_metrics_other(full_key, label):
@@ -613,8 +856,7 @@ def render_type_metrics_other(full_key, label):
             if value and value.strip():
                 value = value.strip()
                 if value not in st.session_state[metrics_list_key]:
-                    st.session_state[metrics_list_key].append(value)
-                    st.session_state[full_key] = st.session_state[metrics_list_key]
+                    utils.append_state(metrics_list_key, value, full_key)
                 else:
                     show_warning = True  # already exists
             else:
@@ -624,72 +866,40 @@ def render_type_metrics_other(full_key, label):
     with col3:
         st.markdown("<div style='margin-top: 26px;'>", unsafe_allow_html=True)
         if st.button("Clear", key=f"{full_key}_clear_button"):
-            st.session_state[metrics_list_key] = []
-            st.session_state[full_key] = []
+            utils.set_state(metrics_list_key, [])
+            utils.set_state(full_key, [])
             st.rerun()
         st.markdown("</div>", unsafe_allow_html=True)
 
     if show_warning:
         st.warning("Please enter a valid metric name before adding.")
 
+    render_bulk_entry("type_metrics_other", full_key, metrics_list_key, full_key)
 
-def create_helpicon(label, description, field_format, example, required=False):
+
+@lru_cache(maxsize=None)
+def field_tooltip_html(label, description, field_format, example, required=False):
+    """
+    Label line with the ⓘ tooltip for one field, built once per distinct
+    field and reused on every rerun. Its CSS is part of utils.PAGE_CSS.
+    """
     required_tag = (
         "<span style='color: black; font-size: 1.2em;'>*</span>" if required else ""
     )
-
-    st.markdown(
-        """
-        <style>
-        .tooltip-inline {
-            display: inline-block;
-            position: relative;
-            margin-left: 6px;
-            cursor: pointer;
-            font-size: 1em;
-            color: #999;
-        }
-
-        .tooltip-inline .tooltiptext {
-            visibility: hidden;
-            width: 320px;
-            background-color: #f9f9f9;
-            color: #333;
-            text-align: left;
-            border-radius: 6px;
-            border: 1px solid #ccc;
-            padding: 10px;
-            position: absolute;
-            top: 125%;
-            left: 0;
-            z-index: 10;
-            box-shadow: 0px 0px 10px rgba(0,0,0,0.1);
-            font-weight: normal;
-            font-size: 0.95em;
-            line-height: 1.4;
-            white-space: normal;
-            word-wrap: break-word;
-            display: inline-block;
-        }
-
-        .tooltip-inline:hover .tooltiptext {
-            visibility: visible;
-        }
-        </style>
-    """,
-        unsafe_allow_html=True,
+    return (
+        "<div style='margin-bottom: 0px; font-weight: 500; font-size: 0.98em;'>"
+        f"{label} {required_tag}"
+        '<span class="tooltip-inline">ⓘ<span class="tooltiptext">'
+        f"<strong>Description:</strong> {description}<br><br>"
+        f"<strong>Format:</strong> {field_format}<br><br>"
+        f"<strong>Example(s):</strong> {example}"
+        "</span></span></div>"
     )
 
-    tooltip_html = f"""
-    <div style='margin-bottom: 0px; font-weight: 500; font-size: 0.98em;'>
-        {label} {required_tag}
-        <span class="tooltip-inline">ⓘ
-            <span class="tooltiptext">
-                <strong>Description:</strong> {description}<br><br>
-                <strong>Format:</strong> {field_format}<br><br>
-                <strong>Example(s):</strong> {example}
-            </span>
-        </span>
-    </div>
-    """
-    st.markdown(tooltip_html, unsafe_allow_html=True)
+
+def create_helpicon(label, description, field_format, example, required=False):
+    # As text, so list examples etc. hit the cache and render as before
+    tooltip = field_tooltip_html(
+        str(label), str(description), str(field_format), str(example), bool(required)
+    )
+    st.markdown(tooltip, unsafe_allow_html=True)
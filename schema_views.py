@@ -0,0 +1,210 @@
+"""
+Compiled, read-only views of model_card_schema.json.
+
+The schema is parsed once per process into read-only dicts. Every field's
+properties carry precompiled data (lowercased task set, compiled `format`
+validator, option tuple), and every section keeps the fields visible for each task
+of TASK_METRIC_MAP plus its required-field sets. The artifact is rebuilt only
+when the content hash of the schema file changes.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from format_validators import compile_validator
+from json_template import TASK_METRIC_MAP
+
+SCHEMA_PATH = "model_card_schema.json"
+TASKS = tuple(TASK_METRIC_MAP)
+
+_lock = threading.Lock()
+_compiled = None
+_stat_signature = None
+
+
+class ReadOnlyDict(dict):
+    """A dict that refuses in-place changes once built."""
+
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("compiled schema views are read-only")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        # copy / pickle produce a plain, mutable dict
+        return (dict, (dict(self),))
+
+
+def lowered_tasks(model_types):
+    if not model_types:
+        return None
+    return frozenset(t.strip().lower() for t in model_types)
+
+
+class FieldProps(ReadOnlyDict):
+    """Properties of one schema field plus the values derived from them."""
+
+    # render_plan: render.FieldPlan, filled in on first render
+    # overrides: {changes: FieldProps}, the copies made by with_props
+    __slots__ = (
+        "key",
+        "label",
+        "required",
+        "allowed_tasks",
+        "validator",
+        "render_plan",
+        "overrides",
+    )
+
+    def __init__(self, key, props):
+        props = dict(props)
+        if "options" in props:
+            props["options"] = tuple(props["options"])
+        if "model_types" in props:
+            props["model_types"] = tuple(props["model_types"])
+        super().__init__(props)
+        self.key = key
+        self.label = props.get("label", key) or key.replace("_", " ").title()
+        self.required = bool(props.get("required", False))
+        self.allowed_tasks = lowered_tasks(props.get("model_types"))
+        self.validator = compile_validator(key, props)
+        self.render_plan = None
+        self.overrides = {}
+
+    def applies_to(self, task):
+        if self.allowed_tasks is None:
+            return True
+        return bool(task) and task.strip().lower() in self.allowed_tasks
+
+
+class SchemaSection(ReadOnlyDict):
+    """Fields of one schema section, with per-task views."""
+
+    # render_plans: {task: (render.FieldPlan, ...)}, filled in on first render
+    __slots__ = ("name", "_visible", "_required", "render_plans")
+
+    def __init__(self, name, fields):
+        super().__init__(
+            (key, FieldProps(key, props)) for key, props in fields.items()
+        )
+        self.name = name
+        self._visible = {
+            task: tuple((k, p) for k, p in self.items() if p.applies_to(task))
+            for task in TASKS
+        }
+        self._required = {
+            task: frozenset(k for k, p in self._visible[task] if p.required)
+            for task in TASKS
+        }
+        self.render_plans = {}
+
+    def visible_fields(self, task):
+        """Return ((key, props), ...) rendered for `task`."""
+        view = self._visible.get(task)
+        if view is None:
+            view = tuple((k, p) for k, p in self.items() if p.applies_to(task))
+        return view
+
+    def required_keys(self, task):
+        keys = self._required.get(task)
+        if keys is None:
+            keys = frozenset(k for k, p in self.visible_fields(task) if p.required)
+        return keys
+
+
+class CompiledSchema(ReadOnlyDict):
+    """Section name -> SchemaSection, tagged with the schema file hash."""
+
+    __slots__ = ("digest",)
+
+    def __init__(self, raw, digest):
+        super().__init__(
+            (name, SchemaSection(name, fields) if isinstance(fields, dict) else fields)
+            for name, fields in raw.items()
+        )
+        self.digest = digest
+
+
+def _stat(path):
+    info = os.stat(path)
+    return (info.st_mtime_ns, info.st_size)
+
+
+def get_compiled_schema(path=SCHEMA_PATH):
+    """
+    Return the process-wide compiled schema.
+
+    Each call costs one stat(); the file is re-read only when its mtime/size
+    change, and recompiled only when its sha256 differs.
+    """
+    global _compiled, _stat_signature
+
+    signature = _stat(path)
+    if _compiled is not None and signature == _stat_signature:
+        return _compiled
+
+    with _lock:
+        if _compiled is not None and signature == _stat_signature:
+            return _compiled
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if _compiled is None or _compiled.digest != digest:
+            _compiled = CompiledSchema(json.loads(data), digest)
+        _stat_signature = signature
+    return _compiled
+
+
+def visible_fields(schema_section, task):
+    """
+    (key, props) pairs of `schema_section` shown for `task`.
+
+    Uses the precomputed view for compiled sections and filters on the fly
+    for plain dicts (e.g. the templates in json_template).
+    """
+    if isinstance(schema_section, SchemaSection):
+        return schema_section.visible_fields(task)
+    return tuple(
+        (key, props)
+        for key, props in schema_section.items()
+        if field_applies(props, task)
+    )
+
+
+def field_applies(props, task):
+    if isinstance(props, FieldProps):
+        return props.applies_to(task)
+    allowed = lowered_tasks(props.get("model_types"))
+    if allowed is None:
+        return True
+    return bool(task) and task.strip().lower() in allowed
+
+
+def with_props(props, **changes):
+    """
+    Copy of a field's props with `changes` applied, for per-render overrides
+    such as a placeholder (compiled props themselves are read-only).
+
+    Copies of compiled props are made once per distinct `changes` and kept
+    on the original, so their render plans survive reruns.
+    """
+    if not isinstance(props, FieldProps):
+        return {**props, **changes}
+    signature = tuple(sorted(changes.items()))
+    copy = props.overrides.get(signature)
+    if copy is None:
+        copy = FieldProps(props.key, {**props, **changes})
+        props.overrides[signature] = copy
+    return copy
+
+
+def field_validator(key, props):
+    """format_validators.FormatValidator of a field, or None."""
+    if isinstance(props, FieldProps):
+        return props.validator
+    return compile_validator(key, props)
@@ -0,0 +1,135 @@
+"""
+Approximate memory held by a session's st.session_state, by key family.
+
+Sizes are estimated by walking each value (containers, object attributes and
+slots) with sys.getsizeof; file-like objects count at least their buffer. An
+object reachable from several keys is counted once, under the first key that
+reaches it, so the family totals add up to the session total.
+"""
+
+import sys
+from collections import OrderedDict
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+
+import streamlit as st
+
+FAMILY_UPLOADS = "uploads"
+FAMILY_EVALUATIONS = "evaluation forms"
+FAMILY_ARCHITECTURES = "architectures"
+FAMILY_CACHES = "internal caches"
+FAMILY_OTHER = "other fields"
+
+FAMILIES = (
+    FAMILY_UPLOADS,
+    FAMILY_EVALUATIONS,
+    FAMILY_ARCHITECTURES,
+    FAMILY_CACHES,
+    FAMILY_OTHER,
+)
+
+UPLOAD_KEYS = {"render_uploads", "appendix_uploads", "all_uploaded_paths", "pdf_job"}
+CACHE_KEYS = {
+    "_validation_engine",
+    "_section_render_cache",
+    "_section_revision_cache",
+    "_card_md_cache",
+    "_card_json_cache",
+    "_card_model_cache",
+    "_change_journal",
+    "_session_key_index",
+    "_upload_owner",
+    "_upload_heartbeat",
+}
+MAX_DEPTH = 12
+
+_SKIP_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+
+
+def key_family(key, state=None):
+    """
+    Family a session-state key is accounted under. With `state`, any other
+    underscore key that does not mirror a data key also counts as a cache.
+    """
+    if key in CACHE_KEYS:
+        return FAMILY_CACHES
+    if state is not None and key.startswith("_") and key[1:] not in state:
+        return FAMILY_CACHES
+    if (
+        key in UPLOAD_KEYS
+        or key.endswith(("_image", "__upload_error"))
+        or "__uploader" in key
+        or key.startswith(("appendix_uploader", "uploader_"))
+    ):
+        return FAMILY_UPLOADS
+    # Widget keys mirror data keys with a leading underscore
+    base = key[1:] if key.startswith("_") else key
+    if base.startswith("evaluation_"):
+        return FAMILY_EVALUATIONS
+    if base.startswith("learning_architecture"):
+        return FAMILY_ARCHITECTURES
+    return FAMILY_OTHER
+
+
+def deep_sizeof(obj, seen=None, depth=0):
+    """Approximate bytes reachable from `obj` that are not already in `seen`."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen or isinstance(obj, _SKIP_TYPES) or depth > MAX_DEPTH:
+        return 0
+    seen.add(id(obj))
+    try:
+        size = sys.getsizeof(obj)
+    except TypeError:
+        size = 0
+
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        return size
+    depth += 1
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            size += deep_sizeof(k, seen, depth) + deep_sizeof(v, seen, depth)
+        return size
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_sizeof(item, seen, depth)
+        return size
+
+    getbuffer = getattr(obj, "getbuffer", None)
+    if callable(getbuffer):
+        # BytesIO reports its buffer in getsizeof, other file-likes may not
+        try:
+            size = max(size, getbuffer().nbytes)
+        except Exception:
+            pass
+    attrs = getattr(obj, "__dict__", None)
+    if isinstance(attrs, dict):
+        size += deep_sizeof(attrs, seen, depth)
+    for cls in type(obj).__mro__:
+        for slot in getattr(cls, "__slots__", ()):
+            if isinstance(slot, str) and hasattr(obj, slot):
+                size += deep_sizeof(getattr(obj, slot), seen, depth)
+    return size
+
+
+def session_memory_by_key(state=None):
+    """{key: approximate bytes} for every key in session state."""
+    state = st.session_state if state is None else state
+    seen = set()
+    return {key: deep_sizeof(state[key], seen) for key in sorted(state.keys())}
+
+
+def session_memory_by_family(state=None):
+    """
+    OrderedDict family -> {"keys": int, "bytes": int, "largest": (key, bytes)}
+    in FAMILIES order.
+    """
+    report = OrderedDict(
+        (family, {"keys": 0, "bytes": 0, "largest": (None, 0)}) for family in FAMILIES
+    )
+    state = st.session_state if state is None else state
+    for key, size in session_memory_by_key(state).items():
+        entry = report[key_family(key, state)]
+        entry["keys"] += 1
+        entry["bytes"] += size
+        if size > entry["largest"][1]:
+            entry["largest"] = (key, size)
+    return report
@@ -1,17 +1,16 @@
-import io
 import os
-from pathlib import Path
-import zipfile
 import streamlit as st
 from custom_pages.model_card_info import model_card_info_render
 from io_utils import save_uploadedfile, upload_json_card, upload_readme_card
 import json
 from custom_pages.other_considerations import other_considerations_render
-from md_renderer import render_full_model_card_md
 from readme_builder import render_hf_readme, upload_readme_to_hub
 from json_template import SCHEMA
 import utils
-import validation_utils
+import validation_engine
+import pdf_jobs
+import zip_export
+import upload_store
 from middleMan import parse_into_json
 from custom_pages.card_metadata import card_metadata_render
 from custom_pages.model_basic_information import model_basic_information_render
@@ -21,11 +20,32 @@ from custom_pages.evaluation_data_mrc import evaluation_data_mrc_render
 from custom_pages.warnings import warnings_render
 from custom_pages.appendix import appendix_render
 
-model_card_schema = utils.get_model_card_schema()
-
 st.set_page_config(layout="wide", initial_sidebar_state="expanded")
 
 SIDEBAR_WIDTH_PX = 500
+PDF_POLL_SECONDS = 2
+
+
+def _format_gate_message(invalid_fields):
+    return (
+        "Cannot download — these fields have an invalid format: "
+        + ", ".join(invalid_fields)
+        + "."
+    )
+
+
+@st.fragment(run_every=PDF_POLL_SECONDS)
+def _pdf_job_progress():
+    """Poll the session's PDF job; rerun the whole app once it has finished."""
+    job = st.session_state.get("pdf_job")
+    if job is None or job.status not in ("queued", "running"):
+        st.rerun()
+    st.info(f"Generating PDF ({job.status}, {job.elapsed:.0f}s)…")
+
+
+def _clear_pdf_job():
+    pdf_jobs.discard(st.session_state.get("pdf_job"))
+    st.session_state.pdf_job = None
 
 
 def sidebar_render():
@@ -109,10 +129,7 @@ def sidebar_render():
             st.session_state.runpage = appendix_render
             st.rerun()
 
-        task = st.session_state.get("task", "Image-to-Image translation")
-        if validation_utils.validate_required_fields(
-            model_card_schema, current_task=task
-        ):
+        if validation_engine.missing_fields():
             if st.button("Warnings"):
                 st.session_state.runpage = warnings_render
                 st.rerun()
@@ -169,11 +186,6 @@ def sidebar_render():
         # TAB 1 — README tools
         # ------------------------------
         with tab_readme:
-            task = st.session_state.get("task")
-            _ = validation_utils.validate_required_fields(
-                SCHEMA, current_task=task
-            )
-
             if "last_readme_text" not in st.session_state:
                 st.session_state.last_readme_text = None
 
@@ -264,17 +276,11 @@ def sidebar_render():
                         "Download Model Card as `.json`"
                     )
                     if download_submit:
-                        if st.session_state.get("format_error"):
-                            st.error(
-                                "Cannot download — there are fields with invalid format."
-                            )
+                        invalid_fields = validation_engine.invalid_format_fields()
+                        if invalid_fields:
+                            st.error(_format_gate_message(invalid_fields))
                         else:
-                            missing_required = (
-                                validation_utils.validate_required_fields(
-                                    model_card_schema,
-                                    current_task=st.session_state.get("task"),
-                                )
-                            )
+                            missing_required = validation_engine.missing_fields()
                             st.session_state.download_ready = True
                             if missing_required:
                                 st.error(
@@ -295,45 +301,61 @@ def sidebar_render():
                 with st.form("form_download_pdf"):
                     pdf_submit = st.form_submit_button("Download Model Card as `.pdf`")
                     if pdf_submit:
-                        if st.session_state.get("format_error"):
-                            st.error("Cannot download — there are fields with invalid format.")
+                        invalid_fields = validation_engine.invalid_format_fields()
+                        if invalid_fields:
+                            st.error(_format_gate_message(invalid_fields))
                         else:
                             try:
-                                from md_renderer import save_model_card_pdf
-                                pdf_path = save_model_card_pdf("model_card.pdf", base_url=os.getcwd())
-                                st.session_state.download_ready_pdf = True
-                                st.session_state.generated_pdf_path = pdf_path  # <- guarda la ruta
+                                from md_renderer import DEFAULT_PDF_CSS, build_model_card_html
+
+                                # A new request replaces this session's previous job
+                                pdf_jobs.discard(st.session_state.get("pdf_job"))
+                                st.session_state.pdf_job = None
+                                st.session_state.pdf_job = pdf_jobs.submit(
+                                    build_model_card_html(css_text=DEFAULT_PDF_CSS),
+                                    css_text=DEFAULT_PDF_CSS,
+                                    base_url=os.getcwd(),
+                                )
+                            except pdf_jobs.PdfQueueFull as e:
+                                st.warning(str(e))
                             except Exception as e:
                                 st.error(f"Failed to generate PDF: {e}")
-                                st.session_state.download_ready_pdf = False
 
-                if st.session_state.get("download_ready_pdf"):
-                    pdf_path = st.session_state.get("generated_pdf_path", "model_card.pdf")
-                    with open(pdf_path, "rb") as f:  # <- usa la misma ruta
-                        st.download_button(
-                            "Your download is ready — click here (PDF)",
-                            f,
-                            file_name="model_card.pdf",
-                            use_container_width=True,
-                            key="btn_download_pdf",
-                        )
-                    st.session_state.download_ready_pdf = False
+                pdf_job = st.session_state.get("pdf_job")
+                if pdf_job is not None:
+                    status = pdf_job.status
+                    if status in ("queued", "running"):
+                        _pdf_job_progress()
+                    elif status == "failed":
+                        st.error(f"Failed to generate PDF: {pdf_job.error}")
+                        pdf_jobs.discard(pdf_job)
+                        st.session_state.pdf_job = None
+                    else:
+                        with open(pdf_job.path, "rb") as f:
+                            st.download_button(
+                                "Your download is ready — click here (PDF)",
+                                f.read(),
+                                file_name="model_card.pdf",
+                                use_container_width=True,
+                                key="btn_download_pdf",
+                                on_click=_clear_pdf_job,
+                            )
 
                 def parse_into_markdown(schema) -> str:
                     """Return the complete Model Card as Markdown via your renderer."""
+                    from md_renderer import render_full_model_card_md
+
                     return render_full_model_card_md()
 
                 # --- MD download form (mirrors your JSON structure) ---
                 with st.form("form_download_md"):
                     download_submit_md = st.form_submit_button("Download Model Card as `.md`")
                     if download_submit_md:
-                        if st.session_state.get("format_error"):
-                            st.error("Cannot download — there are fields with invalid format.")
+                        invalid_fields = validation_engine.invalid_format_fields()
+                        if invalid_fields:
+                            st.error(_format_gate_message(invalid_fields))
                         else:
-                            missing_required = validation_utils.validate_required_fields(
-                                model_card_schema,                   # or SCHEMA if that’s your variable
-                                current_task=st.session_state.get("task"),
-                            )
+                            missing_required = validation_engine.missing_fields()
                             st.session_state.download_ready_md = True
                             if missing_required:
                                 st.error(
@@ -342,7 +364,7 @@ def sidebar_render():
 
                 if st.session_state.get("download_ready_md"):
                     try:
-                        md_text = parse_into_markdown(model_card_schema)  # or SCHEMA
+                        md_text = parse_into_markdown(utils.get_model_card_schema())  # or SCHEMA
                         # Optional: quick preview
                         with st.expander("Preview (.md)", expanded=False):
                             st.code(md_text, language="markdown")
@@ -361,43 +383,38 @@ def sidebar_render():
 
                 
             
-                def _get_uploaded_paths():
-                    paths = st.session_state.get("all_uploaded_paths", set())
-                    return [p for p in list(paths) if isinstance(p, str) and os.path.exists(p)]
+                def _get_uploaded_files():
+                    # (original name, blob path) for every file this session references
+                    return upload_store.uploaded_files()
 
                 # ========== FORM: Download files (.zip only) ==========
                 with st.form("form_download_files"):
                     submit_files = st.form_submit_button("Download files (`.zip`)")
                     if submit_files:
-                        files = _get_uploaded_paths()
+                        files = _get_uploaded_files()
                         if not files:
                             st.warning("No uploaded files to download.")
                         else:
                             st.session_state.download_files_ready = True
 
                 if st.session_state.get("download_files_ready"):
-                    files = _get_uploaded_paths()
+                    files = _get_uploaded_files()
                     if not files:
                         st.warning("No uploaded files to download.")
                     else:
-                        buffer = io.BytesIO()
-                        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-                            for fpath in files:
-                                try:
-                                    arcname = Path(fpath).name
-                                    zf.write(fpath, arcname=arcname)
-                                except Exception:
-                                    st.warning(f"Could not add: {fpath}")
-                        buffer.seek(0)
+                        archive, skipped = zip_export.build_zip(files)
+                        for arcname in skipped:
+                            st.warning(f"Could not add: {arcname}")
 
-                        st.download_button(
-                            label="Download all files (ZIP)",
-                            data=buffer,
-                            file_name="uploaded_files.zip",
-                            mime="application/zip",
-                            key="btn_download_files_zip",
-                            use_container_width=True,
-                        )
+                        with open(archive, "rb") as zip_file:
+                            st.download_button(
+                                label="Download all files (ZIP)",
+                                data=zip_file,
+                                file_name="uploaded_files.zip",
+                                mime="application/zip",
+                                key="btn_download_files_zip",
+                                use_container_width=True,
+                            )
 
                     st.session_state.download_files_ready = False
 
@@ -405,17 +422,15 @@ def sidebar_render():
                 with st.form("form_download_zip_all"):
                     zip_submit = st.form_submit_button("Download `.zip` (Model Card `.json` + files)")
                     if zip_submit:
-                        files = _get_uploaded_paths()
+                        files = _get_uploaded_files()
                         if not files:
                             st.warning("No uploaded files to include in the ZIP.")
                         else:
-                            if st.session_state.get("format_error"):
-                                st.error("Cannot download — there are fields with invalid format.")
+                            invalid_fields = validation_engine.invalid_format_fields()
+                            if invalid_fields:
+                                st.error(_format_gate_message(invalid_fields))
                             else:
-                                missing_required = validation_utils.validate_required_fields(
-                                    model_card_schema,
-                                    current_task=st.session_state.get("task"),
-                                )
+                                missing_required = validation_engine.missing_fields()
                                 st.session_state.download_zip_ready = True
                                 if missing_required:
                                     st.error(
@@ -423,40 +438,30 @@ def sidebar_render():
                                     )
 
                 if st.session_state.get("download_zip_ready"):
-                    files = _get_uploaded_paths()
+                    files = _get_uploaded_files()
                     if not files:
                         st.warning("No uploaded files to include in the ZIP.")
                     else:
                         # 1) Generar JSON como en tu flujo actual
                         card_content = parse_into_json(SCHEMA)  # usa los imports ya presentes
 
-                        # 2) Crear ZIP en memoria con JSON + files
-                        buffer = io.BytesIO()
-                        try:
-                            with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-                                # Añade el JSON
-                                zf.writestr("model_card.json", card_content)
-
-                                # Añade los ficheros subidos
-                                for fpath in files:
-                                    try:
-                                        arcname = f"files/{Path(fpath).name}"
-                                        zf.write(fpath, arcname=arcname)
-                                    except Exception:
-                                        st.warning(f"Could not add: {fpath}")
-                            buffer.seek(0)
+                        # 2) ZIP en disco con JSON + files (reutilizado si nada cambió)
+                        archive, skipped = zip_export.build_zip(
+                            [("model_card.json", card_content.encode("utf-8"))]
+                            + [(f"files/{name}", fpath) for name, fpath in files]
+                        )
+                        for arcname in skipped:
+                            st.warning(f"Could not add: {arcname}")
 
+                        with open(archive, "rb") as zip_file:
                             st.download_button(
                                 "Your download is ready — click here (ZIP)",
-                                data=buffer,
+                                data=zip_file,
                                 file_name="model_card_with_files.zip",
                                 mime="application/zip",
                                 key="btn_download_zip_all",
                                 use_container_width=True,
                             )
-                        finally:
-                            # Limpia el buffer si quieres evitar mantenerlo en sesión
-                            pass
 
                     st.session_state.download_zip_ready = False
 
@@ -472,7 +477,11 @@ def sidebar_render():
                 key="uploader_json_tab1",
             )
             if uploaded_file is not None:
-                name_of_uploaded_file = save_uploadedfile(uploaded_file)
+                # Saved under this session's upload directory so concurrent
+                # users uploading the same file name don't overwrite each other
+                name_of_uploaded_file = save_uploadedfile(
+                    uploaded_file, upload_store.session_dir("hub")
+                )
                 st.session_state.markdown_upload = name_of_uploaded_file
                 st.success(f"File {uploaded_file.name} saved successfully.")
 
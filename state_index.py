@@ -0,0 +1,112 @@
+from bisect import bisect_left, insort
+
+import streamlit as st
+
+_INDEX_STATE_KEY = "_session_key_index"
+
+MODALITY_SOURCES = ("model_inputs", "model_outputs")
+
+
+class SessionKeyIndex:
+    """
+    Registry of the data keys written to st.session_state.
+
+    Keys are kept in a sorted list so prefix lookups are a bisect plus a walk
+    over the matching range, instead of a scan over every key in the session.
+    Keys ending in `model_inputs` / `model_outputs` are also kept in a small
+    modality registry so the per-modality forms can be listed directly.
+    """
+
+    __slots__ = ("_keys", "_sorted", "_modality_keys")
+
+    def __init__(self):
+        self._keys = set()
+        self._sorted = []
+        # key -> source, insertion ordered (same order the scan used to yield)
+        self._modality_keys = {}
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, key):
+        if key in self._keys:
+            return
+        self._keys.add(key)
+        insort(self._sorted, key)
+        for source in MODALITY_SOURCES:
+            if key.endswith(source):
+                self._modality_keys[key] = source
+                break
+
+    def discard(self, key):
+        if key not in self._keys:
+            return
+        self._keys.discard(key)
+        pos = bisect_left(self._sorted, key)
+        if pos < len(self._sorted) and self._sorted[pos] == key:
+            del self._sorted[pos]
+        self._modality_keys.pop(key, None)
+
+    def with_prefix(self, prefix):
+        """Return the registered keys starting with `prefix`, in sorted order."""
+        out = []
+        keys = self._sorted
+        for i in range(bisect_left(keys, prefix), len(keys)):
+            key = keys[i]
+            if not key.startswith(prefix):
+                break
+            out.append(key)
+        return out
+
+    def modality_keys(self):
+        return list(self._modality_keys.items())
+
+
+def get_index():
+    """Return the key index of the current session, creating it on first use."""
+    index = st.session_state.get(_INDEX_STATE_KEY)
+    if index is None:
+        index = SessionKeyIndex()
+        # One-time seed for sessions that already hold data (e.g. after a code reload)
+        for key in list(st.session_state.keys()):
+            if isinstance(key, str) and not key.startswith("_"):
+                index.add(key)
+        st.session_state[_INDEX_STATE_KEY] = index
+    return index
+
+
+def register(key):
+    if not key.startswith("_"):
+        get_index().add(key)
+
+
+def unregister(key):
+    get_index().discard(key)
+
+
+def keys_with_prefix(prefix):
+    return get_index().with_prefix(prefix)
+
+
+def items_with_prefix(prefix):
+    """Yield (key, value) for every indexed key starting with `prefix`."""
+    for key in get_index().with_prefix(prefix):
+        if key in st.session_state:
+            yield key, st.session_state[key]
+
+
+def modality_entries():
+    """
+    Return [{"modality": ..., "source": "model_inputs"|"model_outputs"}, ...]
+    built from the modality registry.
+    """
+    entries = []
+    for key, source in get_index().modality_keys():
+        value = st.session_state.get(key)
+        if isinstance(value, list):
+            for item in value:
+                entries.append({"modality": item, "source": source})
+    return entries
@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+class SessionState(dict):
+    """Plain-dict stand-in for st.session_state outside a Streamlit run."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+
+@pytest.fixture
+def session_state(monkeypatch):
+    import streamlit as st
+
+    state = SessionState()
+    monkeypatch.setattr(st, "session_state", state)
+    monkeypatch.chdir(ROOT)
+    return state
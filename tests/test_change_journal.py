@@ -0,0 +1,56 @@
+import change_journal
+import utils
+
+NOTE_KEY = "evaluation_e0_figure_dm_appendix_note"
+OTHER_KEY = "evaluation_e0_type_dose_dm_other_text"
+
+
+def _edit(state, key, value):
+    """What a widget bound to `"_" + key` does when the user types."""
+    state["_" + key] = value
+    utils.store_value(key)
+
+
+def test_widget_edits_bump_the_revision(session_state):
+    for key in (NOTE_KEY, OTHER_KEY):
+        utils.load_value(key, "")
+        before = change_journal.revision()
+
+        _edit(session_state, key, "Fig. 2")
+
+        assert change_journal.revision() > before
+        assert change_journal.changed_since(before) == {key}
+        assert session_state[key] == "Fig. 2"
+
+
+def test_reloading_a_value_is_not_a_change(session_state):
+    utils.load_value(NOTE_KEY, "")
+    before = change_journal.revision()
+
+    utils.load_value(NOTE_KEY, "")
+
+    assert change_journal.revision() == before
+    assert change_journal.changed_since(before) == set()
+
+
+def test_journal_forgets_beyond_its_size(session_state):
+    start = change_journal.revision()
+    for i in range(change_journal.JOURNAL_SIZE + 1):
+        change_journal.record(f"key_{i}")
+
+    assert change_journal.changed_since(start) is None
+    recent = change_journal.revision() - 1
+    assert change_journal.changed_since(recent) == {
+        f"key_{change_journal.JOURNAL_SIZE}"
+    }
+
+
+def test_dirty_sections(session_state):
+    start = change_journal.revision()
+    utils.set_state("model_basic_information_name", "Model")
+    utils.set_state(NOTE_KEY, "Fig. 3")
+
+    assert change_journal.dirty_sections(start) == {
+        "model_basic_information",
+        change_journal.EVAL_SECTION,
+    }
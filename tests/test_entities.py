@@ -0,0 +1,26 @@
+import entities
+import md_renderer
+import utils
+
+
+def test_reloading_architectures_drops_the_old_ones(session_state):
+    old_id = entities.add_architecture()
+    utils.set_state(f"learning_architecture_{old_id}_model_name", "old net")
+
+    (new_id,) = entities.set_architectures(1)
+    utils.set_state(f"learning_architecture_{new_id}_model_name", "new net")
+
+    assert new_id != old_id
+    assert f"learning_architecture_{old_id}_model_name" not in session_state
+    architectures = md_renderer._collect_learning_architectures_from_state()
+    assert [la["id"] for la in architectures] == [new_id]
+    assert architectures[0]["model_name"] == "new net"
+
+
+def test_unregistered_architecture_keys_stay_out_of_the_card(session_state):
+    arch_id = entities.add_architecture()
+    utils.set_state(f"learning_architecture_{arch_id + 7}_model_name", "stray")
+
+    architectures = md_renderer._collect_learning_architectures_from_state()
+
+    assert [la["id"] for la in architectures] == [arch_id]
@@ -0,0 +1,50 @@
+import zipfile
+
+import zip_export
+
+
+def _members(tmp_path):
+    text = tmp_path / "notes.txt"
+    text.write_bytes(b"model card notes\n" * 50_000)
+    image = tmp_path / "figure.png"
+    image.write_bytes(bytes(range(256)) * 4_000)
+    empty = tmp_path / "empty.md"
+    empty.write_bytes(b"")
+    return [
+        ("uploads/notes.txt", str(text)),
+        ("uploads/figure.png", str(image)),
+        ("uploads/empty.md", str(empty)),
+        ("model_card.json", b'{"task": "Segmentation"}'),
+    ]
+
+
+def test_archive_round_trips(tmp_path, monkeypatch):
+    monkeypatch.setattr(zip_export, "ZIP_OUTPUT_DIR", str(tmp_path / "out"))
+    members = _members(tmp_path)
+
+    path, skipped = zip_export.build_zip(members)
+
+    assert skipped == []
+    with zipfile.ZipFile(path) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == [name for name, _ in members]
+        for name, source in members:
+            expected = source if isinstance(source, bytes) else open(source, "rb").read()
+            assert zf.read(name) == expected
+        infos = {i.filename: i for i in zf.infolist()}
+        assert infos["uploads/figure.png"].compress_type == zipfile.ZIP_STORED
+        assert infos["uploads/notes.txt"].compress_type == zipfile.ZIP_DEFLATED
+
+
+def test_missing_files_are_skipped_and_archives_reused(tmp_path, monkeypatch):
+    monkeypatch.setattr(zip_export, "ZIP_OUTPUT_DIR", str(tmp_path / "out"))
+    members = _members(tmp_path) + [("uploads/gone.pdf", str(tmp_path / "gone.pdf"))]
+
+    path, skipped = zip_export.build_zip(members)
+    again, _ = zip_export.build_zip(members)
+
+    assert skipped == ["uploads/gone.pdf"]
+    assert again == path
+    with zipfile.ZipFile(path) as zf:
+        assert zf.testzip() is None
+        assert "uploads/gone.pdf" not in zf.namelist()
@@ -1,3 +1,9 @@
+import heapq
+import re
+from bisect import bisect_left
+from difflib import SequenceMatcher
+from functools import lru_cache
+
 RTSTRUCT_SUBTYPES = [
     "A_Aorta",
     "A_Aorta_Asc",
@@ -717,3 +723,308 @@ RTSTRUCT_SUBTYPES = [
     "Vulva",
     "Wall_Vagina",
 ]
+
+
+# ---------------------------------------------------------------------------
+# Search index
+#
+# The vocabulary is compiled once per process into groups (TG-263 category
+# prefixes such as A_, V_, LN_, Bone_), a laterality tag (_L / _R suffix) and
+# three sorted lookup tables, so pickers can offer the handful of names that
+# match a query instead of shipping all ~700 to the browser on every render.
+# ---------------------------------------------------------------------------
+
+CATEGORY_LABELS = {
+    "A": "Arteries",
+    "V": "Veins",
+    "LN": "Lymph nodes",
+    "Bone": "Bones",
+    "VB": "Vertebrae",
+    "CN": "Cranial nerves",
+    "Musc": "Muscles",
+    "Glnd": "Glands",
+    "Lobe": "Brain lobes",
+    "Sinus": "Sinuses",
+    "Spc": "Spaces",
+    "Cist": "Cisterns",
+    "Joint": "Joints",
+    "Proc": "Bone processes",
+    "Valve": "Heart valves",
+}
+TARGETS = "Targets and PRVs"
+OTHER = "Organs and other"
+CATEGORIES = [*CATEGORY_LABELS.values(), TARGETS, OTHER]
+LATERALITY = {"L": "Left", "R": "Right"}
+
+SEARCH_LIMIT = 50
+
+_TARGET = re.compile(r"(^|[-_])(GTV|CTV|PTV|ITV|PRV)", re.IGNORECASE)
+_WORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+_LATERALITY_WORDS = {"left": "L", "right": "R"}
+
+
+def category(name):
+    if _TARGET.search(name):
+        return TARGETS
+    head, sep, _ = name.partition("_")
+    return CATEGORY_LABELS.get(head, OTHER) if sep else OTHER
+
+
+def laterality(name):
+    """"L", "R" or None."""
+    side = name.rsplit("_", 1)[-1] if "_" in name else None
+    return side if side in LATERALITY else None
+
+
+def _words(name):
+    """Searchable words: "Glnd_Submand_L" -> glnd, submand, l."""
+    return {w.lower() for part in re.split(r"[_\-]", name) for w in _WORD.findall(part)}
+
+
+@lru_cache(maxsize=1)
+def _index():
+    names = list(dict.fromkeys(RTSTRUCT_SUBTYPES))
+    position = {name: i for i, name in enumerate(names)}
+    lowered = sorted((name.lower(), name) for name in names)
+    words = sorted(
+        (word, name) for name in names for word in _words(name) | {name.lower()}
+    )
+    groups = {label: [] for label in CATEGORIES}
+    for name in names:
+        groups[category(name)].append(name)
+    return {
+        "names": names,
+        "position": position,
+        "lowered": lowered,
+        "words": words,
+        "haystack": "\n".join(low for low, _ in lowered),
+        "groups": {label: tuple(v) for label, v in groups.items() if v},
+        "by_lower": {low: name for low, name in lowered},
+    }
+
+
+def groups():
+    """[(category label, number of structures)] in display order."""
+    return [(label, len(names)) for label, names in _index()["groups"].items()]
+
+
+def canonical(name):
+    """The vocabulary's spelling of `name` (case-insensitive), or None."""
+    return _index()["by_lower"].get((name or "").strip().lower())
+
+
+def _prefixed(table, prefix):
+    i = bisect_left(table, (prefix,))
+    while i < len(table) and table[i][0].startswith(prefix):
+        yield table[i][1]
+        i += 1
+
+
+def _substring(haystack, lowered, needle):
+    start = 0
+    while (hit := haystack.find(needle, start)) != -1:
+        line_start = haystack.rfind("\n", 0, hit) + 1
+        line_end = haystack.find("\n", hit)
+        line_end = len(haystack) if line_end == -1 else line_end
+        yield lowered[haystack.count("\n", 0, line_start)][1]
+        start = line_end + 1
+
+
+@lru_cache(maxsize=512)
+def search(query="", group=None, side=None, limit=SEARCH_LIMIT):
+    """
+    Structure names matching `query`, best first, at most `limit`.
+
+    Whole-name prefix matches rank before word-prefix matches (so "sub"
+    finds Glnd_Submand_L), then plain substring matches. "left"/"right" in
+    the query act like `side` ("L"/"R"); `group` is a category label.
+    """
+    index = _index()
+    terms = []
+    for term in (query or "").lower().split():
+        if term in _LATERALITY_WORDS and side is None:
+            side = _LATERALITY_WORDS[term]
+        else:
+            terms.append(term)
+
+    if group is not None:
+        allowed = set(index["groups"].get(group, ()))
+    else:
+        allowed = None
+
+    def keep(name):
+        return (allowed is None or name in allowed) and (
+            side is None or laterality(name) == side
+        )
+
+    if not terms:
+        pool = index["groups"].get(group, ()) if group is not None else index["names"]
+        return tuple(name for name in pool if keep(name))[:limit]
+
+    first, rest = terms[0], terms[1:]
+    candidates = dict.fromkeys(
+        [
+            *_prefixed(index["lowered"], first),
+            *sorted(set(_prefixed(index["words"], first)), key=index["position"].get),
+            *_substring(index["haystack"], index["lowered"], first),
+        ]
+    )
+    out = []
+    for name in candidates:
+        low = name.lower()
+        if keep(name) and all(term in low for term in rest):
+            out.append(name)
+            if len(out) == limit:
+                break
+    return tuple(out)
+
+
+# ---------------------------------------------------------------------------
+# Fuzzy matching of free-text structure names
+#
+# "Parotid Left", "L_Parotid" and "parotid_lt" all parse to the key
+# ("parotid", "L") and hit Parotid_L through a dict. Anything else is scored
+# against a character-trigram index over the same parsed words (order does
+# not matter), and the best few candidates are re-ranked by sequence
+# similarity (difflib's ratio, much cheaper here than a Levenshtein table).
+# ---------------------------------------------------------------------------
+
+MATCH_THRESHOLD = 0.6
+RERANK = 6
+
+_SIDE_WORDS = {"l": "L", "lt": "L", "left": "L", "r": "R", "rt": "R", "right": "R"}
+# Spelled-out words users type for the abbreviations TG-263 uses
+_ABBREVIATIONS = {
+    "artery": "a",
+    "arteries": "a",
+    "vein": "v",
+    "veins": "v",
+    "gland": "glnd",
+    "glands": "glnd",
+    "muscle": "musc",
+    "muscles": "musc",
+    "nerve": "nrv",
+    "nerves": "nrv",
+    "lymph": "ln",
+    "node": "",
+    "nodes": "",
+    "vertebra": "vb",
+    "vertebrae": "vb",
+    "submandibular": "submand",
+    "sublingual": "subling",
+    "maxillary": "maxilry",
+    "space": "spc",
+    "process": "proc",
+    "cistern": "cist",
+}
+
+
+def _parse(name, expand=False):
+    """Free text -> (sorted body words, side)."""
+    side = None
+    words = []
+    for part in re.split(r"[^A-Za-z0-9]+", name or ""):
+        for word in _WORD.findall(part):
+            word = word.lower()
+            if word in _SIDE_WORDS:
+                side = _SIDE_WORDS[word]
+                continue
+            if expand:
+                word = _ABBREVIATIONS.get(word, word)
+            if word:
+                words.append(word)
+    return tuple(sorted(words)), side
+
+
+def _trigrams(words):
+    grams = set()
+    for word in words:
+        padded = f" {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+@lru_cache(maxsize=1)
+def _fuzzy_index():
+    names = _index()["names"]
+    exact = {}
+    entries = []
+    postings = {}
+    for i, name in enumerate(names):
+        words, side = _parse(name)
+        exact.setdefault((words, side), name)
+        grams = _trigrams(words)
+        entries.append((name, words, side, len(grams)))
+        for gram in grams:
+            postings.setdefault(gram, []).append(i)
+    return {"exact": exact, "entries": entries, "postings": postings}
+
+
+@lru_cache(maxsize=4096)
+def suggest(name, limit=3):
+    """
+    ((TG-263 name, score), ...) for free text `name`, best first; score is
+    1.0 for an exact match up to spelling, case, word order and laterality
+    notation.
+    """
+    index = _fuzzy_index()
+    for expand in (False, True):
+        words, side = _parse(name, expand)
+        hit = index["exact"].get((words, side))
+        if hit:
+            return ((hit, 1.0),)
+    if not words:
+        return ()
+
+    grams = _trigrams(words)
+    shared = {}
+    for gram in grams:
+        for i in index["postings"].get(gram, ()):
+            shared[i] = shared.get(i, 0) + 1
+
+    entries = index["entries"]
+    dice = []
+    for i, count in shared.items():
+        candidate, cand_words, cand_side, n_grams = entries[i]
+        if cand_side != side:
+            # Never suggest the other side; sided <-> unsided is only a mild miss
+            if side and cand_side:
+                continue
+            penalty = 0.1
+        else:
+            penalty = 0.0
+        dice.append((2 * count / (len(grams) + n_grams) - penalty, i))
+
+    # Dice coefficient on trigrams picks the candidates, sequence similarity
+    # of the joined words ranks them
+    query = " ".join(words)
+    scored = []
+    for score, i in heapq.nlargest(max(RERANK, limit), dice):
+        candidate, cand_words = entries[i][:2]
+        edit = SequenceMatcher(None, query, " ".join(cand_words), False).ratio()
+        scored.append((candidate, round((score + edit) / 2, 3)))
+    scored.sort(key=lambda item: -item[1])
+    return tuple(scored[:limit])
+
+
+def normalize(name, min_score=MATCH_THRESHOLD):
+    """Best TG-263 name for free text `name`, or None below `min_score`."""
+    matches = suggest((name or "").strip())
+    if matches and matches[0][1] >= min_score:
+        return matches[0][0]
+    return None
+
+
+def normalize_many(names, min_score=MATCH_THRESHOLD):
+    """
+    normalize() over a whole list: each distinct spelling is resolved once,
+    so an imported list of hundreds of names costs one lookup per variant.
+    """
+    resolved = {}
+    out = []
+    for name in names:
+        key = (name or "").strip()
+        if key not in resolved:
+            resolved[key] = normalize(key, min_score)
+        out.append(resolved[key])
+    return out
@@ -0,0 +1,488 @@
+"""
+Content-addressed store for uploaded files, namespaced per session.
+
+Uploads are streamed to disk in chunks while being hashed and stored once per
+distinct content under uploads/blobs/<aa>/<bb>/<sha256>. Each session owns a
+directory uploads/sessions/<owner>/ in which every registered file is a hard
+link to its blob, so the link count of a blob is its reference count and
+survives server restarts. A blob whose only link is its own is an orphan.
+
+A background collector removes session directories that have not been seen
+for UPLOAD_SESSION_TTL_S, then deletes orphaned blobs and stale leftovers of
+the previous flat layout. Uploads are refused past the per-session or global
+disk quota.
+
+Limits are read from the environment:
+    MODEL_CARD_UPLOAD_SESSION_QUOTA_MB  per session             (default 200, 0 = off)
+    MODEL_CARD_UPLOAD_GLOBAL_QUOTA_MB   all sessions            (default 5120, 0 = off)
+    MODEL_CARD_UPLOAD_SESSION_TTL_S     idle time before GC     (default 86400)
+    MODEL_CARD_UPLOAD_GC_INTERVAL_S     collector period        (default 900)
+
+Record format kept in st.session_state.render_uploads[key]:
+    {"path", "name", "sha256", "size", "mime"}
+Uploaded file objects themselves are never kept in session state.
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import streamlit as st
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+UPLOAD_ROOT = Path("uploads")
+BLOB_ROOT = UPLOAD_ROOT / "blobs"
+SESSION_ROOT = UPLOAD_ROOT / "sessions"
+# Flat directories used before uploads were namespaced; only ever cleaned up
+LEGACY_DIRS = (UPLOAD_ROOT, Path("uploaded_files"))
+CHUNK_SIZE = 1024 * 1024
+
+UPLOAD_SESSION_QUOTA_MB = _env_int("MODEL_CARD_UPLOAD_SESSION_QUOTA_MB", 200)
+UPLOAD_GLOBAL_QUOTA_MB = _env_int("MODEL_CARD_UPLOAD_GLOBAL_QUOTA_MB", 5120)
+UPLOAD_SESSION_TTL_S = _env_int("MODEL_CARD_UPLOAD_SESSION_TTL_S", 24 * 3600)
+UPLOAD_GC_INTERVAL_S = max(10, _env_int("MODEL_CARD_UPLOAD_GC_INTERVAL_S", 900))
+# Files younger than this are never collected (they may be mid-registration)
+GC_GRACE_S = 300
+HEARTBEAT_S = 60
+
+_OWNER_STATE_KEY = "_upload_owner"
+_HEARTBEAT_STATE_KEY = "_upload_heartbeat"
+_HEARTBEAT_FILE = ".last_seen"
+
+# Serialises publishing/linking blobs against deleting orphaned ones
+_store_lock = threading.Lock()
+_global_bytes = None  # bytes held by blobs, None until first scanned
+
+_collector_started = False
+_collector_lock = threading.Lock()
+
+
+class UploadQuotaExceeded(RuntimeError):
+    pass
+
+
+def blob_path(sha256):
+    return BLOB_ROOT / sha256[:2] / sha256[2:4] / sha256
+
+
+def _safe_name(name):
+    return re.sub(r"[^A-Za-z0-9._-]", "_", name).lstrip(".") or "file"
+
+
+def session_owner():
+    """Stable id of the current session, used to name its upload directory."""
+    owner = st.session_state.get(_OWNER_STATE_KEY)
+    if owner is None:
+        owner = uuid.uuid4().hex
+        st.session_state[_OWNER_STATE_KEY] = owner
+    return owner
+
+
+def session_dir(*parts):
+    """This session's upload directory (created on demand), or a subdirectory."""
+    path = SESSION_ROOT / session_owner()
+    for part in parts:
+        path = path / _safe_name(part)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def touch_session(force=False):
+    """
+    Mark the current session as alive so the collector keeps its files.
+    Cheap to call on every rerun: the heartbeat file is written at most once
+    per HEARTBEAT_S.
+    """
+    now = time.time()
+    if not force and now - st.session_state.get(_HEARTBEAT_STATE_KEY, 0) < HEARTBEAT_S:
+        return
+    if _OWNER_STATE_KEY not in st.session_state and not force:
+        # Nothing uploaded yet, no directory to keep alive
+        return
+    st.session_state[_HEARTBEAT_STATE_KEY] = now
+    try:
+        (session_dir() / _HEARTBEAT_FILE).touch()
+    except OSError:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Disk usage and quotas
+# ---------------------------------------------------------------------------
+
+
+def _tree_bytes(root, seen=None):
+    """Size of regular files under `root`, each inode counted once."""
+    seen = set() if seen is None else seen
+    total = 0
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            try:
+                info = os.lstat(os.path.join(dirpath, filename))
+            except OSError:
+                continue
+            ident = (info.st_dev, info.st_ino)
+            if ident not in seen:
+                seen.add(ident)
+                total += info.st_size
+    return total
+
+
+def _scan_global_bytes():
+    global _global_bytes
+    total = _tree_bytes(BLOB_ROOT)
+    with _store_lock:
+        _global_bytes = total
+    return total
+
+
+def global_bytes():
+    if _global_bytes is None:
+        return _scan_global_bytes()
+    return _global_bytes
+
+
+def _adjust_global(delta):
+    # Caller holds _store_lock
+    global _global_bytes
+    if _global_bytes is not None:
+        _global_bytes = max(0, _global_bytes + delta)
+
+
+def session_bytes(exclude_key=None):
+    """Bytes registered by this session (deduplicated within the session)."""
+    uploads = st.session_state.get("render_uploads", {}) or {}
+    by_content = {}
+    for key, record in uploads.items():
+        if key == exclude_key:
+            continue
+        ident = record.get("sha256") or record.get("path")
+        by_content[ident] = record.get("size") or 0
+    return sum(by_content.values())
+
+
+def usage():
+    """Disk usage of this session and of the whole store, with quotas (bytes)."""
+    uploads = st.session_state.get("render_uploads", {}) or {}
+    return {
+        "session_files": len(uploads),
+        "session_bytes": session_bytes(),
+        "session_quota": UPLOAD_SESSION_QUOTA_MB * 1024 * 1024,
+        "global_bytes": global_bytes(),
+        "global_quota": UPLOAD_GLOBAL_QUOTA_MB * 1024 * 1024,
+    }
+
+
+def _check_quota(key, size):
+    if size is None:
+        return
+    session_quota = UPLOAD_SESSION_QUOTA_MB * 1024 * 1024
+    if session_quota and session_bytes(exclude_key=key) + size > session_quota:
+        raise UploadQuotaExceeded(
+            f"This upload would exceed the {UPLOAD_SESSION_QUOTA_MB} MB limit for "
+            "your session. Remove some files first."
+        )
+    global_quota = UPLOAD_GLOBAL_QUOTA_MB * 1024 * 1024
+    if global_quota and global_bytes() + size > global_quota:
+        # Reclaim expired sessions before refusing
+        collect_garbage()
+        if global_bytes() + size > global_quota:
+            raise UploadQuotaExceeded(
+                "The server's upload storage is full. Please try again later."
+            )
+
+
+# ---------------------------------------------------------------------------
+# Blobs and links
+# ---------------------------------------------------------------------------
+
+
+def _link(blob, link_path):
+    """Atomically make `link_path` a hard link to `blob`."""
+    link_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = link_path.with_name(f".{link_path.name}.{uuid.uuid4().hex[:8]}")
+    try:
+        os.link(blob, tmp)
+    except OSError:
+        # No hard links on this filesystem: keep a private copy instead. The
+        # blob then looks orphaned and is collected, the copy stays valid.
+        shutil.copyfile(blob, tmp)
+    os.replace(tmp, link_path)
+
+
+def _write_blob(uploaded_file, link_path):
+    """
+    Stream `uploaded_file` into the store and link it at `link_path`.
+    Returns (sha256, size). Identical content is written once.
+    """
+    BLOB_ROOT.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+
+    uploaded_file.seek(0)
+    fd, tmp_path = tempfile.mkstemp(dir=BLOB_ROOT, prefix=".incoming-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := uploaded_file.read(CHUNK_SIZE):
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        sha256 = digest.hexdigest()
+        final = blob_path(sha256)
+        # Publishing the blob and linking it happen under the same lock as
+        # orphan deletion, so a blob can't vanish in between
+        with _store_lock:
+            if final.exists():
+                os.remove(tmp_path)
+            else:
+                final.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_path, final)
+                _adjust_global(size)
+            _link(final, link_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    finally:
+        uploaded_file.seek(0)
+    return sha256, size
+
+
+def _drop_if_orphaned(sha256, min_age_s=0, now=None):
+    """Delete the blob for `sha256` if no session links to it any more."""
+    path = blob_path(sha256)
+    with _store_lock:
+        try:
+            info = path.stat()
+        except OSError:
+            return False
+        now = time.time() if now is None else now
+        if info.st_nlink > 1 or now - info.st_mtime < min_age_s:
+            return False
+        try:
+            path.unlink()
+        except OSError:
+            return False
+        _adjust_global(-info.st_size)
+        return True
+
+
+def reference_count(sha256):
+    """Number of session links to the blob for `sha256`."""
+    try:
+        return blob_path(sha256).stat().st_nlink - 1
+    except OSError:
+        return 0
+
+
+def _registries():
+    if "render_uploads" not in st.session_state:
+        st.session_state.render_uploads = {}
+    if "all_uploaded_paths" not in st.session_state:
+        st.session_state.all_uploaded_paths = set()
+    return st.session_state.render_uploads, st.session_state.all_uploaded_paths
+
+
+def store_upload(key, uploaded_file, name=None):
+    """
+    Persist `uploaded_file` and register it under `key` for this session,
+    replacing the file previously registered there. Returns the record.
+
+    Raises UploadQuotaExceeded when the session or global quota would be
+    exceeded.
+    """
+    uploads, paths = _registries()
+    name = name or getattr(uploaded_file, "name", "upload")
+    _check_quota(key, getattr(uploaded_file, "size", None))
+
+    link_path = session_dir("files", key) / _safe_name(name)
+    previous = uploads.get(key)
+    sha256, size = _write_blob(uploaded_file, link_path)
+    touch_session(force=True)
+    path = str(link_path)
+
+    if previous is not None:
+        if previous.get("path") != path:
+            detach(key)
+        elif previous.get("sha256") != sha256 and previous.get("sha256"):
+            # Same link path now points at the new blob; the old one may be unused
+            _drop_if_orphaned(previous["sha256"])
+
+    mime, _ = mimetypes.guess_type(name)
+    record = {
+        "path": path,
+        "name": name,
+        "sha256": sha256,
+        "size": size,
+        "mime": mime or getattr(uploaded_file, "type", None),
+    }
+    uploads[key] = record
+    paths.add(path)
+    return record
+
+
+def copy_upload(src_key, dst_key):
+    """
+    Register the file under `src_key` for `dst_key` as well, without copying
+    its bytes: the new session file is another link to the same blob. Returns
+    the new record, or None when there is nothing to copy.
+    """
+    uploads, paths = _registries()
+    source = uploads.get(src_key)
+    if source is None or not source.get("path"):
+        return None
+    src_path = Path(source["path"])
+    link_path = session_dir("files", dst_key) / src_path.name
+    if uploads.get(dst_key) is not None:
+        detach(dst_key)
+    with _store_lock:
+        if not src_path.exists():
+            return None
+        _link(src_path, link_path)
+    touch_session(force=True)
+
+    record = dict(source, path=str(link_path))
+    uploads[dst_key] = record
+    paths.add(record["path"])
+    return record
+
+
+def file_ref(record):
+    """The part of a record other session keys may hold: path, hash, size, mime."""
+    return {k: record.get(k) for k in ("path", "sha256", "size", "mime")}
+
+
+def detach(key):
+    """Forget the file registered under `key`, releasing its blob."""
+    uploads, paths = _registries()
+    record = uploads.pop(key, None)
+    if record is None:
+        return None
+    path = record.get("path")
+    paths.discard(path)
+    if path:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    if record.get("sha256"):
+        _drop_if_orphaned(record["sha256"])
+    return record
+
+
+def uploaded_files():
+    """
+    [(file name, path)] of this session's files that still exist on disk, one
+    entry per distinct (name, content). Different files sharing a name are
+    disambiguated with a content-hash prefix.
+    """
+    uploads = st.session_state.get("render_uploads", {}) or {}
+    seen = set()
+    names = {}
+    files = []
+    for record in uploads.values():
+        path = record.get("path")
+        if not path or not os.path.exists(path):
+            continue
+        name = record.get("name") or os.path.basename(path)
+        ident = (name, record.get("sha256") or path)
+        if ident in seen:
+            continue
+        seen.add(ident)
+        if names.setdefault(name, ident) != ident:
+            name = f"{(record.get('sha256') or uuid.uuid4().hex)[:8]}_{name}"
+        files.append((name, path))
+    return files
+
+
+# ---------------------------------------------------------------------------
+# Garbage collection
+# ---------------------------------------------------------------------------
+
+
+def _last_seen(directory):
+    try:
+        return (directory / _HEARTBEAT_FILE).stat().st_mtime
+    except OSError:
+        try:
+            return directory.stat().st_mtime
+        except OSError:
+            return 0
+
+
+def collect_garbage(now=None, ttl_s=None):
+    """
+    Remove expired session directories, orphaned blobs, abandoned partial
+    writes and stale files of the legacy flat layout. Returns counters.
+    """
+    now = time.time() if now is None else now
+    ttl_s = UPLOAD_SESSION_TTL_S if ttl_s is None else ttl_s
+    stats = {"sessions": 0, "blobs": 0, "legacy": 0}
+
+    if SESSION_ROOT.is_dir():
+        for directory in SESSION_ROOT.iterdir():
+            if directory.is_dir() and now - _last_seen(directory) > ttl_s:
+                shutil.rmtree(directory, ignore_errors=True)
+                stats["sessions"] += 1
+
+    if BLOB_ROOT.is_dir():
+        for dirpath, _, filenames in os.walk(BLOB_ROOT):
+            for filename in filenames:
+                path = Path(dirpath) / filename
+                if filename.startswith(".incoming-"):
+                    try:
+                        if now - path.stat().st_mtime > GC_GRACE_S:
+                            path.unlink()
+                    except OSError:
+                        pass
+                elif _drop_if_orphaned(filename, min_age_s=GC_GRACE_S, now=now):
+                    stats["blobs"] += 1
+
+    for directory in LEGACY_DIRS:
+        if not directory.is_dir():
+            continue
+        for entry in directory.iterdir():
+            try:
+                if entry.is_file() and now - entry.stat().st_mtime > ttl_s:
+                    entry.unlink()
+                    stats["legacy"] += 1
+            except OSError:
+                pass
+
+    _scan_global_bytes()
+    return stats
+
+
+def _collector_loop():
+    while True:
+        try:
+            collect_garbage()
+        except Exception:
+            pass
+        time.sleep(UPLOAD_GC_INTERVAL_S)
+
+
+def start_collector():
+    """Run collect_garbage() periodically in a background thread, once per process."""
+    global _collector_started
+    with _collector_lock:
+        if _collector_started:
+            return
+        _collector_started = True
+    threading.Thread(target=_collector_loop, name="upload-gc", daemon=True).start()
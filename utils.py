@@ -1,9 +1,12 @@
-import json
 import streamlit as st
 import re
 from datetime import datetime, date, timedelta
 import base64
 from collections import OrderedDict
+import change_journal
+import schema_views
+import state_index
+import validation_engine
 
 def insert_after(odict, new_key, new_value, after_key):
     # Convert to a list of key-value pairs
@@ -49,19 +52,54 @@ def require_task():
         st.rerun()
 
 
-@st.cache_data  # This avoids reloading on every rerun
 def get_model_card_schema():
-    with open("model_card_schema.json", "r") as f:
-        return json.load(f)
+    # Compiled once per process, rebuilt only when the file's hash changes
+    return schema_views.get_compiled_schema()
+
+
+def set_state(key, value):
+    """Write a data key to st.session_state and keep the key index in sync."""
+    st.session_state[key] = value
+    state_index.register(key)
+    validation_engine.mark_dirty(key)
+    change_journal.record(key)
+
+
+def delete_state(key):
+    st.session_state.pop(key, None)
+    state_index.unregister(key)
+    validation_engine.mark_dirty(key)
+    change_journal.record(key)
+
+
+def append_state(list_key, item, *mirror_keys):
+    """
+    Append `item` to the list at `list_key` and mirror it to `mirror_keys`.
+
+    A new list is written rather than the old one mutated: duplicated
+    evaluations share their lists with the original until either is edited.
+    """
+    return extend_state(list_key, [item], *mirror_keys)
+
+
+def extend_state(list_key, items, *mirror_keys):
+    """append_state() for many items at once: one write per key."""
+    value = [*(st.session_state.get(list_key) or []), *items]
+    for key in (list_key, *mirror_keys):
+        set_state(key, value)
+    return value
 
 
 def store_value(key):
-    st.session_state[key] = st.session_state["_" + key]
+    set_state(key, st.session_state["_" + key])
 
 
 def load_value(key, default=None):
     if key not in st.session_state:
         st.session_state[key] = default
+        validation_engine.mark_dirty(key)
+        change_journal.record(key)
+    state_index.register(key)
     st.session_state["_" + key] = st.session_state[key]
 
 
@@ -91,149 +129,15 @@ def set_safe_date_field(base_key: str, yyyymmdd_string: str | None):
     else:
         parsed_date = None
 
-    st.session_state[base_key] = yyyymmdd_string if parsed_date else None
-    st.session_state[widget_key] = parsed_date
+    set_state(base_key, yyyymmdd_string if parsed_date else None)
+    set_state(widget_key, parsed_date)
     st.session_state[raw_key] = parsed_date
 
 
 def populate_session_state_from_json(data):
-    if "task" in data:
-        st.session_state["task"] = data["task"]
-
-    for section, content in data.items():
-
-        if section == "training_data":
-            for k, v in content.items():
-                full_key = f"{section}_{k}"
-                if not isinstance(v, list):
-                    st.session_state[full_key] = v
-                else:
-                    st.session_state[full_key] = v
-                    st.session_state[full_key + "_list"] = v
-
-            ios = content.get("inputs_outputs_technical_specifications", [])
-            for io in ios:
-                clean = io["entry"].strip().replace(" ", "_").lower()
-                src = io["source"]
-                for io_key, io_val in io.items():
-                    if io_key not in ["entry", "source"]:
-                        io_full_key = f"training_data_{clean}_{src}_{io_key}"
-                        st.session_state[io_full_key] = io_val
-                        st.session_state["_" + io_full_key] = io_val  # <- Esto es CLAVE
-
-        elif section == "evaluations":
-            eval_names = [entry["name"] for entry in content]
-            st.session_state["evaluation_forms"] = eval_names
-
-            for entry in content:
-                name = entry["name"].replace(" ", "_")
-                prefix = f"evaluation_{name}_"
-
-                for key, value in entry.items():
-                    if key == "inputs_outputs_technical_specifications":
-                        for io in value:
-                            clean = (
-                                io["entry"].strip().replace(" ", "_").lower()
-                            )
-                            src = io["source"]
-                            for io_key, io_val in io.items():
-                                if io_key not in ["entry", "source"]:
-                                    io_full_key = f"{prefix}{clean}_{src}_{io_key}"
-                                    st.session_state[io_full_key] = io_val
-                                    st.session_state["_" + io_full_key] = io_val
-
-                    elif key == "qualitative_evaluation" and isinstance(value, dict):
-                        qprefix = f"evaluation_{name}_qualitative_evaluation_"
-
-                        for simple_field in [
-                            "evaluators_information",
-                            "explainability",
-                            "citation_details",
-                        ]:
-                            qkey = f"{qprefix}{simple_field}"
-                            qval = value.get(simple_field, "")
-                            st.session_state[qkey] = qval
-                            st.session_state["_" + qkey] = qval
-
-                        for block in [
-                            "likert_scoring",
-                            "turing_test",
-                            "time_saving",
-                            "other",
-                        ]:
-                            b = value.get(block, {})
-                            if isinstance(b, dict):
-                                mkey = f"{qprefix}{block}_method"
-                                rkey = f"{qprefix}{block}_results"
-                                mval = b.get("method", "")
-                                rval = b.get("results", "")
-                                st.session_state[mkey] = mval
-                                st.session_state[rkey] = rval
-                                st.session_state["_" + mkey] = mval
-                                st.session_state["_" + rkey] = rval
-
-                    elif isinstance(value, list) and key.startswith("type_"):
-                        metric_names = [m["name"] for m in value]
-                        st.session_state[f"{prefix}{key}_list"] = metric_names
-                        st.session_state[f"{prefix}{key}"] = metric_names
-
-                        for metric in value:
-                            metric_prefix = f"evaluation_{name}.{metric['name']}"
-                            for m_field, m_val in metric.items():
-                                if m_field != "name":
-                                    st.session_state[f"{metric_prefix}_{m_field}"] = (
-                                        m_val
-                                    )
-
-                    elif isinstance(value, str) and is_yyyymmdd(value):
-                        date_obj = to_date(value)
-                        if date_obj:
-                            widget_key = f"{prefix}{key}_widget"
-                            st.session_state[widget_key] = date_obj
-                            st.session_state[f"_{widget_key}"] = date_obj
-                            st.session_state[f"{prefix}{key}"] = value
-                        else:
-                            st.session_state[f"{prefix}{key}"] = value
-
-                    else:
-                        st.session_state[f"{prefix}{key}"] = value
-
-        elif section == "technical_specifications":
-            for k, v in content.items():
-                if k == "learning_architectures" and isinstance(v, list):
-                    st.session_state["learning_architecture_forms"] = {
-                        f"Learning Architecture {i + 1}": {} for i in range(len(v))
-                    }
-                    for i, arch in enumerate(v):
-                        prefix = f"learning_architecture_{i}_"
-                        for key, value in arch.items():
-                            full_key = f"{prefix}{key}"
-                            st.session_state[full_key] = value
-                    continue
-
-                elif k == "hw_and_sw" and isinstance(v, dict):
-                    for hw_sw_key, hw_sw_val in v.items():
-                        full_key = f"{k}_{hw_sw_key}"
-                        st.session_state[full_key] = hw_sw_val
-                    continue
-
-                full_key = f"{section}_{k}"
-                st.session_state[full_key] = v
-
-                if isinstance(v, list):
-                    st.session_state[full_key + "_list"] = v
-           
-
-        elif isinstance(content, dict):
-            for k, v in content.items():
-                full_key = f"{section}_{k}"
-                st.session_state[full_key] = v
-
-                if k.endswith("creation_date"):
-                    set_safe_date_field(full_key, v)
-
-                if isinstance(v, list):
-                    st.session_state[full_key + "_list"] = v
+    from card_model import ModelCard
+
+    ModelCard.from_dict(data).apply_to_session_state()
 
 
 def light_header(text, size="16px", bottom_margin="1em"):
@@ -386,4 +290,32 @@ def hide_streamlit_chrome():
     /* Fallback: hide any badges/links mentioning Streamlit */
     a[href*="streamlit.io"], a[href*="streamlit.app"] {display: none !important;}
     </style>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+    """, unsafe_allow_html=True)
+
+# Styles every page needs: the hidden Cloud toolbar and the field tooltips
+# drawn by render.create_helpicon. Sent once per run by inject_page_css()
+# instead of once per page function and once per field.
+PAGE_CSS = """<style>
+div[data-testid="stToolbar"] { visibility: hidden; height: 0; }
+a[data-testid="viewerBadge_link"] { display: none !important; }
+div[data-testid="stStatusWidget"] { display: none !important; }
+footer { visibility: hidden; }
+.tooltip-inline { display: inline-block; position: relative; margin-left: 6px;
+  cursor: pointer; font-size: 1em; color: #999; }
+.tooltip-inline .tooltiptext { visibility: hidden; width: 320px;
+  background-color: #f9f9f9; color: #333; text-align: left; border-radius: 6px;
+  border: 1px solid #ccc; padding: 10px; position: absolute; top: 125%; left: 0;
+  z-index: 10; box-shadow: 0px 0px 10px rgba(0,0,0,0.1); font-weight: normal;
+  font-size: 0.95em; line-height: 1.4; white-space: normal; word-wrap: break-word;
+  display: inline-block; }
+.tooltip-inline:hover .tooltiptext { visibility: visible; }
+</style>"""
+
+
+def inject_page_css():
+    """
+    Emit PAGE_CSS for this run. Streamlit drops elements a full rerun does not
+    re-emit, so this runs once per run (from the page dispatcher in main);
+    fragment reruns keep it without resending.
+    """
+    st.markdown(PAGE_CSS, unsafe_allow_html=True)
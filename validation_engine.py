@@ -0,0 +1,431 @@
+"""
+Incremental required-field validation.
+
+The rule templates are compiled once per compiled schema (see schema_views).
+Each session keeps a ValidationEngine that expands the templates into concrete
+rules (one per session key), indexed key -> rules. Writes made through
+utils.set_state / utils.delete_state mark keys dirty; on the next read only
+the rules depending on those keys are re-checked. Keys that change the shape
+of the card (task, architectures, modalities, evaluations, metric lists) make
+the engine re-expand its rules instead.
+
+Field formats are checked the same way: every written key is re-checked
+against its compiled format validator on the next read, and the messages of
+the invalid ones are kept until the key changes again.
+"""
+
+from dataclasses import dataclass
+
+import streamlit as st
+
+import entities
+import schema_views
+import state_index
+from json_template import (
+    DATA_INPUT_OUTPUT_TS,
+    EVALUATION_METRIC_FIELDS,
+    LEARNING_ARCHITECTURE,
+    TASK_METRIC_MAP,
+)
+from validation_utils import is_empty, _has_required_image
+
+_ENGINE_STATE_KEY = "_validation_engine"
+_compiled_rules = None
+
+EVAL_SECTION = "evaluation_data_methodology_results_commisioning"
+EVALUATED_BY_FIELDS = (
+    "evaluated_by_name",
+    "evaluated_by_institution",
+    "evaluated_by_contact_email",
+)
+STRUCTURAL_KEYS = {"task", "learning_architecture_forms", "evaluation_forms"}
+
+
+@dataclass(slots=True, frozen=True)
+class FieldTemplate:
+    key: str
+    label: str
+    model_types: tuple | None
+    is_image: bool
+
+
+@dataclass(slots=True, frozen=True)
+class CompiledRules:
+    digest: str
+    static: tuple  # ((section, FieldTemplate), ...)
+    architecture: tuple
+    evaluation: tuple
+    metric: dict  # metric type -> (FieldTemplate, ...)
+    qualitative: tuple
+    formats: dict  # "<section>_<field>" or "<field>" -> FieldProps with a validator
+
+
+@dataclass(slots=True)
+class Rule:
+    order: int
+    key: str
+    section: str
+    label: str
+    is_image: bool = False
+
+    def is_missing(self):
+        if self.is_image:
+            # `<key>_image` is the dependency; the upload registry holds the file
+            return not _has_required_image(self.key[: -len("_image")])
+        return is_empty(st.session_state.get(self.key))
+
+
+def _template(key, props):
+    return FieldTemplate(
+        key=key,
+        label=props.label,
+        model_types=props.get("model_types") or None,
+        is_image=(props.get("type") or "").lower() == "image",
+    )
+
+
+def _applies(template, task):
+    return template.model_types is None or (task and task in template.model_types)
+
+
+def compile_rules():
+    global _compiled_rules
+    schema = schema_views.get_compiled_schema()
+    if _compiled_rules is None or _compiled_rules.digest != schema.digest:
+        _compiled_rules = _compile_rules(schema)
+    return _compiled_rules
+
+
+def _compile_rules(schema):
+    io_fields = set(DATA_INPUT_OUTPUT_TS)
+    skip_keys = {"input_content_rtstruct_subtype", "output_content_rtstruct_subtype"}
+    skip_sections = {EVAL_SECTION, "learning_architecture", "qualitative_evaluation"}
+
+    static = []
+    for section, fields in schema.items():
+        if section in skip_sections or not isinstance(fields, dict):
+            continue
+        for key, props in fields.items():
+            if key in skip_keys or (key in io_fields and section == "training_data"):
+                continue
+            if props.required:
+                static.append((section, _template(key, props)))
+
+    arch_fields = schema.get("learning_architecture", {})
+    architecture = tuple(
+        _template(key, arch_fields[key])
+        for key in LEARNING_ARCHITECTURE
+        if key in arch_fields and arch_fields[key].required
+    )
+
+    eval_fields = schema.get(EVAL_SECTION, {})
+    evaluation = tuple(
+        _template(key, props)
+        for key, props in eval_fields.items()
+        if props.required and key not in io_fields
+    )
+    metric = {
+        metric_type: tuple(
+            _template(key, eval_fields[key])
+            for key in fields
+            if key in eval_fields and eval_fields[key].required
+        )
+        for metric_type, fields in EVALUATION_METRIC_FIELDS.items()
+    }
+    qualitative = tuple(
+        _template(key, props)
+        for key, props in schema.get("qualitative_evaluation", {}).items()
+        if props.required
+    )
+    return CompiledRules(
+        schema.digest,
+        tuple(static),
+        architecture,
+        evaluation,
+        metric,
+        qualitative,
+        _compile_formats(schema),
+    )
+
+
+def _compile_formats(schema):
+    """
+    Map data keys to the props of fields that have a format validator.
+    Static fields are stored as `<section>_<field>`; a bare `<field>` is
+    added only when every section using that field name agrees on its
+    validator, so prefixed copies (architectures, evaluations, metrics)
+    resolve through their suffix.
+    """
+    formats, by_field = {}, {}
+    for section, fields in schema.items():
+        if not isinstance(fields, dict):
+            continue
+        for key, props in fields.items():
+            if schema_views.field_validator(key, props) is None:
+                continue
+            formats[f"{section}_{key}"] = props
+            by_field.setdefault(key, {}).setdefault(props.validator, props)
+    for key, variants in by_field.items():
+        if len(variants) == 1:
+            formats.setdefault(key, next(iter(variants.values())))
+    return formats
+
+
+def format_field(formats, key):
+    """Props of a concrete session key's field: exact match, else longest suffix."""
+    props = formats.get(key)
+    pos = key.find("_")
+    while props is None and pos != -1:
+        props = formats.get(key[pos + 1 :])
+        pos = key.find("_", pos + 1)
+    return props
+
+
+def _metric_names(eval_prefix, task):
+    return [
+        name
+        for metric_type in TASK_METRIC_MAP.get(task, [])
+        for name in st.session_state.get(f"{eval_prefix}_{metric_type}_list", [])
+    ]
+
+
+def is_live_key(key, props, task):
+    """
+    Whether `key` belongs to the card as it stands: its field applies to the
+    task and its architecture, evaluation and metric still exist. Values
+    left behind by a task switch or a delete stay in the session but are
+    neither shown nor exported.
+    """
+    if not props.applies_to(task):
+        return False
+    if key.startswith("learning_architecture_"):
+        return any(
+            key.startswith(f"{entities.architecture_prefix(arch_id)}_")
+            for arch_id in entities.architecture_ids()
+        )
+    if not key.startswith("evaluation_"):
+        return True
+    for eval_id in entities.evaluation_ids():
+        prefix = entities.evaluation_prefix(eval_id)
+        if key.startswith(f"{prefix}_"):
+            return True
+        if key.startswith(f"{prefix}."):
+            metric_key = key[len(prefix) + 1 :]
+            return any(
+                metric_key.startswith(f"{name}_")
+                for name in _metric_names(prefix, task)
+            )
+    return False
+
+
+def is_structural_key(key):
+    if key in STRUCTURAL_KEYS or key.endswith(("model_inputs", "model_outputs")):
+        return True
+    if key.startswith("evaluation_"):
+        return key.endswith("_evaluated_same_as_approved") or "_type_" in key
+    return False
+
+
+class ValidationEngine:
+    __slots__ = (
+        "rules_by_key",
+        "missing",
+        "dirty",
+        "needs_expand",
+        "_result",
+        "format_errors",
+        "format_dirty",
+        "formats_seeded",
+    )
+
+    def __init__(self):
+        self.rules_by_key = {}
+        self.missing = {}
+        self.dirty = set()
+        self.needs_expand = True
+        self._result = None
+        self.format_errors = {}  # key -> (FieldProps, message), invalid keys only
+        self.format_dirty = set()
+        self.formats_seeded = False
+
+    def mark_dirty(self, key):
+        self.format_dirty.add(key)
+        if is_structural_key(key):
+            self.needs_expand = True
+        elif key in self.rules_by_key:
+            self.dirty.add(key)
+
+    def _add(self, rules, key, section, label, is_image=False):
+        dep_key = f"{key}_image" if is_image else key
+        rule = Rule(len(rules), dep_key, section, label, is_image)
+        rules.append(rule)
+        self.rules_by_key.setdefault(dep_key, []).append(rule)
+
+    def expand(self):
+        """Instantiate the compiled templates for the current card structure."""
+        compiled = compile_rules()
+        task = st.session_state.get("task")
+        self.rules_by_key = {}
+        rules = []
+
+        for section, t in compiled.static:
+            if _applies(t, task):
+                self._add(rules, f"{section}_{t.key}", section, t.label, t.is_image)
+
+        for position, arch_id in enumerate(entities.architecture_ids()):
+            prefix = entities.architecture_prefix(arch_id)
+            for t in compiled.architecture:
+                self._add(
+                    rules,
+                    f"{prefix}_{t.key}",
+                    "learning_architecture",
+                    f"{t.label} ({entities.architecture_label(position)})",
+                )
+
+        eval_forms = entities.evaluations()
+        metric_types = TASK_METRIC_MAP.get(task, [])
+        metric_keys = {
+            field
+            for metric_type in metric_types
+            for field in EVALUATION_METRIC_FIELDS.get(metric_type, [])
+        }
+        for entry in state_index.modality_entries():
+            modality, source = entry["modality"], entry["source"]
+            clean = modality.strip().replace(" ", "_").lower()
+            for field, label in DATA_INPUT_OUTPUT_TS.items():
+                self._add(
+                    rules,
+                    f"training_data_{clean}_{source}_{field}",
+                    "training_data",
+                    f"{label} ({modality} - {source})",
+                )
+            for eval_id, name in eval_forms:
+                eval_prefix = entities.evaluation_prefix(eval_id)
+                for field, label in DATA_INPUT_OUTPUT_TS.items():
+                    self._add(
+                        rules,
+                        f"{eval_prefix}_{clean}_{source}_{field}",
+                        EVAL_SECTION,
+                        f"{label} ({modality} - {source})(Eval: {name})",
+                    )
+
+        for eval_id, name in eval_forms:
+            eval_prefix = entities.evaluation_prefix(eval_id)
+            prefix = f"{eval_prefix}_"
+            approved_same = st.session_state.get(f"{prefix}evaluated_same_as_approved")
+            for t in compiled.evaluation:
+                if t.key in metric_keys:
+                    continue
+                if approved_same and t.key in EVALUATED_BY_FIELDS:
+                    continue
+                if _applies(t, task):
+                    self._add(
+                        rules, f"{prefix}{t.key}", EVAL_SECTION, f"{t.label} (Eval: {name})"
+                    )
+
+            for metric_type in metric_types:
+                for metric_name in st.session_state.get(f"{prefix}{metric_type}_list", []):
+                    short = metric_name.split(" (")[0]
+                    for t in compiled.metric.get(metric_type, ()):
+                        self._add(
+                            rules,
+                            f"{eval_prefix}.{metric_name}_{t.key}",
+                            EVAL_SECTION,
+                            f"{t.label} (Metric: {short}, Eval: {name})",
+                        )
+
+            for t in compiled.qualitative:
+                self._add(
+                    rules,
+                    f"{prefix}qualitative_evaluation_{t.key}",
+                    EVAL_SECTION,
+                    f"{t.label} (Eval: {name})",
+                )
+
+        self.missing = {r.order: r for r in rules if r.is_missing()}
+        self.dirty.clear()
+        self.needs_expand = False
+        self._result = None
+
+    def refresh(self):
+        if self.needs_expand:
+            self.expand()
+            return
+        if not self.dirty:
+            return
+        for key in self.dirty:
+            for rule in self.rules_by_key.get(key, ()):
+                if rule.is_missing():
+                    self.missing[rule.order] = rule
+                else:
+                    self.missing.pop(rule.order, None)
+        self.dirty.clear()
+        self._result = None
+
+    def missing_fields(self):
+        """Return [(section, label), ...] in schema order."""
+        self.refresh()
+        if self._result is None:
+            self._result = [
+                (self.missing[o].section, self.missing[o].label)
+                for o in sorted(self.missing)
+            ]
+        return self._result
+
+    def refresh_formats(self):
+        if not self.formats_seeded:
+            # Keys written before this engine existed (e.g. after a code reload)
+            self.format_dirty.update(state_index.keys_with_prefix(""))
+            self.formats_seeded = True
+        if not self.format_dirty:
+            return
+        formats = compile_rules().formats
+        for key in self.format_dirty:
+            props = format_field(formats, key)
+            error = props.validator.error(st.session_state.get(key)) if props else None
+            if error:
+                self.format_errors[key] = (props, error)
+            else:
+                self.format_errors.pop(key, None)
+        self.format_dirty.clear()
+
+    def format_error(self, key):
+        """Format message of `key` if its current value is malformed, else None."""
+        self.refresh_formats()
+        entry = self.format_errors.get(key)
+        return entry[1] if entry else None
+
+    def invalid_format_fields(self):
+        """Labels of the live fields whose values are malformed, in key order."""
+        self.refresh_formats()
+        task = st.session_state.get("task")
+        labels = []
+        for key in sorted(self.format_errors):
+            props, _ = self.format_errors[key]
+            if is_live_key(key, props, task) and props.label not in labels:
+                labels.append(props.label)
+        return labels
+
+
+def get_engine():
+    engine = st.session_state.get(_ENGINE_STATE_KEY)
+    if engine is None:
+        engine = ValidationEngine()
+        st.session_state[_ENGINE_STATE_KEY] = engine
+    return engine
+
+
+def mark_dirty(key):
+    get_engine().mark_dirty(key)
+
+
+def missing_fields():
+    return get_engine().missing_fields()
+
+
+def format_error(key):
+    return get_engine().format_error(key)
+
+
+def invalid_format_fields():
+    return get_engine().invalid_format_fields()
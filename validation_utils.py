@@ -7,6 +7,8 @@ from json_template import (
 )
 
 import streamlit as st
+import entities
+import state_index
 
 def is_empty(value):
         return value in ("", None, [], {})
@@ -78,11 +80,10 @@ def validate_learning_architectures(schema):
     def is_empty(value):
         return value in ("", None, [], {})
 
-    forms = st.session_state.get("learning_architecture_forms", {})
     schema_fields = schema.get("learning_architecture", {})
 
-    for i in range(len(forms)):
-        prefix = f"learning_architecture_{i}_"
+    for i, arch_id in enumerate(entities.architecture_ids()):
+        prefix = f"{entities.architecture_prefix(arch_id)}_"
 
         for field in LEARNING_ARCHITECTURE:
             props = schema_fields.get(field)
@@ -110,14 +111,11 @@ def validate_modalities_fields(schema, current_task):
     def is_empty(value):
         return value in ("", None, [], {})
 
-    modalities = []
-    for key, value in st.session_state.items():
-        if key.endswith("model_inputs") and isinstance(value, list):
-            for item in value:
-                modalities.append((item, "model_inputs"))
-        elif key.endswith("model_outputs") and isinstance(value, list):
-            for item in value:
-                modalities.append((item, "model_outputs"))
+    modalities = [
+        (entry["modality"], entry["source"])
+        for entry in state_index.modality_entries()
+    ]
+    eval_forms = entities.evaluations()
 
     for modality, source in modalities:
         clean = modality.strip().replace(" ", "_").lower()
@@ -133,10 +131,8 @@ def validate_modalities_fields(schema, current_task):
                         f"{label} ({modality} - {source})",
                     )
                 )
-        eval_forms = st.session_state.get("evaluation_forms", [])
-        for name in eval_forms:
-            slug = name.replace(" ", "_")
-            prefix = f"evaluation_{slug}_"
+        for eval_id, name in eval_forms:
+            prefix = f"{entities.evaluation_prefix(eval_id)}_"
 
             prefix_eval = f"{prefix}{clean}_"
             for field, label in DATA_INPUT_OUTPUT_TS.items():
@@ -163,7 +159,7 @@ def validate_evaluation_forms(schema, current_task):
     def is_empty(value):
         return value in ("", None, [], {})
 
-    eval_forms = st.session_state.get("evaluation_forms", [])
+    eval_forms = entities.evaluations()
     eval_section = schema.get("evaluation_data_methodology_results_commisioning", {})
     qual_eval_section = schema.get("qualitative_evaluation", {})
     metric_fields = TASK_METRIC_MAP.get(current_task, [])
@@ -172,9 +168,8 @@ def validate_evaluation_forms(schema, current_task):
     for type_field in metric_fields:
         metric_field_keys.update(EVALUATION_METRIC_FIELDS.get(type_field, []))
 
-    for name in eval_forms:
-        slug = name.replace(" ", "_")
-        prefix = f"evaluation_{slug}_"
+    for eval_id, name in eval_forms:
+        prefix = f"{entities.evaluation_prefix(eval_id)}_"
         approved_same_key = f"{prefix}evaluated_same_as_approved"
         approved_same = st.session_state.get(approved_same_key, False)
 
@@ -0,0 +1,194 @@
+"""
+ZIP archives for the sidebar downloads.
+
+Archives are written to a temporary file rather than an in-memory buffer.
+Already-compressed formats (PNG, JPEG, PDF, DICOM, ...) are stored as-is;
+everything else is DEFLATEd. Members are streamed in chunks through
+ZipFile.open(..., "w"), so only public zipfile API touches the archive.
+Finished archives are cached on disk by a fingerprint of their members
+(name + path/size/mtime, or content hash for in-memory data), so repeated
+clicks reuse the archive until the set of uploads changes.
+"""
+
+import hashlib
+import mimetypes
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+
+ZIP_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+ZIP_OUTPUT_DIR = os.path.join(tempfile.gettempdir(), "model_card_zips")
+CHUNK_SIZE = 1024 * 1024
+
+ALREADY_COMPRESSED_MIME = {
+    "application/dicom",
+    "application/gzip",
+    "application/pdf",
+    "application/x-7z-compressed",
+    "application/x-bzip2",
+    "application/x-rar-compressed",
+    "application/x-xz",
+    "application/zip",
+    "image/avif",
+    "image/gif",
+    "image/heic",
+    "image/jpeg",
+    "image/png",
+    "image/webp",
+}
+ALREADY_COMPRESSED_EXTENSIONS = {
+    ".7z",
+    ".bz2",
+    ".dcm",
+    ".dicom",
+    ".docx",
+    ".gz",
+    ".jpeg",
+    ".jpg",
+    ".mp3",
+    ".mp4",
+    ".nii.gz",
+    ".npz",
+    ".pdf",
+    ".png",
+    ".pptx",
+    ".webp",
+    ".xlsx",
+    ".xz",
+    ".zip",
+}
+
+_cache = OrderedDict()  # fingerprint -> archive path, least recently used first
+_cache_lock = threading.Lock()
+
+
+def compression_for(name):
+    """ZIP_STORED for formats that are already compressed, else ZIP_DEFLATED."""
+    lower = name.lower()
+    if any(lower.endswith(ext) for ext in ALREADY_COMPRESSED_EXTENSIONS):
+        return zipfile.ZIP_STORED
+    mime, _ = mimetypes.guess_type(lower)
+    if mime in ALREADY_COMPRESSED_MIME or (mime or "").startswith(("video/", "audio/")):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def _is_path(source):
+    return not isinstance(source, bytes)
+
+
+def _fingerprint(members):
+    h = hashlib.sha256()
+    for arcname, source in members:
+        h.update(arcname.encode("utf-8") + b"\0")
+        if _is_path(source):
+            info = os.stat(source)
+            h.update(f"{os.path.abspath(source)}|{info.st_size}|{info.st_mtime_ns}".encode())
+        else:
+            h.update(hashlib.sha256(source).digest())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _iter_chunks(source):
+    if _is_path(source):
+        with open(source, "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
+    else:
+        for i in range(0, len(source), CHUNK_SIZE):
+            yield source[i : i + CHUNK_SIZE]
+
+
+def _member_info(arcname, source):
+    zinfo = zipfile.ZipInfo(arcname, date_time=time.localtime(time.time())[:6])
+    if _is_path(source):
+        zinfo.date_time = time.localtime(os.path.getmtime(source))[:6]
+        zinfo.external_attr = 0o644 << 16
+        zinfo.file_size = os.path.getsize(source)
+    else:
+        zinfo.file_size = len(source)
+    zinfo.compress_type = compression_for(arcname)
+    return zinfo
+
+
+def _write_member(zf, arcname, source):
+    """Stream one member into `zf`; CRC, sizes and headers are zipfile's job."""
+    zinfo = _member_info(arcname, source)
+    chunks = _iter_chunks(source)
+    # Open the source before the entry so a vanished file leaves no stub member
+    first = next(chunks, b"")
+    zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT
+    with zf.open(zinfo, "w", force_zip64=zip64) as dest:
+        dest.write(first)
+        for chunk in chunks:
+            dest.write(chunk)
+
+
+def _write_archive(members, path):
+    skipped = []
+    with open(path, "wb") as f, zipfile.ZipFile(f, "w", allowZip64=True) as zf:
+        for arcname, source in members:
+            try:
+                _write_member(zf, arcname, source)
+            except FileNotFoundError:
+                skipped.append(arcname)
+    return skipped
+
+
+def _evict_locked():
+    total = 0
+    for path in reversed(_cache.values()):
+        total += os.path.getsize(path) if os.path.exists(path) else 0
+    while total > ZIP_CACHE_MAX_BYTES and len(_cache) > 1:
+        _, path = _cache.popitem(last=False)
+        try:
+            total -= os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def build_zip(members):
+    """
+    Return (archive_path, skipped_arcnames) for `members`, a list of
+    (arcname, source) where source is a file path or in-memory bytes.
+
+    Archives are reused while no member changed. Missing files are skipped.
+    """
+    os.makedirs(ZIP_OUTPUT_DIR, exist_ok=True)
+    available, skipped = [], []
+    for arcname, source in members:
+        if _is_path(source) and not os.path.isfile(source):
+            skipped.append(arcname)
+        else:
+            available.append((arcname, source))
+
+    key = _fingerprint(available)
+    with _cache_lock:
+        path = _cache.get(key)
+        if path is not None and os.path.exists(path):
+            _cache.move_to_end(key)
+            return path, skipped
+
+    fd, tmp_path = tempfile.mkstemp(suffix=".zip.part", dir=ZIP_OUTPUT_DIR)
+    os.close(fd)
+    try:
+        skipped += _write_archive(available, tmp_path)
+        path = os.path.join(ZIP_OUTPUT_DIR, f"{key}.zip")
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    with _cache_lock:
+        _cache[key] = path
+        _cache.move_to_end(key)
+        _evict_locked()
+    return path, skipped